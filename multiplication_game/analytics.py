@@ -1,72 +1,259 @@
-import pandas as pd
-import statistics
+import math
+import atexit
 import datetime
+from array import array
+from pathlib import Path
+from answer_store import AnswerStore
+from persistence import AnswerJournal, SessionWriter
+from sampler import AliasSampler, questionWeight
+
+class TimeSketch:
+    """
+    Streaming percentile sketch of answer times: counts in log-spaced buckets from MIN_SECONDS
+    to MAX_SECONDS, so each bucket spans the same relative error (about 7%).
+    Adding a time is O(1); a percentile walks the fixed number of buckets.
+    """
+    BUCKETS = 64
+    MIN_SECONDS = 0.05
+    MAX_SECONDS = 300.0
+    _GROWTH = (MAX_SECONDS / MIN_SECONDS) ** (1 / (BUCKETS - 1))
+    _LOG_GROWTH = math.log(_GROWTH)
+
+    def __init__(self, data: bytes = None):
+        self.counts = array('I', data) if data else array('I', bytes(4 * self.BUCKETS))
+        self.total = sum(self.counts)
+
+    def add(self, seconds: float):
+        if seconds <= self.MIN_SECONDS:
+            bucket = 0
+        else:
+            bucket = min(self.BUCKETS - 1, int(math.log(seconds / self.MIN_SECONDS) / self._LOG_GROWTH) + 1)
+        self.counts[bucket] += 1
+        self.total += 1
+
+    def percentile(self, q: float):
+        """Approximate q-th percentile (0-100) in seconds, or None if nothing was added."""
+        if self.total == 0:
+            return None
+        rank = q / 100 * (self.total - 1)
+        seen = 0
+        for bucket, count in enumerate(self.counts):
+            seen += count
+            if seen > rank:
+                break
+        if bucket == 0:
+            return self.MIN_SECONDS
+        # Geometric middle of the bucket's range
+        return self.MIN_SECONDS * self._GROWTH ** (bucket - 0.5)
+
+    def toBytes(self):
+        return self.counts.tobytes() if self.total else None
+
+class QuestionStats:
+    """
+    Running aggregates for one (a, b) question; every update is O(1).
+    time_m2 is None when it does not cover every answer (rows imported from Excel or saved before it
+    was stored); the variance is then unknown until UserProfile rebuilds it from the answer history.
+    """
+    __slots__ = ('a', 'b', 'times_occurred', 'times_wrong', 'times_right', 'avg_time', 'last_time',
+                 'time_m2', 'streak', 'best_streak', 'time_sketch')
+
+    def __init__(self, a, b, times_occurred=None, times_wrong=None, times_right=None, avg_time=None,
+                 last_time=None, time_m2=None, streak=None, best_streak=None, time_sketch=None):
+        self.a = a
+        self.b = b
+        self.times_occurred = times_occurred or 0
+        self.times_wrong = times_wrong or 0
+        self.times_right = times_right or 0
+        self.avg_time = avg_time
+        self.last_time = last_time
+        self.time_m2 = time_m2 if time_m2 is not None or self.times_occurred else 0.0
+        self.streak = streak or 0 # Consecutive right answers up to now
+        self.best_streak = best_streak or 0
+        self.time_sketch = TimeSketch(time_sketch)
+
+    def record(self, question_right: bool, time_seconds: float):
+        self.times_occurred += 1
+        if question_right:
+            self.times_right += 1
+            self.streak += 1
+            self.best_streak = max(self.best_streak, self.streak)
+        else:
+            self.times_wrong += 1
+            self.streak = 0
+        self.last_time = time_seconds
+
+        # Welford's running mean and variance (the variance only while it covers every answer)
+        if self.avg_time is None:
+            self.avg_time = time_seconds
+            self.time_m2 = 0.0
+        else:
+            delta = time_seconds - self.avg_time
+            self.avg_time += delta / self.times_occurred
+            if self.time_m2 is not None:
+                self.time_m2 += delta * (time_seconds - self.avg_time)
+        self.time_sketch.add(time_seconds)
+
+    @property
+    def time_variance(self):
+        """Sample variance of the answer time (None until there are two answers, or if it is unknown)."""
+        if self.times_occurred < 2 or self.time_m2 is None:
+            return None
+        return self.time_m2 / (self.times_occurred - 1)
+
+    @property
+    def error_rate(self):
+        return self.times_wrong / self.times_occurred if self.times_occurred else None
+
+    def timePercentile(self, q: float):
+        return self.time_sketch.percentile(q)
+
+    def toRow(self):
+        """A question_stats row in STATS_COLUMNS order (counts of 0 are stored as NULL, like the Excel sheet)."""
+        return (self.a, self.b, self.times_occurred or None, self.times_wrong or None, self.times_right or None,
+                self.avg_time, self.last_time, self.time_m2, self.streak, self.best_streak, self.time_sketch.toBytes())
 
 class UserProfile:
-    def __init__(self, excel_filepath: str):
-        self.__excel_filepath = excel_filepath
-        try:
-            self.__df_focus = pd.read_excel(self.__excel_filepath, sheet_name='Focus Problems',index_col=0,)
-            self.__df_performance = pd.read_excel(self.__excel_filepath, sheet_name='Performance')
-            self.__df_daily_log = pd.read_excel(self.__excel_filepath, sheet_name='Daily Log', index_col=0)
+    def __init__(self, profile_filepath: str):
+        """
+        profile_filepath is the profile's SQLite database (.db). A profile that only exists as an
+        .xlsx workbook with the same name is imported into a new database on first load.
+        """
+        self.__db_filepath = Path(profile_filepath).with_suffix('.db')
+        excel_filepath = self.__db_filepath.with_suffix('.xlsx')
+        if self.__db_filepath.exists():
+            self.__store = AnswerStore(self.__db_filepath)
+        elif excel_filepath.exists():
+            print(f"Importing {excel_filepath.name} into {self.__db_filepath.name}")
+            self.__store = AnswerStore(self.__db_filepath)
+            self.__store.importExcel(excel_filepath)
+        else:
+            self.__store = AnswerStore.create(self.__db_filepath)
+
+        self.__focus = self.__store.loadFocusProblems()
+        # Per-question running statistics keyed by (a, b)
+        self.__stats = {(row[0], row[1]): QuestionStats(*row) for row in self.__store.loadQuestionStats()}
+
+        # Weighted sampler over every valid (a, b) pair; weights follow the stats as answers come in
+        valid_pairs = [(a, b) for a in range(1, 13) for b in range(1, 13) if self.isQuestionValid(a, b)]
+        if not valid_pairs:
+            print("No focus problems are enabled; using every problem")
+            valid_pairs = [(a, b) for a in range(1, 13) for b in range(1, 13)]
+        self.__sampler = AliasSampler(valid_pairs, [questionWeight(self.__stats.get(pair)) for pair in valid_pairs])
+        # Answers and changed questions not yet handed to the writer
+        self.__session_answers = []
+        self.__changed_questions = set()
+        self.__rebuildTimeStats()
 
-        except PermissionError as e:
-            raise PermissionError(f"Please make sure you don't have the file {self.__excel_filepath} open in another program.  {e}")
-        print('Hello World')
+        # Saves are written by a background thread; every answer is journaled the moment it is given
+        saved_seq = self.__store.loadJournalSeq()
+        self.__journal = AnswerJournal(self.__db_filepath.with_suffix('.journal'))
+        unsaved_answers = self.__journal.readEntries(saved_seq)
+        self.__journal.last_seq = max(self.__journal.last_seq, saved_seq)
+        self.__writer = SessionWriter(self.__db_filepath)
+        self.__writer.saved_seq = saved_seq
+        if unsaved_answers:
+            # The last session ended without saving (crash or kill); recover its answers
+            print(f"Recovering {len(unsaved_answers)} unsaved answers from {self.__journal.journal_filepath.name}")
+            for seq, a, b, correct, seconds, answered_at in unsaved_answers:
+                self.__recordAnswer(bool(correct), a, b, seconds)
+                self.__session_answers.append((a, b, correct, seconds, answered_at))
+            self.writePerformanceResultsToFile(0)
+            self.__writer.flush()
+        if self.__writer.saved_seq >= self.__journal.last_seq:
+            self.__journal.truncate()
+        self.__closed = False
+        atexit.register(self.close)
+
+    def __rebuildTimeStats(self):
+        """
+        Recomputes the answer time aggregates of questions whose variance is unknown (time_m2 is None)
+        from the answer history, when the history holds every answer of the question. They are saved
+        with the next save.
+        """
+        unknown = {key for key, stats in self.__stats.items() if stats.time_m2 is None}
+        if not unknown:
+            return
+        df_answers = self.__store.loadAnswers()
+        for (a, b), df_question in df_answers.groupby(['a', 'b']):
+            key = (int(a), int(b))
+            stats = self.__stats.get(key)
+            if key not in unknown or len(df_question) != stats.times_occurred:
+                continue # Part of the history is missing (e.g. imported from Excel); keep it unknown
+            replay = QuestionStats(*key)
+            for correct, seconds in zip(df_question['correct'], df_question['seconds']):
+                replay.record(bool(correct), float(seconds))
+            stats.avg_time = replay.avg_time
+            stats.time_m2 = replay.time_m2
+            stats.time_sketch = replay.time_sketch
+            self.__changed_questions.add(key)
 
     def isQuestionValid(self, a:int, b:int):
-        first_permutation_valid = pd.notna(self.__df_focus.at[a,b])
-        second_permutation_valid = pd.notna(self.__df_focus.at[b,a])
-        return first_permutation_valid | second_permutation_valid
+        return ((a, b) in self.__focus) | ((b, a) in self.__focus)
     
     def logQuestionResults(self, question_right:bool, a, b, time_seconds):
         #time_seconds = time_ms/1000
-        question_row_index = self.__df_performance[(self.__df_performance['First']==a)&(self.__df_performance['Second']==b)].index[0]
-        if pd.isna(self.__df_performance.at[question_row_index,'Times Occurred']):
-            self.__df_performance.at[question_row_index,'Times Occurred']=1
-            times_answered=0
-        else:
-            times_answered=int(self.__df_performance.at[question_row_index,'Times Occurred'])
-            self.__df_performance.at[question_row_index,'Times Occurred']+=1
+        answer = (a, b, int(question_right), time_seconds, datetime.datetime.now().isoformat(timespec='seconds'))
+        self.__journal.append(*answer)
+        self.__session_answers.append(answer)
+        self.__recordAnswer(question_right, a, b, time_seconds)
 
-        self.__df_performance.at[question_row_index,'Last Time to Answer']=time_seconds
-        if question_right:
-            if pd.isna(self.__df_performance.at[question_row_index,'Times Right']):
-                self.__df_performance.at[question_row_index,'Times Right']=1
-            else:
-                self.__df_performance.at[question_row_index,'Times Right']+=1
-        else:
-            if pd.isna(self.__df_performance.at[question_row_index,'Times Wrong']):
-                self.__df_performance.at[question_row_index,'Times Wrong']=1
-            else:
-                self.__df_performance.at[question_row_index,'Times Wrong']+=1
-        
-        # Establish new average anser time:
-        if times_answered==0:
-            self.__df_performance.at[question_row_index,'Avg Time to Answer']=time_seconds
-        else:
-            previous_avg_time = self.__df_performance.at[question_row_index,'Avg Time to Answer']
-            previous_answer_durations = [previous_avg_time for i in range(times_answered)]
-            total_answer_durations = previous_answer_durations + [time_seconds]
-            new_avg = statistics.mean(total_answer_durations)
-            self.__df_performance.at[question_row_index,'Avg Time to Answer']=new_avg
+    def __recordAnswer(self, question_right:bool, a, b, time_seconds):
+        stats = self.__stats.get((a, b))
+        if stats is None:
+            stats = self.__stats[(a, b)] = QuestionStats(a, b)
+        stats.record(question_right, time_seconds)
+        self.__changed_questions.add((a, b))
+        self.__sampler.setWeight((a, b), questionWeight(stats))
+
+    def validQuestions(self):
+        """Every (a, b) problem that can be drawn."""
+        return list(self.__sampler.items)
+
+    def drawQuestion(self):
+        """Picks the next (a, b) problem, favoring problems that are often missed or answered slowly."""
+        return self.__sampler.draw()
+
+    def getQuestionStats(self, a:int, b:int):
+        """The running statistics of one question (None if it has no row)."""
+        return self.__stats.get((a, b))
 
     def writePerformanceResultsToFile(self, play_duration:float):
-        today = datetime.datetime.now().strftime('%Y-%m-%d')
-        try:
-            minutes_from_earlier_today = self.__df_daily_log.at[today,'Duration (Minutes)']
-            if minutes_from_earlier_today:
-                total_minutes_today = minutes_from_earlier_today+(play_duration/60)
-            else:
-                total_minutes_today = play_duration/60
-            self.__df_daily_log.at[today,'Duration (Minutes)']=total_minutes_today
-        except:
-            df_temp = pd.DataFrame({'Duration (Minutes)':[play_duration/60]}, index=[today])
-            self.__df_daily_log = pd.concat([self.__df_daily_log,df_temp])
+        """
+        Hands the changed questions, the new answers and the play time to the background writer,
+        which saves them in one transaction. Returns immediately.
+        """
         print("Writing Player Session Data to file")
-        with pd.ExcelWriter(self.__excel_filepath, engine='openpyxl', mode='a', if_sheet_exists='replace') as writer:
-            self.__df_performance.to_excel(writer, sheet_name='Performance', index=False)
-            self.__df_daily_log.to_excel(writer, sheet_name='Daily Log', index=True)
+        if not self.__session_answers and self.__writer.saved_seq >= self.__journal.last_seq:
+            self.__journal.truncate() # Everything journaled so far is in the database
+        question_rows = [self.__stats[key].toRow() for key in sorted(self.__changed_questions)]
+        self.__writer.submit(question_rows, self.__session_answers, play_duration/60, self.__journal.last_seq)
+        self.__session_answers = []
+        self.__changed_questions = set()
+
+    def flush(self, timeout:float=None):
+        """Waits for every save handed to the background writer to reach the database."""
+        return self.__writer.flush(timeout)
+
+    def close(self):
+        """Flush-on-exit hook: finishes pending saves and closes the files. Also runs at interpreter exit."""
+        if self.__closed:
+            return
+        self.__closed = True
+        self.__writer.close()
+        if self.__writer.saved_seq >= self.__journal.last_seq:
+            self.__journal.truncate()
+        else:
+            self.__journal.sync() # Unsaved answers stay in the journal for the next start
+        self.__journal.close()
+        self.__store.close()
+
+    def exportToExcel(self, excel_filepath:str):
+        """Saves pending results, then writes the whole profile as an .xlsx workbook."""
+        if self.__changed_questions:
+            self.writePerformanceResultsToFile(0)
+        self.__writer.flush()
+        self.__store.exportExcel(excel_filepath)
 
     def showResults(self):
         pass
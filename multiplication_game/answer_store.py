@@ -0,0 +1,267 @@
+import os
+import sqlite3
+import datetime
+import tempfile
+import functools
+from pathlib import Path
+import pandas as pd
+
+# Columns of the Excel 'Performance' sheet, in order, and the question_stats column each maps to
+PERFORMANCE_COLUMNS = {
+    'First': 'a',
+    'Second': 'b',
+    'Times Occurred': 'times_occurred',
+    'Times Wrong': 'times_wrong',
+    'Times Right': 'times_right',
+    'Avg Time to Answer': 'avg_time',
+    'Last Time to Answer': 'last_time',
+}
+
+# Every question_stats column, in order: the Performance columns plus the running aggregates
+# (sum of squared deviations for Welford's variance, streaks and the answer time sketch)
+STATS_COLUMNS = list(PERFORMANCE_COLUMNS.values()) + ['time_m2', 'streak', 'best_streak', 'time_sketch']
+_ADDED_STATS_COLUMNS = {'time_m2': 'REAL', 'streak': 'INTEGER', 'best_streak': 'INTEGER', 'time_sketch': 'BLOB'}
+
+# Columns of the answer history, as in the exported 'Answers' sheet
+ANSWER_COLUMNS = ['a', 'b', 'correct', 'seconds', 'answered_at']
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS focus_problems (
+    a INTEGER NOT NULL,
+    b INTEGER NOT NULL,
+    PRIMARY KEY (a, b)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS question_stats (
+    a INTEGER NOT NULL,
+    b INTEGER NOT NULL,
+    times_occurred INTEGER,
+    times_wrong INTEGER,
+    times_right INTEGER,
+    avg_time REAL,
+    last_time REAL,
+    time_m2 REAL,
+    streak INTEGER,
+    best_streak INTEGER,
+    time_sketch BLOB,
+    PRIMARY KEY (a, b)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS answers (
+    id INTEGER PRIMARY KEY,
+    a INTEGER NOT NULL,
+    b INTEGER NOT NULL,
+    correct INTEGER NOT NULL,
+    seconds REAL NOT NULL,
+    answered_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS answers_by_question ON answers (a, b);
+CREATE TABLE IF NOT EXISTS daily_log (
+    date TEXT PRIMARY KEY,
+    minutes REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value
+);
+"""
+
+class AnswerStore:
+    """
+    SQLite storage for one profile: the focus problems, per-question stats (one row per (a, b),
+    keyed by the primary key), the full per-answer history and the minutes played per day.
+    Excel workbooks in the old three-sheet layout can be imported and exported.
+    """
+    def __init__(self, db_filepath: Path):
+        self.db_filepath = Path(db_filepath)
+        self.__connection = sqlite3.connect(self.db_filepath)
+        self.__connection.executescript(SCHEMA)
+        self.__addMissingColumns()
+
+    def __addMissingColumns(self):
+        """Upgrades databases created before the running aggregates were stored."""
+        existing = {row[1] for row in self.__connection.execute("PRAGMA table_info(question_stats)")}
+        with self.__connection:
+            for column, column_type in _ADDED_STATS_COLUMNS.items():
+                if column not in existing:
+                    self.__connection.execute(f"ALTER TABLE question_stats ADD COLUMN {column} {column_type}")
+
+    @classmethod
+    def create(cls, db_filepath: Path, tables=range(1, 13)):
+        """
+        Creates a new profile where every problem of the given times tables is in focus.
+        A new file is written in one go from a template database built once per set of tables;
+        an existing database gets any missing rows added.
+        """
+        try:
+            with open(db_filepath, 'xb') as db_file:
+                db_file.write(_templateBytes(tuple(tables), _today()))
+        except FileExistsError:
+            store = cls(db_filepath)
+            store.addFocusTables(tables)
+            return store
+        return cls(db_filepath)
+
+    @classmethod
+    def openProfile(cls, profile_filepath: Path):
+        """Opens a profile for reading: its database, or a legacy .xlsx workbook imported into an in-memory store."""
+        profile_filepath = Path(profile_filepath)
+        if profile_filepath.suffix == '.xlsx':
+            store = cls(':memory:')
+            store.importExcel(profile_filepath)
+            return store
+        return cls(profile_filepath)
+
+    def addFocusTables(self, tables):
+        """Puts every problem of the given times tables (t x 1 to t x 12) in focus, with empty stats if it has none yet."""
+        pairs = [(a, b) for a in tables for b in range(1, 13)]
+        with self.__connection:
+            self.__connection.executemany("INSERT OR IGNORE INTO focus_problems VALUES (?, ?)", pairs)
+            self.__connection.executemany("INSERT OR IGNORE INTO question_stats (a, b) VALUES (?, ?)", pairs)
+            self.__connection.execute("INSERT OR IGNORE INTO daily_log VALUES (?, 0)", (_today(),))
+
+    # --- Reading ---
+
+    def loadFocusProblems(self) -> set:
+        return set(self.__connection.execute("SELECT a, b FROM focus_problems"))
+
+    def loadQuestionStats(self) -> list:
+        """Every question_stats row as a tuple in STATS_COLUMNS order."""
+        return self.__connection.execute(f"SELECT {', '.join(STATS_COLUMNS)} FROM question_stats").fetchall()
+
+    def loadPerformance(self) -> pd.DataFrame:
+        """Per-question stats in the layout of the Excel 'Performance' sheet, in (a, b) order."""
+        columns = ', '.join(PERFORMANCE_COLUMNS.values())
+        rows = self.__connection.execute(f"SELECT {columns} FROM question_stats ORDER BY a, b").fetchall()
+        return pd.DataFrame(rows, columns=list(PERFORMANCE_COLUMNS.keys()))
+
+    def loadDailyLog(self) -> pd.DataFrame:
+        rows = self.__connection.execute("SELECT date, minutes FROM daily_log ORDER BY date").fetchall()
+        return pd.DataFrame({'Duration (Minutes)': [minutes for _, minutes in rows]},
+                            index=pd.Index([date for date, _ in rows], name='Date'))
+
+    def loadJournalSeq(self) -> int:
+        """Sequence number of the last journaled answer that is in the database."""
+        row = self.__connection.execute("SELECT value FROM meta WHERE key = 'journal_seq'").fetchone()
+        return int(row[0]) if row else 0
+
+    def loadAnswers(self, a: int = None, b: int = None) -> pd.DataFrame:
+        """The answer history, optionally for one question only (uses the (a, b) index)."""
+        query = f"SELECT {', '.join(ANSWER_COLUMNS)} FROM answers"
+        params = ()
+        if a is not None and b is not None:
+            query += " WHERE a = ? AND b = ?"
+            params = (a, b)
+        return pd.read_sql_query(query + " ORDER BY id", self.__connection, params=params)
+
+    def loadSummary(self) -> dict:
+        """Headline numbers shown on the profile's card in the menu (see profile_index.ProfileIndex)."""
+        answers, right = self.__connection.execute(
+            "SELECT COALESCE(SUM(times_occurred), 0), COALESCE(SUM(times_right), 0) FROM question_stats").fetchone()
+        last_day = self.__connection.execute(
+            "SELECT date, minutes FROM daily_log WHERE minutes > 0 ORDER BY date DESC LIMIT 1").fetchone()
+        minutes_total = self.__connection.execute("SELECT COALESCE(SUM(minutes), 0) FROM daily_log").fetchone()[0]
+        return {
+            'answers': int(answers),
+            'right': int(right),
+            'last_played': last_day[0] if last_day else None,
+            'last_played_minutes': float(last_day[1]) if last_day else 0.0,
+            'minutes_total': float(minutes_total),
+        }
+
+    # --- Writing ---
+
+    def saveSession(self, question_rows: list, answers: list, minutes_played: float, day: str = None,
+                    journal_seq: int = None):
+        """
+        Writes one session in a single transaction.
+        question_rows: tuples in STATS_COLUMNS order
+        answers: (a, b, correct, seconds, answered_at) tuples to append to the history
+        journal_seq: last journal entry these answers cover (see persistence.AnswerJournal)
+        """
+        placeholders = ', '.join('?' * len(STATS_COLUMNS))
+        with self.__connection:
+            self.__connection.executemany(
+                f"INSERT OR REPLACE INTO question_stats ({', '.join(STATS_COLUMNS)}) VALUES ({placeholders})", question_rows)
+            self.__connection.executemany(
+                "INSERT INTO answers (a, b, correct, seconds, answered_at) VALUES (?, ?, ?, ?, ?)", answers)
+            self.__connection.execute(
+                "INSERT INTO daily_log VALUES (?, ?) ON CONFLICT(date) DO UPDATE SET minutes = minutes + excluded.minutes",
+                (day or _today(), minutes_played))
+            if journal_seq is not None:
+                self.__connection.execute("INSERT OR REPLACE INTO meta VALUES ('journal_seq', ?)", (journal_seq,))
+
+    def close(self):
+        self.__connection.close()
+
+    # --- Excel import/export ---
+
+    def importExcel(self, excel_filepath: Path):
+        """
+        Replaces this store's contents with a workbook in the old three-sheet layout. The answer
+        history comes from the 'Answers' sheet that exportExcel adds, when the workbook has one.
+        """
+        try:
+            with pd.ExcelFile(excel_filepath) as workbook:
+                df_focus = pd.read_excel(workbook, sheet_name='Focus Problems', index_col=0)
+                df_performance = pd.read_excel(workbook, sheet_name='Performance')
+                df_daily_log = pd.read_excel(workbook, sheet_name='Daily Log', index_col=0)
+                df_answers = pd.read_excel(workbook, sheet_name='Answers') if 'Answers' in workbook.sheet_names else None
+        except PermissionError as e:
+            raise PermissionError(f"Please make sure you don't have the file {excel_filepath} open in another program.  {e}")
+
+        focus = [(int(a), int(b)) for a in df_focus.index for b in df_focus.columns if pd.notna(df_focus.at[a, b])]
+        question_rows = [tuple(toSqlValue(value) for value in row)
+                         for row in df_performance[list(PERFORMANCE_COLUMNS.keys())].itertuples(index=False)]
+        daily = [(str(date)[:10], float(minutes) if pd.notna(minutes) else 0.0)
+                 for date, minutes in df_daily_log['Duration (Minutes)'].items()]
+        answers = []
+        if df_answers is not None:
+            answers = [(int(a), int(b), int(correct), float(seconds), str(answered_at))
+                       for a, b, correct, seconds, answered_at in df_answers[ANSWER_COLUMNS].itertuples(index=False)]
+        with self.__connection:
+            for table in ('focus_problems', 'question_stats', 'daily_log', 'answers'):
+                self.__connection.execute(f"DELETE FROM {table}")
+            self.__connection.executemany("INSERT INTO focus_problems VALUES (?, ?)", focus)
+            self.__connection.executemany(
+                f"INSERT INTO question_stats ({', '.join(PERFORMANCE_COLUMNS.values())}) VALUES (?, ?, ?, ?, ?, ?, ?)", question_rows)
+            self.__connection.executemany(
+                "INSERT INTO daily_log VALUES (?, ?) ON CONFLICT(date) DO UPDATE SET minutes = minutes + excluded.minutes", daily)
+            self.__connection.executemany(
+                f"INSERT INTO answers ({', '.join(ANSWER_COLUMNS)}) VALUES (?, ?, ?, ?, ?)", answers)
+
+    def exportExcel(self, excel_filepath: Path):
+        """Writes the profile as a workbook in the old three-sheet layout (to a temp file, then renamed into place)."""
+        focus = self.loadFocusProblems()
+        df_focus = pd.DataFrame({b: ['X' if (a, b) in focus else None for a in range(1, 13)] for b in range(1, 13)},
+                                index=range(1, 13))
+        df_daily_log = self.loadDailyLog()
+        excel_filepath = Path(excel_filepath)
+        temp_filepath = excel_filepath.with_name(excel_filepath.name + '.tmp')
+        with pd.ExcelWriter(temp_filepath, engine='openpyxl', mode='w') as writer:
+            df_focus.to_excel(writer, sheet_name='Focus Problems', index=True)
+            self.loadPerformance().to_excel(writer, sheet_name='Performance', index=False)
+            df_daily_log.to_excel(writer, sheet_name='Daily Log', index=True)
+            self.loadAnswers().to_excel(writer, sheet_name='Answers', index=False)
+        os.replace(temp_filepath, excel_filepath)
+
+def profilePath(data_dir: Path, profile_name: str) -> Path:
+    """Path of a profile's database."""
+    return Path(data_dir).joinpath(f"{profile_name}.db")
+
+@functools.lru_cache(maxsize=4)
+def _templateBytes(tables: tuple, day: str) -> bytes:
+    """Contents of a new profile database for the given tables, created on the given day."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        template_filepath = Path(temp_dir).joinpath('template.db')
+        store = AnswerStore(template_filepath)
+        store.addFocusTables(tables)
+        store.close()
+        return template_filepath.read_bytes()
+
+def _today() -> str:
+    return datetime.datetime.now().strftime('%Y-%m-%d')
+
+def toSqlValue(value):
+    """Converts pandas/NumPy cell values to plain Python values (NaN becomes NULL)."""
+    if pd.isna(value):
+        return None
+    return value.item() if hasattr(value, 'item') else value
@@ -0,0 +1,192 @@
+"""
+Class-wide results across every profile in the data folder, written to one workbook:
+
+    python class_report.py [--data-dir DIR] [--output FILE] [--workers N]
+
+Sheets: per-fact accuracy and answer times, an accuracy grid, per-student totals and the
+daily minutes played by the class. Profiles are loaded in parallel by a process pool.
+"""
+import os
+import time
+import argparse
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from answer_store import AnswerStore
+from analytics import QuestionStats, TimeSketch
+from profile_index import profileSources
+
+TABLES = 12
+
+def loadProfileResults(profile_filepath: Path) -> dict:
+    """
+    Reads one profile into arrays indexed [a - 1, b - 1]. Runs in a worker process, so it returns
+    plain picklable data; a profile that cannot be read comes back with an 'error' instead.
+    """
+    profile_filepath = Path(profile_filepath)
+    results = {
+        'name': profile_filepath.stem,
+        'occurred': np.zeros((TABLES, TABLES), np.int64),
+        'right': np.zeros((TABLES, TABLES), np.int64),
+        'time_total': np.zeros((TABLES, TABLES)), # Sum of answer times, from each fact's average
+        'timed': np.zeros((TABLES, TABLES), np.int64), # Answers the time total covers
+        'sketch': np.zeros((TABLES, TABLES, TimeSketch.BUCKETS), np.int64),
+        'daily_minutes': {},
+    }
+    try:
+        store = AnswerStore.openProfile(profile_filepath)
+        try:
+            question_rows = store.loadQuestionStats()
+            df_daily_log = store.loadDailyLog()
+        finally:
+            store.close()
+    except Exception as e:
+        results['error'] = str(e)
+        return results
+
+    for row in question_rows:
+        stats = QuestionStats(*row)
+        if not (1 <= stats.a <= TABLES and 1 <= stats.b <= TABLES) or stats.times_occurred == 0:
+            continue
+        fact = (stats.a - 1, stats.b - 1)
+        results['occurred'][fact] = stats.times_occurred
+        results['right'][fact] = stats.times_right
+        if stats.avg_time is not None:
+            results['time_total'][fact] = stats.avg_time * stats.times_occurred
+            results['timed'][fact] = stats.times_occurred
+        results['sketch'][fact] = stats.time_sketch.counts # Empty for profiles imported from Excel
+    results['daily_minutes'] = {str(date)[:10]: float(minutes)
+                                for date, minutes in df_daily_log['Duration (Minutes)'].items() if minutes}
+    return results
+
+def loadClass(profile_filepaths: list, workers: int) -> list:
+    """Loads every profile, printing progress. A single worker loads in this process (no pool start-up)."""
+    total = len(profile_filepaths)
+    report_every = max(1, total // 10)
+    start = time.perf_counter()
+    print(f"Loading {total} profiles with {workers} worker{'s' if workers != 1 else ''}")
+
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        if pool is None:
+            loaded = map(loadProfileResults, profile_filepaths)
+        else:
+            # A few chunks per worker keeps every worker busy without a round trip per profile
+            loaded = pool.map(loadProfileResults, profile_filepaths, chunksize=max(1, total // (workers * 4)))
+        results = []
+        for done, profile_results in enumerate(loaded, start=1):
+            results.append(profile_results)
+            if done % report_every == 0 or done == total:
+                elapsed = time.perf_counter() - start
+                print(f"[{done}/{total}] profiles loaded, {done / elapsed:.0f} per second")
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    for profile_results in results:
+        if 'error' in profile_results:
+            print(f"Could not read profile {profile_results['name']}: {profile_results['error']}")
+    return [profile_results for profile_results in results if 'error' not in profile_results]
+
+def factSheet(results: list) -> pd.DataFrame:
+    """One row per fact: how many students met it, answers, accuracy and answer times across the class."""
+    occurred = sum(r['occurred'] for r in results)
+    right = sum(r['right'] for r in results)
+    time_total = sum(r['time_total'] for r in results)
+    timed = sum(r['timed'] for r in results)
+    sketch = sum(r['sketch'] for r in results)
+    students = sum((r['occurred'] > 0).astype(np.int64) for r in results)
+
+    a, b = np.indices((TABLES, TABLES)) + 1
+    with np.errstate(invalid='ignore', divide='ignore'):
+        accuracy = np.where(occurred > 0, 100 * right / occurred, np.nan)
+        avg_time = np.where(timed > 0, time_total / timed, np.nan)
+    # Summed sketches are the sketch of every student's answers together
+    sketches = [TimeSketch(counts.astype(np.uint32).tobytes()) for counts in sketch.reshape(-1, TimeSketch.BUCKETS)]
+    median = [s.percentile(50) for s in sketches]
+    p90 = [s.percentile(90) for s in sketches]
+    return pd.DataFrame({
+        'First': a.ravel(),
+        'Second': b.ravel(),
+        'Students': students.ravel(),
+        'Answers': occurred.ravel(),
+        'Accuracy (%)': accuracy.ravel().round(1),
+        'Avg Time to Answer': avg_time.ravel().round(2),
+        'Median Time': pd.array(median, dtype='Float64').round(2),
+        '90th Percentile Time': pd.array(p90, dtype='Float64').round(2),
+    })
+
+def accuracyGrid(df_facts: pd.DataFrame) -> pd.DataFrame:
+    """Accuracy per fact in the 12 x 12 layout of the 'Focus Problems' sheet."""
+    return df_facts.pivot(index='First', columns='Second', values='Accuracy (%)')
+
+def studentSheet(results: list) -> pd.DataFrame:
+    rows = []
+    for r in results:
+        answers = int(r['occurred'].sum())
+        days = sorted(r['daily_minutes'])
+        rows.append({
+            'Student': r['name'],
+            'Answers': answers,
+            'Accuracy (%)': round(100 * int(r['right'].sum()) / answers, 1) if answers else None,
+            'Minutes Played': round(sum(r['daily_minutes'].values()), 1),
+            'Days Played': len(days),
+            'Last Played': days[-1] if days else None,
+        })
+    return pd.DataFrame(rows, columns=['Student', 'Answers', 'Accuracy (%)', 'Minutes Played', 'Days Played', 'Last Played'])
+
+def dailySheet(results: list) -> pd.DataFrame:
+    """Minutes the class played per calendar day (days nobody played included), with a 7-day trend."""
+    df_minutes = pd.DataFrame([r['daily_minutes'] for r in results])
+    if df_minutes.empty:
+        return pd.DataFrame(columns=['Students Playing', 'Total Minutes', 'Minutes per Student Playing', '7-Day Avg Minutes'])
+    df_minutes.columns = pd.to_datetime(df_minutes.columns)
+    df_minutes = df_minutes.T.sort_index()
+    days = pd.date_range(df_minutes.index.min(), df_minutes.index.max(), freq='D')
+    df_minutes = df_minutes.reindex(days)
+    total = df_minutes.sum(axis=1)
+    playing = df_minutes.count(axis=1)
+    df_daily = pd.DataFrame({
+        'Students Playing': playing,
+        'Total Minutes': total.round(1),
+        'Minutes per Student Playing': (total / playing.where(playing > 0)).round(1),
+        '7-Day Avg Minutes': total.rolling(7, min_periods=1).mean().round(1),
+    })
+    df_daily.index = df_daily.index.strftime('%Y-%m-%d')
+    df_daily.index.name = 'Date'
+    return df_daily
+
+def writeReport(results: list, report_filepath: Path):
+    """Writes the class report workbook (to a temp file, then renamed into place)."""
+    df_facts = factSheet(results)
+    report_filepath = Path(report_filepath)
+    temp_filepath = report_filepath.with_name(report_filepath.name + '.tmp')
+    with pd.ExcelWriter(temp_filepath, engine='openpyxl', mode='w') as writer:
+        df_facts.to_excel(writer, sheet_name='Facts', index=False)
+        accuracyGrid(df_facts).to_excel(writer, sheet_name='Accuracy Grid', index=True)
+        studentSheet(results).to_excel(writer, sheet_name='Students', index=False)
+        dailySheet(results).to_excel(writer, sheet_name='Daily Minutes', index=True)
+    os.replace(temp_filepath, report_filepath)
+
+if __name__ == '__main__':
+    app_dir = Path(__file__).parent
+    parser = argparse.ArgumentParser(description="Write a class-wide report of every Multiplication Asteroids profile")
+    parser.add_argument('--data-dir', type=Path, default=app_dir.joinpath("data"),
+                        help="profile folder (default: the game's data folder)")
+    # Not inside the data folder, where an .xlsx would be listed as a profile
+    parser.add_argument('--output', type=Path, default=app_dir.joinpath("class_report.xlsx"),
+                        help="report workbook to write (default: class_report.xlsx next to the game)")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help="processes loading profiles (default: one per CPU)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    profile_filepaths = sorted(profileSources(args.data_dir).values())
+    if not profile_filepaths:
+        parser.exit(1, f"No profiles in {args.data_dir}\n")
+    results = loadClass(profile_filepaths, max(1, args.workers))
+    if not results:
+        parser.exit(1, "None of the profiles could be read\n")
+    writeReport(results, args.output)
+    print(f"Wrote {args.output} for {len(results)} students in {time.perf_counter() - start:.2f}s")
@@ -1,10 +1,23 @@
 import pygame
 import random
+import numpy as np
 import sys
 import time
+import argparse
+from collections import OrderedDict
 from pathlib import Path
 from analytics import UserProfile
+from answer_store import profilePath
 from menu import MenuSystem
+from text_cache import render_text
+from idle import next_events, changes_screen
+
+# --- Command Line ---
+parser = argparse.ArgumentParser(description="Multiplication Shooter: Asteroid Defense")
+parser.add_argument('--wave', type=int, default=0, metavar='SIZE',
+                    help="wave mode: keep SIZE asteroids falling at once (default: one at a time)")
+args, _ = parser.parse_known_args()
+WAVE_SIZE = args.wave
 
 # --- Pygame Initialization ---
 pygame.init()
@@ -60,13 +73,13 @@ asteroid_sprites = [
 ship_sprite = pygame.image.load(sprite_dir.joinpath('ship.png')).convert_alpha()
 
 # Profile Select Menu
-menu = MenuSystem(data_dir, screen, font_large, font_medium)
+menu = MenuSystem(data_dir, screen, font_large, font_medium, font_small)
 selected_profile_name = menu.profile_menu()
 #user_profile = UserProfile(data_dir.joinpath("dave.xlsx"))
 
 # Check if a profile was selected or created
 if selected_profile_name:
-    profile_filename = data_dir.joinpath(f"{selected_profile_name}.xlsx")
+    profile_filename = profilePath(data_dir, selected_profile_name)
     # This will either load the existing file or create a new one
     user_profile = UserProfile(profile_filename) 
     #print(f"Game loaded with profile: {user_profile.filepath.name}")
@@ -78,14 +91,13 @@ else:
 
 # --- Utility Functions ---
 
+def problem_string(a, b):
+    return f"{a} \u00D7 {b}" # \u00D7 is the multiplication sign
+
 def generate_problem():
-    """Generates a random multiplication problem (1-12 tables)."""
-    valid_problem=False
-    while (not valid_problem):
-        a = random.randint(1, 12)
-        b = random.randint(1, 12)
-        valid_problem = user_profile.isQuestionValid(a,b)
-    problem = f"{a} \u00D7 {b}" # \u00D7 is the multiplication sign
+    """Generates a multiplication problem (1-12 tables) from the profile's focus problems."""
+    a, b = user_profile.drawQuestion()
+    problem = problem_string(a, b)
     answer = a * b
     return problem, a, b, answer
 
@@ -114,36 +126,86 @@ class SpriteSheet:
         
         return image_segment
 
+class AsteroidImageCache:
+    """
+    Finished asteroid images (rock sprite with the problem text) keyed by (sprite variant, problem).
+    Images are built on first use, or ahead of time with `warm`, and evicted least recently used
+    first once the cache holds more than max_bytes of pixels.
+    """
+    def __init__(self, radius, max_bytes=16 * 1024 * 1024):
+        self.radius = radius
+        self.max_bytes = max_bytes
+        self.__images = OrderedDict()
+        self.__bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __build(self, variant, problem_str):
+        image = pygame.Surface([self.radius * 2, self.radius * 2], pygame.SRCALPHA)
+        image.blit(asteroid_sprites[variant], (0, 0))
+        # Add the problem text
+        # Rendered directly: the finished image is what gets cached
+        font_medium.set_bold(True)
+        text_surface = font_medium.render(problem_str, True, YELLOW)
+        font_medium.set_bold(False)
+        text_rect = text_surface.get_rect(center=(self.radius, self.radius))
+        image.blit(text_surface, text_rect)
+        return image
+
+    def get(self, variant, problem_str):
+        key = (variant, problem_str)
+        image = self.__images.get(key)
+        if image is not None:
+            self.hits += 1
+            self.__images.move_to_end(key)
+            return image
+        self.misses += 1
+        image = self.__build(variant, problem_str)
+        self.__images[key] = image
+        self.__bytes += image.get_width() * image.get_height() * image.get_bytesize()
+        while self.__bytes > self.max_bytes and len(self.__images) > 1:
+            _, evicted = self.__images.popitem(last=False)
+            self.__bytes -= evicted.get_width() * evicted.get_height() * evicted.get_bytesize()
+        return image
+
+    def warm(self, problems):
+        """Builds the images of every sprite variant for the given problem strings."""
+        for problem_str in problems:
+            for variant in range(len(asteroid_sprites)):
+                self.get(variant, problem_str)
+        self.misses = 0
+
 # --- Game Objects ---
 
 class Asteroid(pygame.sprite.Sprite):
     """Represents an asteroid carrying a math problem."""
-    def __init__(self, speed = ASTEROID_SPEED):
+    def __init__(self, speed = ASTEROID_SPEED, start_y = None):
         super().__init__()
         self.problem_str, a, b, self.answer = generate_problem()
         self.a=a
         self.b=b
-        self.start_time=time.time()
+        self.start_time=time.time() # Reset when the asteroid comes into view, so answer times only count visible time
         self.stop_time = self.start_time
-        self.radius = 40
-        self.image = pygame.Surface([self.radius * 2, self.radius * 2], pygame.SRCALPHA)
-        #pygame.draw.circle(self.image, (150, 150, 150), (self.radius, self.radius), self.radius)
-        self.image.blit(asteroid_sprites[random.randint(0,len(asteroid_sprites)-1)],(0,0))
-        # Add the problem text
-        font_medium.set_bold(True)
-        text_surface = font_medium.render(self.problem_str, True, YELLOW)
-        font_medium.set_bold(False)
-        text_rect = text_surface.get_rect(center=(self.radius, self.radius))
-        self.image.blit(text_surface, text_rect)
+        self.on_screen = False
+        self.radius = asteroid_images.radius
+        # Shared pre-composited image; sprites never draw on it
+        self.image = asteroid_images.get(random.randint(0,len(asteroid_sprites)-1), self.problem_str)
 
         self.rect = self.image.get_rect()
         self.rect.x = random.randrange(2*self.radius, SCREEN_WIDTH - (2*self.radius))
-        self.rect.y = -self.radius * 2  # Start off-screen
+        self.rect.y = -self.radius * 2 if start_y is None else start_y  # Start off-screen
+        self.pos_y = float(self.rect.y) # Rect positions are integers; slow speeds need the fraction kept
         self.speed = speed
+        self.targeted = False # A homing projectile is already on its way (wave mode)
 
     def update(self):
         """Moves the asteroid down."""
-        self.rect.y += self.speed
+        self.pos_y += self.speed
+        self.rect.y = int(self.pos_y)
+        if (not self.on_screen) and (self.rect.bottom > HUD_HEIGHT):
+            # First frame the asteroid shows below the HUD: the problem can be read from now on
+            self.on_screen = True
+            self.start_time = time.time()
         if self.rect.bottom > SCREEN_RENDER_HEIGHT:
             global game_over
             self.stop_time=time.time()
@@ -172,6 +234,90 @@ class Projectile(pygame.sprite.Sprite):
         if self.rect.bottom < 0:
             self.kill()
 
+class HomingProjectile(Projectile):
+    """A projectile that steers toward the asteroid whose answer was typed (wave mode)."""
+    def __init__(self, x, y, target):
+        super().__init__(x, y)
+        self.target = target
+        self.pos = pygame.math.Vector2(self.rect.center)
+        self.velocity = pygame.math.Vector2(0, -self.speed)
+
+    def update(self):
+        """Turns toward the target's current position, or keeps going straight once it is gone."""
+        if self.target.alive():
+            to_target = pygame.math.Vector2(self.target.rect.center) - self.pos
+            if to_target.length_squared() > 0:
+                self.velocity = to_target.normalize() * self.speed
+        self.pos += self.velocity
+        self.rect.center = (round(self.pos.x), round(self.pos.y))
+        if (self.rect.bottom < 0) | (self.rect.top > SCREEN_HEIGHT) | (self.rect.right < 0) | (self.rect.left > SCREEN_WIDTH):
+            self.kill()
+
+    def kill(self):
+        """Removes the projectile; a target it did not hit can be targeted again."""
+        if self.target.alive():
+            self.target.targeted = False
+        super().kill()
+
+class AsteroidWave:
+    """
+    Wave mode: keeps `size` asteroids falling at once.
+    Live asteroids are indexed by answer, so resolving a typed answer only looks at the asteroids
+    with that answer (the one nearest the ground is picked first). Every projectile is bound to
+    its target, so the hit check runs over the projectiles in flight and never over the whole wave.
+    """
+    def __init__(self, size, asteroids, all_sprites):
+        self.size = size
+        self.asteroids = asteroids
+        self.all_sprites = all_sprites
+        self.by_answer = {} # answer -> list of live asteroids
+
+    def spawn(self, start_y=None):
+        if start_y is None:
+            # Stagger new asteroids above the screen so they do not arrive together
+            start_y = -asteroid_images.radius * 2 - random.randint(0, SCREEN_RENDER_HEIGHT)
+        asteroid = Asteroid(speed=random.uniform(.3, 1.0), start_y=start_y)
+        self.asteroids.add(asteroid)
+        self.all_sprites.add(asteroid)
+        self.by_answer.setdefault(asteroid.answer, []).append(asteroid)
+        return asteroid
+
+    def fill(self):
+        """Spawns asteroids until the wave is full again."""
+        while len(self.asteroids) < self.size:
+            self.spawn()
+
+    def remove(self, asteroid):
+        asteroid.kill()
+        candidates = self.by_answer.get(asteroid.answer)
+        if candidates is not None:
+            candidates.remove(asteroid)
+            if not candidates:
+                del self.by_answer[asteroid.answer]
+
+    def target_for(self, answer):
+        """The untargeted on-screen asteroid with this answer that is nearest the ground, or None."""
+        # Asteroids still above the screen cannot be read, and a shot would leave the screen before reaching them
+        candidates = [asteroid for asteroid in self.by_answer.get(answer, ())
+                      if asteroid.on_screen and not asteroid.targeted]
+        if not candidates:
+            return None
+        target = max(candidates, key=lambda asteroid: asteroid.rect.bottom)
+        target.targeted = True
+        return target
+
+    def resolve_hits(self, projectiles):
+        """Removes every asteroid hit by its homing projectile and returns the asteroids hit."""
+        hits = [projectile for projectile in projectiles.sprites()
+                if projectile.target.alive() and projectile.rect.colliderect(projectile.target.rect)]
+        for projectile in hits:
+            self.remove(projectile.target)
+            projectile.kill()
+        return [projectile.target for projectile in hits]
+
+    def lowest(self):
+        return max(self.asteroids, key=lambda asteroid: asteroid.rect.bottom)
+
 class Gun:
     """Represents the player's fixed cannon."""
     def __init__(self):
@@ -219,13 +365,12 @@ class Gun:
             self.fizzle_effect = False
 
 class StarField:
-    def __init__(self):
-        self.__star_sprites = [
-            [], # Medium Stars
-            [], # Large Stars
-            [], # Small Stars
-            [] # Smallest Stars
-        ]
+    """
+    Parallax star background. Stars are stored as NumPy arrays (x, y, speed, sprite index), moved
+    and wrapped in one vectorized step per frame and drawn with a single Surface.blits call.
+    density multiplies the number of stars in every band.
+    """
+    def __init__(self, density=1):
         star_ratio = [5, 2, 20, 100]   # by column index: Medium, Large, Small, Smallest...  For every 100 smallest stars, there are 2 Large and 5 Medium stars...
         star_speed = [.25, .5, .125, .06] # by column index: Medium, Large, Small, Smallest... Smallest stars are furthest away and slowest
 
@@ -234,50 +379,55 @@ class StarField:
         SPRITE_HEIGHT=8
         star_spritesheet = SpriteSheet(sprite_dir.joinpath('stars.png'))
 
+        # One scaled sprite per (size, color); stars refer to them by index.
+        # Sprites are cropped to their visible pixels (most of each frame is transparent) and
+        # drawn at an offset, which keeps the per-star blit small.
+        self.__sprites = []
+        sprite_offsets = []
+        for star_size in range(len(star_ratio)):
+            for color_id in range(STAR_ROWS):
+                star_sprite = star_spritesheet.get_image(star_size*self.__SPRITE_WIDTH, color_id*SPRITE_HEIGHT, self.__SPRITE_WIDTH, SPRITE_HEIGHT)
+                # Scale it up x2
+                star_sprite = pygame.transform.scale(star_sprite, (self.__SPRITE_WIDTH * 2, SPRITE_HEIGHT * 2))
+                visible = star_sprite.get_bounding_rect()
+                self.__sprites.append(star_sprite.subsurface(visible).copy())
+                sprite_offsets.append(visible.topleft)
 
         # Build Initial Star Field
-        
-        for star_size, star_num in enumerate(star_ratio):
-            for star_id in range(star_num): # Create a star of the appropriate size following the ratio list
-                color_id = random.randint(0,STAR_ROWS-1) # Select random star color
-                spritesheet_frame_x=star_size*self.__SPRITE_WIDTH
-                spritesheet_frame_y=color_id*SPRITE_HEIGHT
-                
-                # Extract the sprite
-                star_sprite = star_spritesheet.get_image(spritesheet_frame_x, spritesheet_frame_y, self.__SPRITE_WIDTH, SPRITE_HEIGHT)
-                y = random.randint(HUD_HEIGHT-8,SCREEN_RENDER_HEIGHT-8)  # Each star sprite is 8px
-                x = random.randint(-self.__SPRITE_WIDTH,SCREEN_WIDTH)
-
-                # 2. Get the current size
-                w = star_sprite.get_width()
-                h = star_sprite.get_height()
-
-                # 3. Scale it up x4
-                # pygame.transform.scale(image, (new_width, new_height))
-                star_sprite = pygame.transform.scale(star_sprite, (w * 2, h * 2))
-
-                self.__star_sprites[star_size].append({'sprite':star_sprite, 'x':x, 'y':y, 'speed':star_speed[star_size]})
+        counts = [star_num * density for star_num in star_ratio]
+        star_size = np.repeat(np.arange(len(star_ratio)), counts)
+        count = len(star_size)
+        self.__rng = np.random.default_rng()
+        self.__speed = np.array(star_speed)[star_size]
+        self.__sprite_index = star_size * STAR_ROWS + self.__rng.integers(0, STAR_ROWS, count) # Random star color
+        self.__x = self.__rng.integers(-self.__SPRITE_WIDTH, SCREEN_WIDTH, count, endpoint=True).astype(float)
+        self.__y = self.__rng.integers(HUD_HEIGHT-8, SCREEN_RENDER_HEIGHT-8, count, endpoint=True).astype(float) # Each star sprite is 8px
+        # Per-star sprite list in drawing order (bands in the same order as before)
+        self.__star_sprites = [self.__sprites[i] for i in self.__sprite_index]
+        self.__offsets = np.array(sprite_offsets, dtype=float)[self.__sprite_index]
 
     def update(self):
-        for sprite_group_id in range(len(self.__star_sprites)):
-            for sprite_id in range(len(self.__star_sprites[sprite_group_id])):
-                this_sprite = self.__star_sprites[sprite_group_id][sprite_id]
-                if this_sprite['y']>=SCREEN_RENDER_HEIGHT:
-                    self.__star_sprites[sprite_group_id][sprite_id].update({'y':HUD_HEIGHT-8, 'x':random.randint(-self.__SPRITE_WIDTH,SCREEN_WIDTH)})
-                else:
-                    self.__star_sprites[sprite_group_id][sprite_id].update({'y':(this_sprite['y']+this_sprite['speed'])})
-                
+        # Stars that reached the bottom restart at the top at a new x; the others move down
+        wrapped = self.__y >= SCREEN_RENDER_HEIGHT
+        self.__y += self.__speed
+        if wrapped.any():
+            self.__y[wrapped] = HUD_HEIGHT-8
+            self.__x[wrapped] = self.__rng.integers(-self.__SPRITE_WIDTH, SCREEN_WIDTH, int(wrapped.sum()), endpoint=True)
+
     def draw(self, screen):
-        for sprite_group in self.__star_sprites:
-            for sprite in sprite_group:
-                screen.blit(sprite['sprite'], (sprite['x'], sprite['y']))
+        positions = (np.stack((self.__x, self.__y), axis=1) + self.__offsets).astype(int).tolist()
+        screen.blits(zip(self.__star_sprites, positions), doreturn=False)
 
 
 # --- Game Setup ---
 
+# Asteroid images for every focus problem are built up front so spawning is a dictionary lookup
+asteroid_images = AsteroidImageCache(radius=40)
+asteroid_images.warm([problem_string(a, b) for a, b in user_profile.validQuestions()])
+
 def initialize_game():
     """Sets up initial game state and objects."""
-    global score, game_over, current_input, all_sprites, asteroids, projectiles, game_time_start, game_time_stop
+    global score, game_over, current_input, all_sprites, asteroids, projectiles, game_time_start, game_time_stop, wave
     
 
 
@@ -290,10 +440,17 @@ def initialize_game():
     projectiles = pygame.sprite.Group()
     
     
-    # Create the first asteroid
-    new_asteroid = Asteroid()
-    asteroids.add(new_asteroid)
-    all_sprites.add(new_asteroid)
+    if WAVE_SIZE > 0:
+        # Wave mode: the first asteroid enters right away, the rest are staggered above the screen
+        wave = AsteroidWave(WAVE_SIZE, asteroids, all_sprites)
+        new_asteroid = wave.spawn(start_y=-asteroid_images.radius * 2)
+        wave.fill()
+    else:
+        # Create the first asteroid
+        wave = None
+        new_asteroid = Asteroid()
+        asteroids.add(new_asteroid)
+        all_sprites.add(new_asteroid)
     
     # Create the gun
     gun = Gun()
@@ -321,55 +478,60 @@ def draw_input_box(surface, input_text, is_fizzling):
     pygame.draw.rect(surface, WHITE, input_box_rect, 2, border_radius=5) # Border
 
     # Render input text
-    text_surface = font_medium.render(input_text, True, WHITE)
+    text_surface = render_text(font_medium, input_text, WHITE)
     text_rect = text_surface.get_rect(center=input_box_rect.center)
     surface.blit(text_surface, text_rect)
 
     # Instruction text
-    instruction_text = font_small.render("Enter Answer and Press ENTER", True, WHITE)
+    instruction_text = render_text(font_small, "Enter Answer and Press ENTER", WHITE)
     surface.blit(instruction_text, (input_box_rect.right + 10, input_box_rect.top+10))
 
 def draw_hud(surface):
     """Draws score and other UI elements."""
     HUD_backdrop = pygame.Rect(0,0,SCREEN_WIDTH, HUD_HEIGHT)
     pygame.draw.rect(surface, BLACK, HUD_backdrop, border_radius=0)
-    score_text = font_medium.render(f"Score: {score}", True, WHITE)
+    score_text = render_text(font_medium, f"Score: {score}", WHITE)
     surface.blit(score_text, (10, 10))
 
 def draw_game_over(surface, current_asteroid:Asteroid):
     """Draws the game over screen."""
     surface.fill(BLACK)
 
-    problem_text = font_large.render(f"{current_asteroid.problem_str} = {current_asteroid.answer}", True, RED)
+    problem_text = render_text(font_large, f"{current_asteroid.problem_str} = {current_asteroid.answer}", RED)
     problem_rect = problem_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 100))
     surface.blit(problem_text, problem_rect)
 
-    title_text = font_large.render("GAME OVER", True, RED)
+    title_text = render_text(font_large, "GAME OVER", RED)
     title_rect = title_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 50))
     surface.blit(title_text, title_rect)
 
-    score_text = font_medium.render(f"Final Score: {score}", True, WHITE)
+    score_text = render_text(font_medium, f"Final Score: {score}", WHITE)
     score_rect = score_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 10))
     surface.blit(score_text, score_rect)
     
-    restart_text = font_small.render("Press R to Restart or Q to Quit", True, YELLOW)
+    restart_text = render_text(font_small, "Press R to Restart or Q to Quit", YELLOW)
     restart_rect = restart_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 60))
     surface.blit(restart_text, restart_rect)
 
 def draw_game_paused(surface):
     surface.fill(BLACK)
 
-    title_text = font_large.render("PAUSED", True, WHITE)
+    title_text = render_text(font_large, "PAUSED", WHITE)
     title_rect = title_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 50))
     surface.blit(title_text, title_rect)
 
 # --- Game Loop ---
 running = True
+# The pause and game over screens are static: they are drawn once per change and the loop
+# otherwise sleeps in pygame.event.wait instead of redrawing at 60 FPS
+screen_dirty = True
 
 while running:
     
     # --- Event Handling ---
-    for event in pygame.event.get():
+    for event in next_events(idle=(game_over | game_paused) and not screen_dirty):
+        if changes_screen(event):
+            screen_dirty = True
         if event.type == pygame.QUIT:
             game_time_stop = time.time()
             play_duration=game_time_stop-game_time_start
@@ -423,7 +585,16 @@ while running:
                 # Check the input answer
                 try:
                     user_answer = int(current_input)
-                    if (user_answer == current_asteroid.answer)&(gun.fizzle_effect==False):
+                    target = wave.target_for(user_answer) if (wave is not None) & (gun.fizzle_effect==False) else None
+                    if target is not None:
+                        # Wave mode: fire a homing projectile at the matching asteroid nearest the ground
+                        # (the answer is logged when it hits, so a missed shot and a second try count once)
+                        target.stop_time=time.time()
+                        new_projectile = HomingProjectile(gun.rect.centerx, gun.rect.top, target)
+                        projectiles.add(new_projectile)
+                        all_sprites.add(new_projectile)
+                        current_input = "" # Clear input
+                    elif (wave is None) and (user_answer == current_asteroid.answer)&(gun.fizzle_effect==False):
                         # Correct answer: Fire projectile
                         current_asteroid.stop_time=time.time()
                         user_profile.logQuestionResults(True, current_asteroid.a, current_asteroid.b, current_asteroid.stop_time-current_asteroid.start_time)
@@ -462,8 +633,20 @@ while running:
         gun.update_fizzle()
         gun.move()
 
-        # Check for projectile hitting the current asteroid
-        hits = pygame.sprite.spritecollide(current_asteroid, projectiles, True)
+        if wave is not None:
+            # Wave mode: group-level hit check, then top the wave back up
+            for asteroid in wave.resolve_hits(projectiles):
+                user_profile.logQuestionResults(True, asteroid.a, asteroid.b, asteroid.stop_time-asteroid.start_time)
+                score += 10
+            if game_over:
+                # The asteroid that reached the ground is the one shown on the game over screen
+                current_asteroid = wave.lowest()
+            else:
+                wave.fill()
+            hits = None
+        else:
+            # Check for projectile hitting the current asteroid
+            hits = pygame.sprite.spritecollide(current_asteroid, projectiles, True)
         if hits:
             score += 10
             
@@ -476,7 +659,7 @@ while running:
             all_sprites.add(current_asteroid)
 
         # Check if the current asteroid hit the ground (Game Over handled in Asteroid.update)
-        if current_asteroid not in all_sprites:
+        if (wave is None) and (current_asteroid not in all_sprites):
              # This means the asteroid was killed by the ground check (game over) or a hit
              if not game_over:
                  # If it was hit, generate a new one immediately
@@ -494,17 +677,21 @@ while running:
         
         draw_hud(screen)
         draw_input_box(screen, current_input, gun.fizzle_effect)
-    elif game_paused:
-        draw_game_paused(screen)
-    else:
-        # Game Over Screen
-        draw_game_over(screen, current_asteroid)
+        pygame.display.flip()
 
-    # Always update the display
-    pygame.display.flip()
-    
-    # Cap the frame rate
-    clock.tick(60)
+        # Cap the frame rate
+        clock.tick(60)
+        screen_dirty = True # The first pause or game over frame must be drawn
+    elif screen_dirty:
+        if game_paused:
+            draw_game_paused(screen)
+        else:
+            # Game Over Screen
+            draw_game_over(screen, current_asteroid)
+        pygame.display.flip()
+        screen_dirty = False
 
+# Wait for the background writer to finish the last save
+user_profile.close()
 pygame.quit()
 sys.exit()
@@ -0,0 +1,21 @@
+import pygame
+
+# How long an idle screen sleeps before checking in again, even without input
+IDLE_TIMEOUT_MS = 500
+
+def next_events(idle:bool, timeout_ms:int=IDLE_TIMEOUT_MS):
+    """
+    Returns the pending events. When idle (nothing on screen would change without input) it
+    first blocks in pygame.event.wait until an event arrives or the timeout passes, so static
+    screens use no CPU between key presses.
+    """
+    if idle:
+        event = pygame.event.wait(timeout_ms)
+        if event.type == pygame.NOEVENT:
+            return []
+        return [event] + pygame.event.get()
+    return pygame.event.get()
+
+def changes_screen(event) -> bool:
+    """Mouse movement alone never changes a static screen; any other event may."""
+    return event.type != pygame.MOUSEMOTION
@@ -1,9 +1,13 @@
 import os
+import datetime
+import threading
 from pathlib import Path
 import pygame
 import sys
-import pandas as pd
-import datetime
+from answer_store import AnswerStore, profilePath
+from profile_index import ProfileIndex
+from text_cache import render_text
+from idle import next_events, changes_screen
 
 # Colors
 BLACK = (0, 0, 0)
@@ -12,35 +16,84 @@ GREEN = (0, 255, 0)
 RED = (255, 0, 0)
 BLUE = (100, 100, 255)
 YELLOW = (255, 255, 0)
+GRAY = (200, 200, 200)
 
 # Screen dimensions
 SCREEN_WIDTH = 800
 SCREEN_HEIGHT = 600
 
+# Profile card list: cards between LIST_TOP and LIST_BOTTOM, scrolled with the mouse wheel or arrow keys
+CARD_WIDTH = 440
+CARD_HEIGHT = 52
+CARD_GAP = 6
+LIST_TOP = 210
+LIST_BOTTOM = SCREEN_HEIGHT - 80
+VISIBLE_CARDS = (LIST_BOTTOM - LIST_TOP) // (CARD_HEIGHT + CARD_GAP)
 
-clock = pygame.time.Clock()
+# Posted by the background rescan when the profile index changed, so the idle menu redraws
+PROFILES_INDEXED = pygame.event.custom_type()
 
 class MenuSystem:
-    def __init__(self, data_dir:Path, screen, font_large, font_medium):
+    def __init__(self, data_dir:Path, screen, font_large, font_medium, font_small=None):
         self.__screen = screen
         self.__data_dir = data_dir
         self.__font_large = font_large
         self.__font_medium = font_medium
+        self.__font_small = font_small or font_medium
+        # Per-profile summaries for the cards; read from one file instead of opening every profile
+        self.__index = ProfileIndex(data_dir)
     
 
 
     def load_profiles(self):
-        """Scans the data directory for existing .xlsx files."""
+        """Scans the data directory for profile databases (.db) and legacy .xlsx profiles."""
         try:
-            # We only want files, not directories, and only .xlsx files
-            profile_files = [f for f in os.listdir(self.__data_dir) if f.endswith('.xlsx') and os.path.isfile(self.__data_dir / f)]
-            # Return only the filenames without the extension
-            return [Path(f).stem for f in profile_files]
+            # We only want files, not directories; .xlsx profiles are imported when first loaded
+            profile_files = [f for f in os.listdir(self.__data_dir) if f.endswith(('.db', '.xlsx')) and os.path.isfile(self.__data_dir / f)]
+            # Return only the filenames without the extension (once per profile)
+            return sorted({Path(f).stem for f in profile_files})
         except FileNotFoundError:
             # Ensure the data directory exists
             self.__data_dir.mkdir(exist_ok=True)
             return []
 
+    def start_rescan(self):
+        """Repairs the profile index in a background thread (profiles may have changed outside the game)."""
+        def rescan():
+            try:
+                changed = self.__index.rescan()
+            except Exception as e:
+                print(f"Could not rescan profiles: {e}")
+                return
+            if changed and pygame.display.get_init():
+                pygame.event.post(pygame.event.Event(PROFILES_INDEXED))
+        threading.Thread(target=rescan, name="ProfileRescan", daemon=True).start()
+
+    def profile_card_text(self, summary:dict):
+        """Second line of a profile card: accuracy and when the profile was last played."""
+        if summary is None:
+            return "..." # Not indexed yet
+        if summary['answers'] == 0:
+            return "new profile"
+        text = f"{100 * summary['right'] / summary['answers']:.0f}% of {summary['answers']}"
+        if summary['last_played'] == datetime.datetime.now().strftime('%Y-%m-%d'):
+            text += f" | {summary['last_played_minutes']:.0f} min today"
+        elif summary['last_played']:
+            text += f" | {summary['last_played']}"
+        return text
+
+    def draw_profile_card(self, surface, profile_name, summary, rect):
+        """Draws a profile button with its name and summary."""
+        pygame.draw.rect(surface, BLUE, rect, border_radius=5)
+        pygame.draw.rect(surface, WHITE, rect, 2, border_radius=5)
+        surface.blit(render_text(self.__font_medium, profile_name, WHITE), (rect.x + 10, rect.y + 3))
+        surface.blit(render_text(self.__font_small, self.profile_card_text(summary), GRAY), (rect.x + 10, rect.y + 27))
+        return rect
+
+    def profile_card_rect(self, slot):
+        """Rect of the card in the given visible slot of the profile list."""
+        return pygame.Rect(SCREEN_WIDTH // 2 - CARD_WIDTH // 2, LIST_TOP + slot * (CARD_HEIGHT + CARD_GAP), CARD_WIDTH, CARD_HEIGHT)
+
     def draw_button(self, surface, text, rect, color, text_color=WHITE, font=None):
         """Draws a clickable button."""
         if font is None:
@@ -48,7 +101,7 @@ class MenuSystem:
         pygame.draw.rect(surface, color, rect, border_radius=5)
         pygame.draw.rect(surface, WHITE, rect, 2, border_radius=5)
         
-        text_surface = font.render(text, True, text_color)
+        text_surface = render_text(font, text, text_color)
         text_rect = text_surface.get_rect(center=rect.center)
         surface.blit(text_surface, text_rect)
         return rect # Return the rect in case it's used for click detection
@@ -59,7 +112,7 @@ class MenuSystem:
         pygame.draw.rect(self.__screen, (50, 50, 50), input_box_rect, border_radius=5)
         pygame.draw.rect(self.__screen, WHITE, input_box_rect, 2, border_radius=5)
         
-        text_surface = self.__font_medium.render(current_text, True, WHITE)
+        text_surface = render_text(self.__font_medium, current_text, WHITE)
         text_rect = text_surface.get_rect(midleft=(x + 10, y + height // 2))
         self.__screen.blit(text_surface, text_rect)
         return input_box_rect
@@ -69,6 +122,8 @@ class MenuSystem:
         
         menu_running = True
         profiles = self.load_profiles()
+        self.start_rescan()
+        scroll = 0 # Index of the first visible profile card
         
         # Menu States: 'main' or 'new_profile'
         menu_state = 'main' 
@@ -78,30 +133,39 @@ class MenuSystem:
         # Calculate button layout
         BUTTON_WIDTH = 300
         BUTTON_HEIGHT = 50
-        START_Y = SCREEN_HEIGHT // 2 - (len(profiles) // 2) * (BUTTON_HEIGHT + 10)
+        create_button_rect = pygame.Rect(SCREEN_WIDTH // 2 - BUTTON_WIDTH // 2, LIST_BOTTOM + 10, BUTTON_WIDTH, BUTTON_HEIGHT)
         
+        # Nothing in the menu animates, so it is only redrawn after input and otherwise sleeps
+        needs_redraw = True
         while menu_running:
-            for event in pygame.event.get():
+            for event in next_events(idle=not needs_redraw):
+                if changes_screen(event):
+                    needs_redraw = True
                 if event.type == pygame.QUIT:
                     pygame.quit()
                     sys.exit()
+
+                if event.type == PROFILES_INDEXED:
+                    profiles = self.load_profiles() # Summaries were refreshed; pick up added or removed files too
                 
                 if menu_state == 'main':
-                    if event.type == pygame.MOUSEBUTTONDOWN:
+                    max_scroll = max(0, len(profiles) - VISIBLE_CARDS)
+                    if event.type == pygame.MOUSEWHEEL:
+                        scroll = min(max(scroll - event.y, 0), max_scroll)
+                    elif event.type == pygame.KEYDOWN and event.key in (pygame.K_UP, pygame.K_DOWN):
+                        scroll = min(max(scroll + (1 if event.key == pygame.K_DOWN else -1), 0), max_scroll)
+
+                    if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
                         mouse_x, mouse_y = event.pos
                         
                         # Check for 'Create New Profile' button
-                        create_button_y = START_Y + len(profiles) * (BUTTON_HEIGHT + 10)
-                        create_button_rect = pygame.Rect(SCREEN_WIDTH // 2 - BUTTON_WIDTH // 2, create_button_y, BUTTON_WIDTH, BUTTON_HEIGHT)
                         if create_button_rect.collidepoint(mouse_x, mouse_y):
                             menu_state = 'new_profile'
                             new_profile_input = ""
                         
-                        # Check for existing profile buttons
-                        for i, profile_name in enumerate(profiles):
-                            y = START_Y + i * (BUTTON_HEIGHT + 10)
-                            rect = pygame.Rect(SCREEN_WIDTH // 2 - BUTTON_WIDTH // 2, y, BUTTON_WIDTH, BUTTON_HEIGHT)
-                            if rect.collidepoint(mouse_x, mouse_y):
+                        # Check for the visible profile cards
+                        for slot, profile_name in enumerate(profiles[scroll:scroll + VISIBLE_CARDS]):
+                            if self.profile_card_rect(slot).collidepoint(mouse_x, mouse_y):
                                 print(f"Loading profile: {profile_name}")
                                 # --- LOAD PROFILE ---
                                 return profile_name
@@ -127,43 +191,8 @@ class MenuSystem:
                         elif create_confirm_rect.collidepoint(mouse_x, mouse_y) and new_profile_input:
                             # --- CREATE PROFILE ---
                             print(f"Creating profile: {new_profile_input}")
-                            #### LOGIC TO GENERATE NEW PROFILE FILE
-                            df_focus = pd.DataFrame({
-                                1:['X','X','X','X','X','X','X','X','X','X','X','X'],
-                                2:['X','X','X','X','X','X','X','X','X','X','X','X'],
-                                3:['X','X','X','X','X','X','X','X','X','X','X','X'],
-                                4:['X','X','X','X','X','X','X','X','X','X','X','X'],
-                                5:['X','X','X','X','X','X','X','X','X','X','X','X'],
-                                6:['X','X','X','X','X','X','X','X','X','X','X','X'],
-                                7:['X','X','X','X','X','X','X','X','X','X','X','X'],
-                                8:['X','X','X','X','X','X','X','X','X','X','X','X'],
-                                9:['X','X','X','X','X','X','X','X','X','X','X','X'],
-                                10:['X','X','X','X','X','X','X','X','X','X','X','X'],
-                                11:['X','X','X','X','X','X','X','X','X','X','X','X'],
-                                12:['X','X','X','X','X','X','X','X','X','X','X','X']
-                            }, index=range(1,13))
-                            df_performance = pd.DataFrame()
-                            for first_term in range(1,13,1):
-                                for second_term in range(1,13,1):
-                                    df_temp = pd.DataFrame({
-                                        'First':[first_term],
-                                        'Second':[second_term],
-                                        'Times Occurred':[None],
-                                        'Times Wrong':[None],
-                                        'Times Right':[None],
-                                        'Avg Time to Answer':[None],
-                                        'Last Time to Answer':[None],
-                                    })
-                                    df_performance = pd.concat([df_performance,df_temp])
-                            df_performance = df_performance.reset_index(drop=True)
-
-                            today = datetime.datetime.now().strftime('%Y-%m-%d')
-                            df_daily_log = pd.DataFrame({'Date':[today],'Duration (Minutes)':[0]})
-
-                            with pd.ExcelWriter(self.__data_dir.joinpath(f'{new_profile_input}.xlsx'), engine='openpyxl', mode='w') as writer:
-                                df_focus.to_excel(writer,sheet_name = 'Focus Problems',index = True)
-                                df_performance.to_excel(writer, sheet_name='Performance', index=False)
-                                df_daily_log.to_excel(writer, sheet_name='Daily Log', index=False)
+                            # New profiles are SQLite databases with every 1-12 problem in focus
+                            AnswerStore.create(profilePath(self.__data_dir, new_profile_input)).close()
 
                             return new_profile_input
                         
@@ -185,31 +214,41 @@ class MenuSystem:
                                 new_profile_input += event.unicode
 
 
+            if not needs_redraw:
+                continue
+            needs_redraw = False
+
             # --- Drawing Menu ---
             self.__screen.fill(BLACK)
             
-            title_text = self.__font_large.render("Multiplication Asteroids", True, YELLOW)
+            title_text = render_text(self.__font_large, "Multiplication Asteroids", YELLOW)
             title_rect = title_text.get_rect(center=(SCREEN_WIDTH // 2, 100))
             self.__screen.blit(title_text, title_rect)
             
             if menu_state == 'main':
-                menu_title = self.__font_medium.render("Select Profile or Create New", True, WHITE)
+                menu_title = render_text(self.__font_medium, "Select Profile or Create New", WHITE)
                 menu_title_rect = menu_title.get_rect(center=(SCREEN_WIDTH // 2, 180))
                 self.__screen.blit(menu_title, menu_title_rect)
                 
-                # Draw existing profile buttons
-                for i, profile_name in enumerate(profiles):
-                    y = START_Y + i * (BUTTON_HEIGHT + 10)
-                    rect = pygame.Rect(SCREEN_WIDTH // 2 - BUTTON_WIDTH // 2, y, BUTTON_WIDTH, BUTTON_HEIGHT)
-                    self.draw_button(self.__screen, profile_name, rect, BLUE)
+                # Draw the visible profile cards
+                scroll = min(scroll, max(0, len(profiles) - VISIBLE_CARDS))
+                summaries = self.__index.profiles
+                for slot, profile_name in enumerate(profiles[scroll:scroll + VISIBLE_CARDS]):
+                    self.draw_profile_card(self.__screen, profile_name, summaries.get(profile_name), self.profile_card_rect(slot))
+
+                # Scroll bar when not every profile fits
+                if len(profiles) > VISIBLE_CARDS:
+                    track = pygame.Rect(SCREEN_WIDTH // 2 + CARD_WIDTH // 2 + 10, LIST_TOP, 6, LIST_BOTTOM - LIST_TOP - CARD_GAP)
+                    thumb = pygame.Rect(track.x, track.y + track.height * scroll // len(profiles),
+                                        track.width, max(10, track.height * VISIBLE_CARDS // len(profiles)))
+                    pygame.draw.rect(self.__screen, (50, 50, 50), track, border_radius=3)
+                    pygame.draw.rect(self.__screen, GRAY, thumb, border_radius=3)
                 
                 # Draw 'Create New Profile' button
-                create_button_y = START_Y + len(profiles) * (BUTTON_HEIGHT + 10)
-                create_button_rect = pygame.Rect(SCREEN_WIDTH // 2 - BUTTON_WIDTH // 2, create_button_y, BUTTON_WIDTH, BUTTON_HEIGHT)
                 self.draw_button(self.__screen, "Create New Profile", create_button_rect, GREEN, text_color=BLACK)
                 
             elif menu_state == 'new_profile':
-                instruction_text = self.__font_medium.render("Enter New Profile Name (e.g., JaneDoe)", True, WHITE)
+                instruction_text = render_text(self.__font_medium, "Enter New Profile Name (e.g., JaneDoe)", WHITE)
                 instruction_rect = instruction_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 50))
                 self.__screen.blit(instruction_text, instruction_rect)
                 
@@ -229,7 +268,6 @@ class MenuSystem:
 
             
             pygame.display.flip()
-            clock.tick(60)
 
         # Should not be reached, but just in case
         return None
@@ -0,0 +1,161 @@
+import os
+import threading
+from pathlib import Path
+from answer_store import AnswerStore
+from profile_index import ProfileIndex
+
+class AnswerJournal:
+    """
+    Append-only text file with one line per answer, written as soon as the answer is given:
+        seq,a,b,correct,seconds,answered_at
+    Answers that reached the database are skipped on replay by their sequence number, so a
+    crash between saves loses nothing. A torn last line (crash mid-write) is ignored.
+    """
+    def __init__(self, journal_filepath: Path):
+        self.journal_filepath = Path(journal_filepath)
+        self.__file = open(self.journal_filepath, 'a', encoding='utf-8')
+        self.last_seq = 0
+
+    def readEntries(self, after_seq: int = 0) -> list:
+        """The journaled answers with a sequence number above after_seq, as (seq, a, b, correct, seconds, answered_at)."""
+        entries = []
+        with open(self.journal_filepath, 'r', encoding='utf-8') as journal:
+            for line in journal:
+                if not line.endswith('\n'):
+                    break # Torn write
+                fields = line.rstrip('\n').split(',')
+                try:
+                    entry = (int(fields[0]), int(fields[1]), int(fields[2]), int(fields[3]), float(fields[4]), fields[5])
+                except (ValueError, IndexError):
+                    continue
+                self.last_seq = max(self.last_seq, entry[0])
+                if entry[0] > after_seq:
+                    entries.append(entry)
+        return entries
+
+    def append(self, a: int, b: int, correct: int, seconds: float, answered_at: str) -> int:
+        """Writes one answer and returns its sequence number."""
+        self.last_seq += 1
+        self.__file.write(f"{self.last_seq},{a},{b},{correct},{seconds!r},{answered_at}\n")
+        self.__file.flush() # Hand the line to the OS right away; it survives the game crashing
+        return self.last_seq
+
+    def truncate(self):
+        """Empties the journal once every entry is in the database (sequence numbers keep counting)."""
+        self.__file.truncate(0)
+        self.__file.seek(0)
+
+    def sync(self):
+        self.__file.flush()
+        os.fsync(self.__file.fileno())
+
+    def close(self):
+        self.__file.close()
+
+class SessionWriter:
+    """
+    Background thread that writes saves to the profile database so the game loop never waits on disk.
+
+    `submit` only merges the save into a pending batch and returns. When several saves arrive while
+    a write is running they are coalesced into one transaction: the latest row of each question
+    wins, answers are concatenated and the play minutes are added up. Each transaction also stores
+    the journal sequence number it covers, so the database and journal stay consistent. After each
+    write the profile's summary in the data directory's ProfileIndex is refreshed.
+
+    A batch that fails to write is merged back into the pending batch and retried with the next
+    save (or on close), so a later save never records a journal sequence number past lost answers.
+    """
+    def __init__(self, db_filepath: Path):
+        self.__db_filepath = Path(db_filepath)
+        self.__condition = threading.Condition()
+        self.__pending = None
+        self.__writing = False
+        self.__retry_later = False # The pending batch failed to write; wait for the next submit or close
+        self.__running = True
+        self.saved_seq = 0
+        self.writes = 0
+        self.saves_submitted = 0
+        self.errors = 0
+        self.__thread = threading.Thread(target=self.__run, name="SessionWriter", daemon=True)
+        self.__thread.start()
+
+    def submit(self, question_rows: list, answers: list, minutes_played: float, journal_seq: int):
+        """Queues one save; question_rows are (a, b, ...) tuples, answers are (a, b, correct, seconds, answered_at)."""
+        with self.__condition:
+            if self.__pending is None:
+                self.__pending = {'rows': {}, 'answers': [], 'minutes': 0.0, 'seq': journal_seq}
+            for row in question_rows:
+                self.__pending['rows'][(row[0], row[1])] = row
+            self.__pending['answers'].extend(answers)
+            self.__pending['minutes'] += minutes_played
+            self.__pending['seq'] = max(self.__pending['seq'], journal_seq)
+            self.__retry_later = False
+            self.saves_submitted += 1
+            self.__condition.notify_all()
+
+    def __run(self):
+        store = AnswerStore(self.__db_filepath) # SQLite connections belong to the thread that made them
+        profile_index = ProfileIndex(self.__db_filepath.parent)
+        while True:
+            with self.__condition:
+                while (self.__pending is None or self.__retry_later) and self.__running:
+                    self.__condition.wait()
+                if self.__pending is None or self.__retry_later:
+                    break
+                batch, self.__pending = self.__pending, None
+                self.__writing = True
+            try:
+                store.saveSession([batch['rows'][key] for key in sorted(batch['rows'])], batch['answers'],
+                                  batch['minutes'], journal_seq=batch['seq'])
+                saved = True
+            except Exception as e:
+                # Keep the game running; the batch is retried and the journal holds its answers meanwhile
+                print(f"Could not save session data: {e}")
+                saved = False
+            if saved:
+                try:
+                    profile_index.update(self.__db_filepath.stem, store.loadSummary(), self.__db_filepath)
+                except Exception as e:
+                    # Only the menu's profile cards depend on it; the next rescan repairs the index
+                    print(f"Could not update the profile index: {e}")
+            with self.__condition:
+                self.__writing = False
+                if saved:
+                    self.saved_seq = max(self.saved_seq, batch['seq'])
+                    self.writes += 1
+                else:
+                    self.errors += 1
+                    self.__requeue(batch)
+                self.__condition.notify_all()
+        store.close()
+
+    def __requeue(self, batch: dict):
+        """Puts a batch that failed back in front of the pending one (called with the lock held)."""
+        if self.__pending is not None:
+            rows = dict(batch['rows'])
+            rows.update(self.__pending['rows']) # Newer rows of the same question win
+            batch = {'rows': rows, 'answers': batch['answers'] + self.__pending['answers'],
+                     'minutes': batch['minutes'] + self.__pending['minutes'],
+                     'seq': max(batch['seq'], self.__pending['seq'])}
+            self.__retry_later = False # New saves arrived during the write; try again right away
+        else:
+            self.__retry_later = True
+        self.__pending = batch
+
+    def flush(self, timeout: float = None) -> bool:
+        """
+        Waits until every submitted save is written or has failed and waits for a retry.
+        Returns False on timeout or when unsaved data remains.
+        """
+        with self.__condition:
+            self.__condition.wait_for(lambda: not self.__writing and (self.__pending is None or self.__retry_later), timeout)
+            return self.__pending is None and not self.__writing
+
+    def close(self, timeout: float = 5.0):
+        """Writes what is pending, then stops the thread."""
+        self.flush(timeout)
+        with self.__condition:
+            self.__running = False
+            self.__retry_later = False # One last attempt for a batch that failed earlier
+            self.__condition.notify_all()
+        self.__thread.join(timeout)
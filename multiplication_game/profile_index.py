@@ -0,0 +1,101 @@
+import os
+import json
+import threading
+from pathlib import Path
+from answer_store import AnswerStore
+
+INDEX_FILENAME = 'profiles.json'
+INDEX_VERSION = 1
+
+# Serializes read-merge-write cycles on the index file between the save thread and a rescan
+_index_lock = threading.Lock()
+
+class ProfileIndex:
+    """
+    Summary of every profile in a data directory (answers, accuracy, last day played, minutes),
+    kept in one small JSON file so the profile menu can show a card per profile without opening
+    each database or workbook. The save thread updates a profile's entry after every save.
+
+    Each entry remembers the size and modification time of the file it was computed from, so
+    `rescan` only re-reads profiles that changed outside the game and drops deleted ones.
+    """
+    def __init__(self, data_dir: Path):
+        self.data_dir = Path(data_dir)
+        self.index_filepath = self.data_dir.joinpath(INDEX_FILENAME)
+        self.profiles = self.__read()
+
+    def __read(self) -> dict:
+        try:
+            with open(self.index_filepath, 'r', encoding='utf-8') as index_file:
+                index = json.load(index_file)
+        except (FileNotFoundError, ValueError):
+            return {} # Missing or damaged; the next rescan rebuilds it
+        return index.get('profiles', {}) if index.get('version') == INDEX_VERSION else {}
+
+    def __write(self, profiles: dict):
+        temp_filepath = self.index_filepath.with_name(self.index_filepath.name + '.tmp')
+        with open(temp_filepath, 'w', encoding='utf-8') as index_file:
+            json.dump({'version': INDEX_VERSION, 'profiles': profiles}, index_file, indent=1, sort_keys=True)
+        os.replace(temp_filepath, self.index_filepath)
+        self.profiles = profiles
+
+    def update(self, profile_name: str, summary: dict, source_filepath: Path):
+        """Stores a profile's summary (AnswerStore.loadSummary) after source_filepath was written."""
+        entry = dict(summary, **_fileStamp(source_filepath))
+        with _index_lock:
+            profiles = self.__read()
+            profiles[profile_name] = entry
+            self.__write(profiles)
+
+    def rescan(self) -> bool:
+        """Brings the index in line with the profile files on disk. Returns True if anything changed."""
+        sources = profileSources(self.data_dir)
+        known = self.__read()
+        stale = {name: path for name, path in sources.items() if not _isCurrent(known.get(name), path)}
+        removed = set(known) - set(sources)
+        if not stale and not removed:
+            self.profiles = known
+            return False
+
+        fresh = {}
+        for name, path in stale.items():
+            stamp = _fileStamp(path) # Taken before reading, so a write during the read leaves the entry stale
+            try:
+                fresh[name] = dict(summarizeProfile(path), **stamp)
+            except Exception as e:
+                print(f"Could not index profile {path.name}: {e}")
+
+        with _index_lock:
+            profiles = self.__read()
+            for name in removed:
+                profiles.pop(name, None)
+            profiles.update(fresh)
+            self.__write(profiles)
+        print(f"Profile index: {len(fresh)} updated, {len(removed)} removed")
+        return True
+
+def profileSources(data_dir: Path) -> dict:
+    """The file each profile is loaded from, by profile name: its database, or a legacy .xlsx without one."""
+    sources = {}
+    for entry in os.scandir(data_dir):
+        path = Path(entry.path)
+        if not entry.is_file() or path.suffix not in ('.db', '.xlsx'):
+            continue
+        if path.suffix == '.db' or path.stem not in sources:
+            sources[path.stem] = path
+    return sources
+
+def summarizeProfile(profile_filepath: Path) -> dict:
+    """Reads a profile's summary from its database or legacy workbook."""
+    store = AnswerStore.openProfile(profile_filepath)
+    try:
+        return store.loadSummary()
+    finally:
+        store.close()
+
+def _fileStamp(filepath: Path) -> dict:
+    stat = os.stat(filepath)
+    return {'source': Path(filepath).name, 'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size}
+
+def _isCurrent(entry: dict, filepath: Path) -> bool:
+    return entry is not None and all(entry.get(key) == value for key, value in _fileStamp(filepath).items())
@@ -0,0 +1,98 @@
+"""
+Creates one profile per student from a class roster CSV:
+
+    python roster.py roster.csv [--data-dir DIR] [--workers N]
+
+The CSV needs a 'name' column. An optional 'tables' column picks the times tables in focus,
+e.g. "2-5" (the 2x to 5x tables, each from x1 to x12) or "2 3 10" (default 1-12). Students that already have a profile are skipped.
+"""
+import csv
+import time
+import argparse
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from answer_store import AnswerStore, profilePath
+from profile_index import ProfileIndex
+
+# Same rule as the New Profile screen: letters, digits, space, '_' and '-', at most 20 characters
+MAX_NAME_LENGTH = 20
+
+def isValidProfileName(name: str) -> bool:
+    return 0 < len(name) <= MAX_NAME_LENGTH and all(ch.isalnum() or ch in ' _-' for ch in name)
+
+def parseTables(text: str) -> tuple:
+    """'2-5' -> (2, 3, 4, 5); '2 3 10' or '2;3;10' -> (2, 3, 10); empty -> 1-12."""
+    tables = set()
+    for part in text.replace(';', ' ').replace(',', ' ').split():
+        first, _, last = part.partition('-')
+        first, last = int(first), int(last or first)
+        if last < first:
+            raise ValueError(f"times table range is reversed: {part!r}")
+        tables.update(range(first, last + 1))
+    if not tables:
+        return tuple(range(1, 13))
+    if min(tables) < 1 or max(tables) > 12:
+        raise ValueError(f"times tables must be between 1 and 12: {text!r}")
+    return tuple(sorted(tables))
+
+def readRoster(roster_filepath: Path) -> list:
+    """The (name, tables text) of every student in the roster CSV, in file order."""
+    with open(roster_filepath, 'r', encoding='utf-8-sig', newline='') as roster_file:
+        reader = csv.DictReader(roster_file)
+        reader.fieldnames = [field.strip().lower() for field in reader.fieldnames or []]
+        if 'name' not in reader.fieldnames:
+            raise ValueError(f"{roster_filepath} has no 'name' column")
+        return [(row['name'].strip(), row.get('tables') or '') for row in reader if (row['name'] or '').strip()]
+
+def createProfile(data_dir: Path, name: str, tables: tuple) -> bool:
+    """Creates one student's profile. Returns False if the student already has one."""
+    db_filepath = profilePath(data_dir, name)
+    if db_filepath.exists() or db_filepath.with_suffix('.xlsx').exists():
+        return False
+    AnswerStore.create(db_filepath, tables).close()
+    return True
+
+def importRoster(roster_filepath: Path, data_dir: Path, workers: int = None) -> dict:
+    """
+    Creates the profiles of a roster in parallel (each profile is its own file, so the writes do not
+    contend) and refreshes the profile index once at the end. Returns the names per outcome.
+    """
+    data_dir = Path(data_dir)
+    data_dir.mkdir(parents=True, exist_ok=True)
+    results = {'created': [], 'skipped': [], 'invalid': []}
+    students = {}
+    seen = set() # Lowercased, since profile files on Windows are case-insensitive
+    for name, tables_text in readRoster(roster_filepath):
+        try:
+            tables = parseTables(tables_text)
+        except ValueError:
+            tables = None
+        if tables is None or not isValidProfileName(name) or name.lower() in seen:
+            results['invalid'].append(name) # Bad tables, bad characters, too long, or listed twice
+        else:
+            students[name] = tables
+            seen.add(name.lower())
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        created = pool.map(lambda student: createProfile(data_dir, *student), students.items())
+        for name, was_created in zip(students, created):
+            results['created' if was_created else 'skipped'].append(name)
+
+    ProfileIndex(data_dir).rescan()
+    return results
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Create Multiplication Asteroids profiles from a class roster CSV")
+    parser.add_argument('roster', type=Path, help="CSV file with a 'name' column and an optional 'tables' column")
+    parser.add_argument('--data-dir', type=Path, default=Path(__file__).parent.joinpath("data"),
+                        help="profile folder (default: the game's data folder)")
+    parser.add_argument('--workers', type=int, default=None, help="parallel profile writers (default: based on CPU count)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    results = importRoster(args.roster, args.data_dir, args.workers)
+    print(f"Created {len(results['created'])} profiles in {time.perf_counter() - start:.2f}s")
+    if results['skipped']:
+        print(f"Skipped {len(results['skipped'])} students who already have a profile: {', '.join(results['skipped'])}")
+    if results['invalid']:
+        print(f"Ignored {len(results['invalid'])} students with an invalid name or tables, or listed twice: {', '.join(results['invalid'])}")
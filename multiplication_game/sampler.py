@@ -0,0 +1,75 @@
+import random
+
+class AliasSampler:
+    """
+    Draws items with probability proportional to their weights in O(1) using Vose's alias method.
+    `setWeight` is O(1); the O(n) table rebuild is deferred to the next draw after a change, so a
+    burst of results costs one rebuild.
+    """
+    def __init__(self, items: list, weights: list = None, rng: random.Random = None):
+        if not items:
+            raise ValueError("AliasSampler needs at least one item")
+        self.items = list(items)
+        self.__index = {item: i for i, item in enumerate(self.items)}
+        self.weights = list(weights) if weights is not None else [1.0] * len(self.items)
+        self.__rng = rng or random
+        self.__prob = None
+        self.__alias = None
+        self.rebuilds = 0
+
+    def setWeight(self, item, weight: float):
+        i = self.__index.get(item)
+        if i is not None and self.weights[i] != weight:
+            self.weights[i] = weight
+            self.__prob = None # Rebuilt lazily
+
+    def probability(self, item) -> float:
+        return self.weights[self.__index[item]] / sum(self.weights)
+
+    def __rebuild(self):
+        n = len(self.weights)
+        total = sum(self.weights)
+        if total <= 0:
+            scaled = [1.0] * n
+        else:
+            scaled = [w * n / total for w in self.weights]
+        prob = [1.0] * n
+        alias = list(range(n))
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            s = small.pop()
+            l = large.pop()
+            prob[s] = scaled[s]
+            alias[s] = l
+            scaled[l] = scaled[l] + scaled[s] - 1.0
+            if scaled[l] < 1.0:
+                small.append(l)
+            else:
+                large.append(l)
+        # Whatever is left is 1.0 up to rounding error
+        self.__prob = prob
+        self.__alias = alias
+        self.rebuilds += 1
+
+    def draw(self):
+        if self.__prob is None:
+            self.__rebuild()
+        # One uniform number picks both the column and the coin flip
+        u = self.__rng.random() * len(self.__prob)
+        i = int(u)
+        return self.items[i] if u - i < self.__prob[i] else self.items[self.__alias[i]]
+
+def questionWeight(stats) -> float:
+    """
+    Spaced-repetition style weight of one question: problems that are often wrong or slow come up
+    more. Unanswered problems get a boost so every focus problem is seen early.
+    """
+    if stats is None or stats.times_occurred == 0:
+        return 3.0
+    # Laplace-smoothed error rate, so one lucky or unlucky answer does not dominate
+    error_rate = (stats.times_wrong + 1) / (stats.times_occurred + 2)
+    # Answers slower than about 3 seconds count as not yet automatic
+    slowness = min(3.0, (stats.avg_time or 0) / 3.0)
+    # A running streak of right answers lowers the weight gradually
+    return (1.0 + 6.0 * error_rate + slowness) / (1.0 + 0.25 * stats.streak)
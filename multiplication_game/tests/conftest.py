@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# The game's modules import each other by bare name (run from the game folder)
+sys.path.insert(0, str(Path(__file__).parent.parent))
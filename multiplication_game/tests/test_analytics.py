@@ -0,0 +1,90 @@
+import random
+import statistics
+import pytest
+from answer_store import AnswerStore
+from analytics import QuestionStats, TimeSketch, UserProfile
+
+def test_running_mean_and_variance():
+    rng = random.Random(1)
+    times = [rng.lognormvariate(0.8, 0.6) for _ in range(500)]
+    stats = QuestionStats(3, 4)
+    for seconds in times:
+        stats.record(True, seconds)
+    assert stats.avg_time == pytest.approx(statistics.mean(times))
+    assert stats.time_variance == pytest.approx(statistics.variance(times))
+    assert stats.last_time == times[-1]
+
+    # Saved and loaded again, it carries on from the stored aggregates
+    reloaded = QuestionStats(*stats.toRow())
+    for seconds in times[:50]:
+        reloaded.record(True, seconds)
+    assert reloaded.time_variance == pytest.approx(statistics.variance(times + times[:50]))
+
+def test_variance_needs_two_answers():
+    stats = QuestionStats(3, 4)
+    assert stats.time_variance is None
+    stats.record(True, 2.0)
+    assert stats.time_variance is None
+    stats.record(True, 4.0)
+    assert stats.time_variance == pytest.approx(2.0)
+
+def test_streaks_and_counts():
+    stats = QuestionStats(3, 4)
+    for right in [True, True, False, True, True, True, False, True]:
+        stats.record(right, 1.0)
+    assert (stats.times_occurred, stats.times_right, stats.times_wrong) == (8, 6, 2)
+    assert (stats.streak, stats.best_streak) == (1, 3)
+    assert stats.error_rate == 0.25
+
+def test_unknown_variance_stays_unknown():
+    # A row imported from Excel: counts and an average, but no time_m2
+    stats = QuestionStats(3, 4, 5, 1, 4, 2.0, 1.5)
+    assert stats.time_variance is None
+    stats.record(True, 3.0)
+    assert stats.avg_time == pytest.approx(2.0 + 1.0 / 6)
+    assert stats.time_variance is None
+    assert stats.toRow()[7] is None
+
+def test_time_sketch_percentiles():
+    rng = random.Random(2)
+    times = sorted(rng.uniform(0.5, 20) for _ in range(2000))
+    sketch = TimeSketch()
+    for seconds in times:
+        sketch.add(seconds)
+    for q in (10, 50, 90):
+        assert sketch.percentile(q) == pytest.approx(times[int(q / 100 * (len(times) - 1))], rel=0.07)
+    assert TimeSketch().percentile(50) is None
+    assert TimeSketch().toBytes() is None
+
+    loaded = TimeSketch(sketch.toBytes())
+    assert loaded.total == len(times)
+    assert loaded.percentile(90) == sketch.percentile(90)
+
+def test_time_sketch_clamps_out_of_range_times():
+    sketch = TimeSketch()
+    sketch.add(0.0)
+    sketch.add(10_000)
+    assert sketch.counts[0] == sketch.counts[-1] == 1
+
+def test_unknown_variance_is_rebuilt_from_the_answer_history(tmp_path):
+    db_filepath = tmp_path / "kid.db"
+    times = [2.0, 3.5, 1.0, 4.5]
+    store = AnswerStore.create(db_filepath, (3, 4, 5))
+    answers = [(3, 4, 1, seconds, '2026-01-05 10:00:00') for seconds in times] + [(5, 5, 1, 2.0, '2026-01-05 10:01:00')]
+    # (3, 4) has its whole history; (5, 5) has answers that are not in the history (imported from Excel)
+    store.saveSession([(3, 4, 4, None, 4, statistics.mean(times), 4.5, None, 4, 4, None),
+                       (5, 5, 3, None, 3, 2.0, 2.0, None, 3, 3, None)], answers, 1.0)
+    store.close()
+
+    profile = UserProfile(db_filepath)
+    assert profile.getQuestionStats(3, 4).time_variance == pytest.approx(statistics.variance(times))
+    assert profile.getQuestionStats(3, 4).timePercentile(50) is not None
+    assert profile.getQuestionStats(5, 5).time_variance is None
+    profile.writePerformanceResultsToFile(0)
+    profile.close()
+
+    store = AnswerStore(db_filepath)
+    stats = {row[:2]: QuestionStats(*row) for row in store.loadQuestionStats()}
+    assert stats[(3, 4)].time_variance == pytest.approx(statistics.variance(times))
+    assert stats[(5, 5)].time_m2 is None
+    store.close()
@@ -0,0 +1,87 @@
+import sqlite3
+import openpyxl
+from answer_store import AnswerStore, STATS_COLUMNS, _today
+
+def session_rows():
+    question_rows = [(3, 4, 2, 1, 1, 2.5, 3.0, 0.5, 1, 1, b'\x01\x02'), (7, 8, 1, 0, 1, 4.0, 4.0, 0.0, 1, 1, None)]
+    answers = [(3, 4, 0, 2.0, '2026-01-05 10:00:00'), (3, 4, 1, 3.0, '2026-01-05 10:00:09'),
+               (7, 8, 1, 4.0, '2026-01-05 10:00:15')]
+    return question_rows, answers
+
+def test_create_puts_the_tables_in_focus(tmp_path):
+    store = AnswerStore.create(tmp_path / "kid.db", range(2, 6))
+    assert store.loadFocusProblems() == {(a, b) for a in range(2, 6) for b in range(1, 13)}
+    assert len(store.loadQuestionStats()) == 48
+    assert list(store.loadDailyLog().index) == [_today()]
+    store.close()
+
+    # Creating again adds tables without touching what is there
+    store = AnswerStore.create(tmp_path / "kid.db", range(1, 13))
+    assert len(store.loadFocusProblems()) == 144
+    assert len(store.loadQuestionStats()) == 144
+    store.close()
+
+def test_session_round_trip(tmp_path):
+    store = AnswerStore.create(tmp_path / "kid.db", (3, 4, 7, 8))
+    question_rows, answers = session_rows()
+    store.saveSession(question_rows, answers, 5.0, day='2026-01-05', journal_seq=3)
+    store.saveSession([], [], 2.5, day='2026-01-05')
+    store.close()
+
+    store = AnswerStore(tmp_path / "kid.db")
+    stats = {row[:2]: row for row in store.loadQuestionStats()}
+    assert stats[(3, 4)] == question_rows[0]
+    assert stats[(7, 8)] == question_rows[1]
+    assert stats[(4, 4)] == (4, 4) + (None,) * (len(STATS_COLUMNS) - 2)
+    assert [tuple(row) for row in store.loadAnswers().itertuples(index=False)] == answers
+    assert len(store.loadAnswers(3, 4)) == 2
+    assert store.loadDailyLog().at['2026-01-05', 'Duration (Minutes)'] == 7.5
+    assert store.loadJournalSeq() == 3
+    assert store.loadSummary() == {'answers': 3, 'right': 2, 'last_played': '2026-01-05',
+                                   'last_played_minutes': 7.5, 'minutes_total': 7.5}
+    store.close()
+
+def test_excel_round_trip(tmp_path):
+    store = AnswerStore.create(tmp_path / "kid.db", (3, 4, 7, 8))
+    question_rows, answers = session_rows()
+    store.saveSession(question_rows, answers, 5.0, day='2026-01-05')
+    store.exportExcel(tmp_path / "kid.xlsx")
+    performance = store.loadPerformance()
+    daily_log = store.loadDailyLog()
+    store.close()
+
+    imported = AnswerStore.openProfile(tmp_path / "kid.xlsx")
+    assert imported.loadFocusProblems() == {(a, b) for a in (3, 4, 7, 8) for b in range(1, 13)}
+    assert imported.loadPerformance().equals(performance)
+    assert imported.loadDailyLog().equals(daily_log)
+    assert [tuple(row) for row in imported.loadAnswers().itertuples(index=False)] == answers
+    imported.close()
+
+def test_workbook_without_answers_sheet(tmp_path):
+    store = AnswerStore.create(tmp_path / "kid.db", (3, 4))
+    store.exportExcel(tmp_path / "kid.xlsx")
+    store.close()
+    workbook = openpyxl.load_workbook(tmp_path / "kid.xlsx")
+    del workbook['Answers'] # Older exports only had the first three sheets
+    workbook.save(tmp_path / "old.xlsx")
+
+    imported = AnswerStore.openProfile(tmp_path / "old.xlsx")
+    assert len(imported.loadFocusProblems()) == 24
+    assert imported.loadAnswers().empty
+    imported.close()
+
+def test_old_database_gets_the_new_columns(tmp_path):
+    connection = sqlite3.connect(tmp_path / "old.db")
+    connection.execute("""CREATE TABLE question_stats (a INTEGER NOT NULL, b INTEGER NOT NULL, times_occurred INTEGER,
+                          times_wrong INTEGER, times_right INTEGER, avg_time REAL, last_time REAL, PRIMARY KEY (a, b))""")
+    connection.execute("INSERT INTO question_stats VALUES (2, 3, 4, 1, 3, 2.0, 1.5)")
+    connection.commit()
+    connection.close()
+
+    store = AnswerStore(tmp_path / "old.db")
+    assert store.loadQuestionStats() == [(2, 3, 4, 1, 3, 2.0, 1.5, None, None, None, None)]
+    store.saveSession([(2, 3, 5, 1, 4, 2.0, 2.0, 0.5, 2, 3, None)], [], 1.0)
+    store.close()
+    store = AnswerStore(tmp_path / "old.db")
+    assert store.loadQuestionStats() == [(2, 3, 5, 1, 4, 2.0, 2.0, 0.5, 2, 3, None)]
+    store.close()
@@ -0,0 +1,76 @@
+from answer_store import AnswerStore
+from analytics import UserProfile
+from persistence import AnswerJournal
+
+def test_failed_save_is_retried_with_the_next_save(tmp_path, monkeypatch):
+    db_filepath = tmp_path / "kid.db"
+    save_session = AnswerStore.saveSession
+    calls = []
+    def fail_first_save(store, *args, **kwargs):
+        calls.append(args)
+        if len(calls) == 1:
+            raise OSError("disk full")
+        return save_session(store, *args, **kwargs)
+    monkeypatch.setattr(AnswerStore, 'saveSession', fail_first_save)
+
+    profile = UserProfile(db_filepath)
+    profile.logQuestionResults(False, 3, 4, 2.0)
+    profile.writePerformanceResultsToFile(60)
+    assert not profile.flush(5) # Failed; kept for a retry
+    profile.logQuestionResults(True, 5, 6, 1.0)
+    profile.writePerformanceResultsToFile(60)
+    assert profile.flush(5)
+    profile.close()
+    monkeypatch.setattr(AnswerStore, 'saveSession', save_session)
+
+    restarted = UserProfile(db_filepath)
+    assert restarted.getQuestionStats(3, 4).times_occurred == 1
+    assert restarted.getQuestionStats(3, 4).times_wrong == 1
+    assert restarted.getQuestionStats(5, 6).times_occurred == 1
+    restarted.close()
+    store = AnswerStore(db_filepath)
+    assert len(store.loadAnswers()) == 2
+    assert store.loadDailyLog()['Duration (Minutes)'].sum() == 2.0
+    store.close()
+
+def test_unsaved_answers_are_recovered_from_the_journal_once(tmp_path, monkeypatch):
+    db_filepath = tmp_path / "kid.db"
+    def always_fail(store, *args, **kwargs):
+        raise OSError("disk full")
+    save_session = AnswerStore.saveSession
+    monkeypatch.setattr(AnswerStore, 'saveSession', always_fail)
+    profile = UserProfile(db_filepath)
+    profile.logQuestionResults(False, 7, 8, 3.0)
+    profile.writePerformanceResultsToFile(60)
+    profile.close()
+    monkeypatch.setattr(AnswerStore, 'saveSession', save_session)
+
+    for _ in range(2): # Recovered on the first start, not counted again on the second
+        restarted = UserProfile(db_filepath)
+        assert restarted.getQuestionStats(7, 8).times_occurred == 1
+        restarted.close()
+
+def test_journal_skips_saved_and_torn_entries(tmp_path):
+    journal = AnswerJournal(tmp_path / "kid.journal")
+    for seconds in (1.5, 2.25, 3.0):
+        journal.append(3, 4, 1, seconds, '2026-01-05T10:00:00')
+    journal.close()
+    with open(tmp_path / "kid.journal", 'a', encoding='utf-8') as journal_file:
+        journal_file.write("4,3,4,1,2.") # Crash in the middle of a write
+
+    reopened = AnswerJournal(tmp_path / "kid.journal")
+    assert reopened.readEntries() == [(1, 3, 4, 1, 1.5, '2026-01-05T10:00:00'), (2, 3, 4, 1, 2.25, '2026-01-05T10:00:00'),
+                                      (3, 3, 4, 1, 3.0, '2026-01-05T10:00:00')]
+    assert [entry[0] for entry in reopened.readEntries(after_seq=2)] == [3]
+    assert reopened.last_seq == 3
+    reopened.close()
+
+def test_journal_numbers_keep_counting_after_truncate(tmp_path):
+    journal = AnswerJournal(tmp_path / "kid.journal")
+    journal.append(3, 4, 1, 1.0, '2026-01-05T10:00:00')
+    journal.append(3, 4, 0, 2.0, '2026-01-05T10:00:05')
+    journal.truncate()
+    assert journal.readEntries() == []
+    assert journal.append(5, 6, 1, 0.5, '2026-01-05T10:00:09') == 3
+    assert journal.readEntries() == [(3, 5, 6, 1, 0.5, '2026-01-05T10:00:09')]
+    journal.close()
@@ -0,0 +1,26 @@
+import pytest
+from answer_store import AnswerStore
+from roster import importRoster, parseTables
+
+def test_parse_tables():
+    assert parseTables("2-5") == (2, 3, 4, 5)
+    assert parseTables("2 3;10") == (2, 3, 10)
+    assert parseTables("") == tuple(range(1, 13))
+    with pytest.raises(ValueError):
+        parseTables("5-2")
+    with pytest.raises(ValueError):
+        parseTables("0-3")
+
+def test_bad_rows_are_reported_and_the_rest_imported(tmp_path):
+    roster = tmp_path / "roster.csv"
+    roster.write_text("Name,Tables\nAnn,2-5\nBob,13\nCy,x\nEd,5-2\nbad/name,\nann,\nDee,\n", encoding='utf-8')
+    data_dir = tmp_path / "data"
+
+    results = importRoster(roster, data_dir, workers=2)
+    assert results['created'] == ['Ann', 'Dee']
+    assert results['invalid'] == ['Bob', 'Cy', 'Ed', 'bad/name', 'ann']
+    store = AnswerStore(data_dir / "Ann.db")
+    assert store.loadFocusProblems() == {(a, b) for a in range(2, 6) for b in range(1, 13)}
+    store.close()
+
+    assert importRoster(roster, data_dir)['skipped'] == ['Ann', 'Dee']
@@ -0,0 +1,60 @@
+import random
+import pytest
+from sampler import AliasSampler, questionWeight
+from analytics import QuestionStats
+
+def draw_counts(sampler, draws):
+    counts = dict.fromkeys(sampler.items, 0)
+    for _ in range(draws):
+        counts[sampler.draw()] += 1
+    return counts
+
+def test_draws_follow_the_weights():
+    weights = [1.0, 2.0, 0.5, 8.0, 0.0, 3.5]
+    sampler = AliasSampler(list('abcdef'), weights, rng=random.Random(1))
+    draws = 200_000
+    counts = draw_counts(sampler, draws)
+    for item, weight in zip(sampler.items, weights):
+        assert counts[item] / draws == pytest.approx(weight / sum(weights), abs=0.005)
+    assert counts['e'] == 0
+    assert sampler.rebuilds == 1
+
+def test_set_weight_rebuilds_on_the_next_draw():
+    sampler = AliasSampler(['a', 'b'], rng=random.Random(2))
+    sampler.draw()
+    sampler.setWeight('a', 1.0) # Unchanged
+    sampler.setWeight('missing', 5.0)
+    sampler.draw()
+    assert sampler.rebuilds == 1
+
+    sampler.setWeight('a', 9.0)
+    sampler.setWeight('b', 1.0)
+    assert sampler.probability('a') == pytest.approx(0.9)
+    counts = draw_counts(sampler, 50_000)
+    assert sampler.rebuilds == 2
+    assert counts['a'] / 50_000 == pytest.approx(0.9, abs=0.01)
+
+def test_all_zero_weights_draw_uniformly():
+    sampler = AliasSampler(['a', 'b', 'c'], [0.0, 0.0, 0.0], rng=random.Random(3))
+    counts = draw_counts(sampler, 30_000)
+    assert all(count / 30_000 == pytest.approx(1 / 3, abs=0.015) for count in counts.values())
+
+def test_needs_items():
+    with pytest.raises(ValueError):
+        AliasSampler([])
+
+def test_question_weight_favours_missed_and_slow_questions():
+    def answered(results, seconds):
+        stats = QuestionStats(3, 4)
+        for right in results:
+            stats.record(right, seconds)
+        return stats
+
+    unseen = questionWeight(None)
+    missed = questionWeight(answered([False, False, True], 2.0))
+    slow = questionWeight(answered([True, True, True], 8.0))
+    known = questionWeight(answered([True, True, True], 1.0))
+    mastered = questionWeight(answered([True] * 10, 1.0))
+    assert questionWeight(QuestionStats(3, 4)) == unseen
+    assert missed > slow > known > mastered > 0
+    assert unseen > known
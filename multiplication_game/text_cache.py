@@ -0,0 +1,42 @@
+from collections import OrderedDict
+import pygame
+
+class TextCache:
+    """
+    Rendered text surfaces keyed by (font, text, color, bold), evicted least recently used first.
+    Labels that do not change are rasterized once; text that changes (score, typed answer) is
+    rendered once per distinct value. Returned surfaces are shared, so callers must not draw on them.
+    """
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self.__surfaces = OrderedDict()
+        self.hits = 0
+        self.renders = 0
+
+    def render(self, font:pygame.font.Font, text:str, color, bold:bool=False, antialias:bool=True):
+        key = (font, text, tuple(color), bold, antialias)
+        surface = self.__surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self.__surfaces.move_to_end(key)
+            return surface
+
+        self.renders += 1
+        was_bold = font.get_bold()
+        font.set_bold(bold)
+        surface = font.render(text, antialias, color)
+        font.set_bold(was_bold)
+        self.__surfaces[key] = surface
+        if len(self.__surfaces) > self.max_entries:
+            self.__surfaces.popitem(last=False)
+        return surface
+
+    def clear(self):
+        self.__surfaces.clear()
+
+# Shared by the game and the menus
+text_cache = TextCache()
+
+def render_text(font:pygame.font.Font, text:str, color, bold:bool=False):
+    """Cached replacement for font.render(text, True, color)."""
+    return text_cache.render(font, text, color, bold)
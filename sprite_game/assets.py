@@ -0,0 +1,171 @@
+# assets.py
+#
+# Loads spritesheets and Tiled tilesets (.tsx) and splits them into frame Surfaces.
+#
+# Decoded pixels are cached on disk as raw RGBA with a small header, keyed by the SHA-1 of
+# the source file. A cache hit only reads and hashes the source bytes and then memory-copies
+# the pixels into a Surface; no PNG/GIF decoding is done. Editing a source changes its hash,
+# so stale entries are never used.
+
+import hashlib
+import json
+import struct
+import time
+import xml.etree.ElementTree as ET
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import pygame
+
+IMAGE_EXTENSIONS = ('.png', '.gif', '.bmp', '.jpg', '.jpeg', '.tga')
+
+# --- Raw Surface Cache ---
+
+class SurfaceCache:
+    """
+    Disk cache of decoded images: `<sha1>.raw` files holding a header and RGBA pixel rows.
+    """
+    MAGIC = b'SGAC'
+    VERSION = 1
+    _HEADER = struct.Struct('<4sHII') # magic, version, width, height
+
+    def __init__(self, cache_dir: Path):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+
+    def load(self, image_path: Path) -> Tuple[pygame.Surface, bool]:
+        """Returns (surface, cache_hit) for an image file, decoding and caching it on a miss."""
+        source = Path(image_path).read_bytes()
+        entry = self.cache_dir / f"{hashlib.sha1(source).hexdigest()}.raw"
+
+        if entry.exists():
+            data = entry.read_bytes()
+            magic, version, width, height = self._HEADER.unpack_from(data)
+            if magic == self.MAGIC and version == self.VERSION and len(data) == self._HEADER.size + width * height * 4:
+                self.hits += 1
+                surface = pygame.image.frombuffer(data[self._HEADER.size:], (width, height), 'RGBA')
+                return _convert(surface), True
+
+        # Miss (or an unreadable entry): decode once and store the pixels
+        self.misses += 1
+        surface = pygame.image.load(str(image_path))
+        pixels = pygame.image.tobytes(surface, 'RGBA')
+        temp = entry.with_suffix('.tmp')
+        temp.write_bytes(self._HEADER.pack(self.MAGIC, self.VERSION, *surface.get_size()) + pixels)
+        temp.replace(entry)
+        return _convert(surface), False
+
+def _convert(surface: pygame.Surface) -> pygame.Surface:
+    """Converts to the display's pixel format for fast blits (when a display mode is set)."""
+    if pygame.display.get_surface() is None:
+        return surface.copy() # frombuffer surfaces share the bytes they were built from
+    return surface.convert_alpha()
+
+# --- Splitting ---
+
+def split_sheet(sheet: pygame.Surface, frame_width: int, frame_height: int,
+                margin: int = 0, spacing: int = 0) -> List[pygame.Surface]:
+    """Cuts a spritesheet into frames, row by row. Frames are subsurfaces sharing the sheet's pixels."""
+    frames = []
+    sheet_width, sheet_height = sheet.get_size()
+    y = margin
+    while y + frame_height <= sheet_height - margin:
+        x = margin
+        while x + frame_width <= sheet_width - margin:
+            frames.append(sheet.subsurface((x, y, frame_width, frame_height)))
+            x += frame_width + spacing
+        y += frame_height + spacing
+    return frames
+
+# --- Asset Loader ---
+
+class AssetLoader:
+    """
+    Loads the assets of one directory and logs how long each one took.
+
+    If the directory has an `assets.json` manifest, it lists the assets by name:
+        {"player": {"sheet": "player.png", "frame_size": [32, 32]},
+         "ship":   {"tileset": "ShipTiles.tsx"}}
+    Otherwise every image becomes a one-frame asset and every .tsx a tileset, named by file stem.
+    """
+    def __init__(self, asset_dir: Path, cache_dir: Path = None, budget_ms: float = 250):
+        self.asset_dir = Path(asset_dir)
+        self.cache = SurfaceCache(cache_dir if cache_dir is not None else self.asset_dir / '.cache')
+        self.budget_ms = budget_ms
+        self.load_times: Dict[str, float] = {} # Asset name -> milliseconds
+
+    def load_all(self) -> Tuple[Dict[str, List[pygame.Surface]], Dict[str, Dict[int, pygame.Surface]]]:
+        """Returns (frames by asset name, tiles by tileset name and tile ID)."""
+        frames = {}
+        tilesets = {}
+        started = time.perf_counter()
+        for name, spec in self._manifest().items():
+            asset_started = time.perf_counter()
+            misses_before = self.cache.misses
+            if 'tileset' in spec:
+                tilesets[name] = self.load_tileset(self.asset_dir / spec['tileset'])
+                count = len(tilesets[name])
+            else:
+                frame_size = spec.get('frame_size')
+                frames[name] = self.load_sheet(self.asset_dir / spec['sheet'], frame_size,
+                                               spec.get('margin', 0), spec.get('spacing', 0))
+                count = len(frames[name])
+            elapsed = (time.perf_counter() - asset_started) * 1000
+            self.load_times[name] = elapsed
+            source = "decoded" if self.cache.misses > misses_before else "cache"
+            print(f"[Assets] {name}: {count} frame(s) in {elapsed:.1f}ms ({source})")
+
+        total = (time.perf_counter() - started) * 1000
+        print(f"[Assets] Loaded {len(self.load_times)} assets in {total:.1f}ms "
+              f"({self.cache.hits} cached, {self.cache.misses} decoded)")
+        if total > self.budget_ms:
+            slowest = sorted(self.load_times.items(), key=lambda item: item[1], reverse=True)[:3]
+            print(f"[Assets] Warning: over the {self.budget_ms:.0f}ms startup budget; slowest: "
+                  + ", ".join(f"{name} {ms:.1f}ms" for name, ms in slowest))
+        return frames, tilesets
+
+    def _manifest(self) -> dict:
+        manifest_file = self.asset_dir / 'assets.json'
+        if manifest_file.exists():
+            return json.loads(manifest_file.read_text())
+        manifest = {}
+        for path in sorted(self.asset_dir.iterdir()):
+            if path.suffix.lower() in IMAGE_EXTENSIONS:
+                manifest[path.stem] = {'sheet': path.name}
+            elif path.suffix.lower() == '.tsx':
+                manifest[path.stem] = {'tileset': path.name}
+        return manifest
+
+    def load_sheet(self, path: Path, frame_size: Tuple[int, int] = None,
+                   margin: int = 0, spacing: int = 0) -> List[pygame.Surface]:
+        """Loads an image; with frame_size it is split into frames, otherwise it is one frame."""
+        sheet, _ = self.cache.load(path)
+        if frame_size is None:
+            return [sheet]
+        return split_sheet(sheet, frame_size[0], frame_size[1], margin, spacing)
+
+    def load_tileset(self, tsx_path: Path) -> Dict[int, pygame.Surface]:
+        """
+        Loads a Tiled tileset. Both kinds are supported: a single tilesheet image (split using
+        tilewidth/tileheight/margin/spacing) and a collection of one image per tile.
+        Returns the tiles by local tile ID.
+        """
+        tsx_path = Path(tsx_path)
+        root = ET.parse(tsx_path).getroot()
+        tiles = {}
+
+        sheet_image = root.find('image')
+        if sheet_image is not None:
+            frames = self.load_sheet(tsx_path.parent / sheet_image.attrib['source'],
+                                     (int(root.attrib['tilewidth']), int(root.attrib['tileheight'])),
+                                     int(root.attrib.get('margin', 0)), int(root.attrib.get('spacing', 0)))
+            tile_count = int(root.attrib.get('tilecount', len(frames)))
+            tiles.update(enumerate(frames[:tile_count]))
+
+        for tile in root.iter('tile'):
+            image = tile.find('image')
+            if image is not None:
+                tiles[int(tile.attrib['id'])] = self.load_sheet(tsx_path.parent / image.attrib['source'])[0]
+        return tiles
@@ -0,0 +1,74 @@
+# bench_collision.py
+#
+# Benchmark of the SpatialHash broadphase on EntityStore entities.
+# Entities are spread over a world that grows with the entity count, so the
+# density (and therefore the number of overlaps per entity) stays constant.
+# Run from the sprite_game folder:
+#     python bench_collision.py
+
+import time
+import numpy as np
+
+from entities import EntityStore
+from spatial_hash import SpatialHash
+
+TILE_SIZE = 32
+ENTITY_SIZE = 16
+ENTITIES_PER_TILE = 0.25
+FRAMES = 20
+
+def make_store(count: int, rng: np.random.Generator) -> EntityStore:
+    world = int((count / ENTITIES_PER_TILE) ** 0.5) * TILE_SIZE
+    store = EntityStore(world, world, capacity=count)
+    for x, y in rng.uniform(0, world - ENTITY_SIZE, size=(count, 2)):
+        store.add(x, y, ENTITY_SIZE, ENTITY_SIZE, speed=2, direction=tuple(rng.uniform(-1, 1, 2)), bounce=True)
+    return store
+
+def brute_force_pairs(store: EntityStore) -> int:
+    """O(n^2) reference, vectorized one row at a time."""
+    n = store.count
+    left, top = store.position[:n, 0], store.position[:n, 1]
+    right, bottom = left + store.size[:n, 0], top + store.size[:n, 1]
+    total = 0
+    for i in range(n - 1):
+        overlap = (left[i] < right[i + 1:]) & (left[i + 1:] < right[i]) & (top[i] < bottom[i + 1:]) & (top[i + 1:] < bottom[i])
+        total += int(np.count_nonzero(overlap))
+    return total
+
+def run(count: int):
+    rng = np.random.default_rng(count)
+    store = make_store(count, rng)
+    grid = SpatialHash(TILE_SIZE)
+
+    start = time.perf_counter()
+    grid.sync_store(store)
+    build_seconds = time.perf_counter() - start
+
+    sync_seconds = 0.0
+    pair_seconds = 0.0
+    pairs_found = 0
+    for _ in range(FRAMES):
+        moved = store.step(16)
+        start = time.perf_counter()
+        grid.sync_store(store, moved)
+        sync_seconds += time.perf_counter() - start
+
+        start = time.perf_counter()
+        pairs_found += len(grid.pairs())
+        pair_seconds += time.perf_counter() - start
+
+    line = (f"{count:>7} entities | build {build_seconds * 1000:7.1f}ms | sync {sync_seconds / FRAMES * 1000:7.2f}ms/frame | "
+            f"pairs {pair_seconds / FRAMES * 1000:7.2f}ms/frame | {pairs_found / FRAMES:7.0f} pairs/frame | "
+            f"{pairs_found / pair_seconds:10.0f} pairs/s | {count * FRAMES / (sync_seconds + pair_seconds):10.0f} entities/s")
+    print(line)
+
+    if count <= 1000:
+        start = time.perf_counter()
+        expected = brute_force_pairs(store)
+        brute_seconds = time.perf_counter() - start
+        print(f"{'':>7}   O(n^2) scan: {brute_seconds * 1000:.2f}ms for {expected} pairs "
+              f"(grid found {len(grid.pairs())})")
+
+if __name__ == '__main__':
+    for count in (1000, 10000, 50000):
+        run(count)
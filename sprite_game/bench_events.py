@@ -0,0 +1,86 @@
+# bench_events.py
+#
+# Microbenchmark of event allocation and dispatch rate.
+# Compares the original dict-based event classes with the __slots__ events
+# and the pooled event path. Run from the sprite_game folder:
+#     python bench_events.py
+
+import gc
+import timeit
+import tracemalloc
+
+from event import EventManager, EventPool, EventType, GameState, PlayerMovedEvent, StateChangeEvent
+
+# --- Original (dict based) event classes, kept here only for comparison ---
+
+class LegacyGameEvent:
+    def __init__(self, type: EventType, data: dict = None):
+        self.type = type
+        self.data = data if data is not None else {}
+
+class LegacyStateChangeEvent(LegacyGameEvent):
+    def __init__(self, new_state: GameState):
+        super().__init__(EventType.STATE_CHANGE, {'new_state': new_state})
+
+EVENTS_PER_FRAME = 1000
+FRAMES = 200
+
+def _listener(event):
+    pass
+
+def alloc_legacy():
+    for i in range(EVENTS_PER_FRAME):
+        LegacyGameEvent(EventType.PLAYER_MOVED, {'position': (i, i)})
+        LegacyStateChangeEvent(GameState.PLAYING)
+
+def alloc_slots():
+    for i in range(EVENTS_PER_FRAME):
+        PlayerMovedEvent(i, i)
+        StateChangeEvent(GameState.PLAYING)
+
+def make_dispatch(event_manager: EventManager, factory):
+    def run():
+        post = event_manager.post
+        for i in range(EVENTS_PER_FRAME):
+            post(factory(i))
+        event_manager.dispatch()
+    return run
+
+def bytes_per_event(factory) -> float:
+    """Measures the memory held by EVENTS_PER_FRAME live events."""
+    gc.collect()
+    tracemalloc.start()
+    events = [factory(i) for i in range(EVENTS_PER_FRAME)]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del events
+    return size / EVENTS_PER_FRAME
+
+def report(label: str, seconds: float, events: int):
+    print(f"{label:<34} {events / seconds / 1e6:8.2f} M events/s")
+
+if __name__ == '__main__':
+    total = EVENTS_PER_FRAME * FRAMES
+
+    print("--- Allocation ---")
+    report("legacy GameEvent + StateChange", timeit.timeit(alloc_legacy, number=FRAMES), 2 * total)
+    report("__slots__ events", timeit.timeit(alloc_slots, number=FRAMES), 2 * total)
+
+    print("--- Queued dispatch (no coalescing) ---")
+    for label, manager, factory in (
+        ("legacy events", EventManager(queued=True), lambda i: LegacyGameEvent(EventType.ITEM_PICKUP, {'id': i})),
+        ("__slots__ events", EventManager(queued=True), lambda i: StateChangeEvent(GameState.PLAYING)),
+    ):
+        manager.subscribe(EventType.ITEM_PICKUP, _listener)
+        manager.subscribe(EventType.STATE_CHANGE, _listener)
+        report(label, timeit.timeit(make_dispatch(manager, factory), number=FRAMES), total)
+
+    pooled = EventManager(queued=True, pool=EventPool(max_size=EVENTS_PER_FRAME))
+    pooled.subscribe(EventType.STATE_CHANGE, _listener)
+    acquire = pooled.create
+    report("pooled __slots__ events", timeit.timeit(
+        make_dispatch(pooled, lambda i: acquire(StateChangeEvent, GameState.PLAYING)), number=FRAMES), total)
+
+    print("--- Memory ---")
+    print(f"{'legacy GameEvent':<34} {bytes_per_event(lambda i: LegacyGameEvent(EventType.PLAYER_MOVED, {'position': (i, i)})):8.0f} bytes/event")
+    print(f"{'PlayerMovedEvent':<34} {bytes_per_event(lambda i: PlayerMovedEvent(i, i)):8.0f} bytes/event")
@@ -0,0 +1,57 @@
+# bench_render_scale.py
+#
+# Compares drawing the world straight onto the window against drawing it to a small internal
+# framebuffer that is upscaled by an integer factor once per frame.
+# Runs headless (SDL dummy video driver). Run from the sprite_game folder:
+#     python bench_render_scale.py
+
+import os
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+import random
+import time
+import pygame
+
+from renderer import Renderer
+
+FRAMES = 60
+SPRITE_COUNT = 300
+WINDOWS = {'1080p': (1920, 1080), '4K': (3840, 2160)}
+INTERNAL_RESOLUTIONS = [None, (400, 300), (480, 270)]
+
+class _BenchSprite(pygame.sprite.Sprite):
+    def __init__(self, image, x, y):
+        super().__init__()
+        self.image = image
+        self.rect = image.get_rect(topleft=(x, y))
+
+def run(window, internal_resolution) -> tuple:
+    renderer = Renderer(window[0], window[1], "Render scale benchmark", internal_resolution=internal_resolution)
+    renderer.load_assets()
+    # A map big enough to cover a native 4K view with 32px tiles
+    rng = random.Random(0)
+    renderer.map_data = [[rng.choice((0, 0, 0, 1, 2)) for _ in range(130)] for _ in range(80)]
+    sprites = [_BenchSprite(renderer.assets['player'], rng.randrange(0, 130 * 32), rng.randrange(0, 80 * 32))
+               for _ in range(SPRITE_COUNT)]
+    renderer.camera_offset.update(16, 16)
+
+    renderer.update_display(sprites, limit_fps=False) # Warm up
+    start = time.perf_counter()
+    for _ in range(FRAMES):
+        renderer.update_display(sprites, limit_fps=False)
+    frame_ms = (time.perf_counter() - start) / FRAMES * 1000
+    world_pixels = renderer.view_width * renderer.view_height
+    return frame_ms, world_pixels, renderer.upscale_factor
+
+if __name__ == '__main__':
+    pygame.init()
+    for window_name, window in WINDOWS.items():
+        baseline = None
+        for internal_resolution in INTERNAL_RESOLUTIONS:
+            frame_ms, world_pixels, factor = run(window, internal_resolution)
+            if baseline is None:
+                baseline = frame_ms
+            label = "native" if internal_resolution is None else f"{internal_resolution[0]}x{internal_resolution[1]} x{factor}"
+            print(f"{window_name:>6} {label:<14} {frame_ms:7.2f} ms/frame | {world_pixels / 1e6:6.2f} M world px drawn | "
+                  f"{baseline / frame_ms:5.1f}x vs native")
+    pygame.quit()
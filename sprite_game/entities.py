@@ -0,0 +1,125 @@
+# entities.py
+
+import numpy as np
+import pygame
+
+class EntityStore:
+    """
+    Struct-of-arrays storage for moving entities (player, NPCs, projectiles).
+    Positions, directions, speeds and sizes live in contiguous NumPy arrays so that
+    movement, diagonal normalization and world clamping run as one vectorized step
+    instead of one Python `update` call per sprite.
+
+    Row i of every array belongs to entity i. Removed rows are recycled by `add`.
+    """
+    def __init__(self, world_width: float, world_height: float, capacity: int = 256):
+        self.world_width = world_width
+        self.world_height = world_height
+
+        self.position = np.zeros((capacity, 2), dtype=np.float64)  # top-left x, y in world pixels
+        self.direction = np.zeros((capacity, 2), dtype=np.float64) # desired movement direction (any length)
+        self.size = np.zeros((capacity, 2), dtype=np.float64)      # width, height
+        self.speed = np.zeros(capacity, dtype=np.float64)          # pixels per frame at 60 FPS
+        self.bounce = np.zeros(capacity, dtype=bool)               # reverse direction on hitting the world edge
+        self.alive = np.zeros(capacity, dtype=bool)
+
+        self.count = 0 # Highest used row + 1
+        self._free_rows = []
+
+    @property
+    def capacity(self) -> int:
+        return len(self.alive)
+
+    def _grow(self):
+        """Doubles the capacity of every array."""
+        new_capacity = self.capacity * 2
+        for name in ('position', 'direction', 'size', 'speed', 'bounce', 'alive'):
+            old = getattr(self, name)
+            new = np.zeros((new_capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:len(old)] = old
+            setattr(self, name, new)
+
+    def add(self, x: float, y: float, width: float, height: float, speed: float,
+            direction: tuple = (0, 0), bounce: bool = False) -> int:
+        """Adds an entity and returns its row index."""
+        if self._free_rows:
+            index = self._free_rows.pop()
+        else:
+            if self.count == self.capacity:
+                self._grow()
+            index = self.count
+            self.count += 1
+        self.position[index] = (x, y)
+        self.direction[index] = direction
+        self.size[index] = (width, height)
+        self.speed[index] = speed
+        self.bounce[index] = bounce
+        self.alive[index] = True
+        return index
+
+    def remove(self, index: int):
+        """Frees an entity's row for reuse."""
+        self.alive[index] = False
+        self.direction[index] = 0
+        self._free_rows.append(index)
+
+    def step(self, delta_time: float, rows: np.ndarray = None) -> np.ndarray:
+        """
+        Moves every live entity by one frame and returns a bool array of the rows that moved.
+        delta_time is in milliseconds; speeds are normalized to a 60 FPS baseline like Player.update.
+        rows optionally limits the step to some row indices (the result then follows their order).
+        """
+        rows = slice(0, self.count) if rows is None else rows
+        position = self.position[rows]
+        direction = self.direction[rows]
+        size = self.size[rows]
+
+        # Normalize direction so diagonal movement is no faster than straight movement
+        length = np.hypot(direction[:, 0], direction[:, 1])
+        moving = (length > 0) & self.alive[rows]
+        scale = np.zeros(len(length))
+        np.divide(self.speed[rows] * (delta_time / 1000) * 60, length, out=scale, where=moving)
+
+        old_position = position.copy()
+        position += direction * scale[:, None]
+
+        # Clamp to the world bounds
+        max_x = self.world_width - size[:, 0]
+        max_y = self.world_height - size[:, 1]
+        hit_x = (position[:, 0] < 0) | (position[:, 0] > max_x)
+        hit_y = (position[:, 1] < 0) | (position[:, 1] > max_y)
+        np.clip(position[:, 0], 0, max_x, out=position[:, 0])
+        np.clip(position[:, 1], 0, max_y, out=position[:, 1])
+
+        # Bouncing entities reverse direction on the axis they hit
+        bounce = self.bounce[rows]
+        direction[bounce & hit_x, 0] *= -1
+        direction[bounce & hit_y, 1] *= -1
+
+        # Fancy-indexed rows are copies, so write them back (a no-op for the slice views)
+        self.position[rows] = position
+        self.direction[rows] = direction
+        return moving & np.any(position != old_position, axis=1)
+
+class EntitySprite(pygame.sprite.Sprite):
+    """
+    Lightweight sprite view onto one row of an EntityStore. It holds no position of its
+    own; `rect` is built from the store when the renderer asks for it.
+    """
+    def __init__(self, store: EntityStore, index: int, image: pygame.Surface):
+        super().__init__()
+        self.store = store
+        self.index = index
+        self.image = image
+
+    @property
+    def rect(self) -> pygame.Rect:
+        x, y = self.store.position[self.index]
+        width, height = self.store.size[self.index]
+        return pygame.Rect(int(x), int(y), int(width), int(height))
+
+    def kill(self):
+        """Removes the sprite from all groups and frees its row in the store."""
+        super().kill()
+        if self.store.alive[self.index]:
+            self.store.remove(self.index)
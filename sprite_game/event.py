@@ -1,5 +1,8 @@
 # event.py
 
+import queue
+import threading
+import time
 from enum import Enum
 
 # --- Enums for common event types and game state ---
@@ -18,46 +21,394 @@ class EventType(Enum):
     ITEM_PICKUP = 2
     STATE_CHANGE = 3
 
-# --- Core Event Class ---
+# --- Core Event Classes ---
 
 class GameEvent:
-    """Base class for all game events."""
+    """
+    Base class for all game events.
+    Declared with __slots__ so instances carry no per-object __dict__.
+    """
+    __slots__ = ('type', 'data')
+
     def __init__(self, type: EventType, data: dict = None):
         self.type = type
         self.data = data if data is not None else {}
 
+    # Lets an EventPool re-initialize a recycled instance in place
+    reset = __init__
+
     def __repr__(self):
         return f"GameEvent(type={self.type.name}, data={self.data})"
 
+class PlayerMovedEvent(GameEvent):
+    """Posted when the player moves. Carries the player's center as typed fields."""
+    __slots__ = ('x', 'y')
+
+    def __init__(self, x: float = 0, y: float = 0):
+        self.type = EventType.PLAYER_MOVED
+        self.data = None
+        self.x = x
+        self.y = y
+
+    reset = __init__
+
+    @property
+    def position(self) -> tuple:
+        return (self.x, self.y)
+
+    def __repr__(self):
+        return f"PlayerMovedEvent(x={self.x}, y={self.y})"
+
+class StateChangeEvent(GameEvent):
+    """Posted when the global game state changes."""
+    __slots__ = ('new_state',)
+
+    def __init__(self, new_state: GameState = GameState.PLAYING):
+        self.type = EventType.STATE_CHANGE
+        self.data = None
+        self.new_state = new_state
+
+    reset = __init__
+
+    def __repr__(self):
+        return f"StateChangeEvent(new_state={self.new_state.name})"
+
+# --- Event Pool ---
+
+class EventPool:
+    """
+    Recycles event objects so hot paths do not allocate a new event every frame.
+    Events are handed out by `acquire` and returned by the EventManager after dispatch,
+    so listeners must not keep a reference to a pooled event past their call.
+    """
+    def __init__(self, max_size: int = 256):
+        self.max_size = max_size # Maximum number of idle instances kept per event class
+        self._free = {}
+
+    def acquire(self, event_cls, *args):
+        """Returns an initialized event of event_cls, reusing an idle one when available."""
+        free = self._free.get(event_cls)
+        if free:
+            event = free.pop()
+            event.reset(*args)
+            return event
+        return event_cls(*args)
+
+    def release(self, event: GameEvent):
+        """Returns an event to the pool once nothing references it any more."""
+        free = self._free.get(event.__class__)
+        if free is None:
+            free = self._free[event.__class__] = []
+        if len(free) < self.max_size:
+            free.append(event)
+
+    def idle_count(self, event_cls) -> int:
+        """Returns the number of idle instances of event_cls."""
+        return len(self._free.get(event_cls, ()))
+
+# --- Background Listener Workers ---
+
+class BackgroundWorkerPool:
+    """
+    Runs slow listeners (telemetry, autosave, uploads) on worker threads so they never stall the frame.
+    Work goes through a bounded queue. When the queue is full the drop policy decides what happens:
+      'drop_newest' - discard the event being submitted
+      'drop_oldest' - discard the oldest queued event to make room
+      'block'       - wait up to block_timeout seconds for room (back-pressure), then drop the new event
+    Each submit counts at most one drop. Events submitted after shutdown are dropped.
+    """
+    DROP_POLICIES = ('drop_newest', 'drop_oldest', 'block')
+
+    def __init__(self, workers: int = 2, max_queue: int = 1024, drop_policy: str = 'drop_oldest', block_timeout: float = 0.002):
+        if drop_policy not in self.DROP_POLICIES:
+            raise ValueError(f"drop_policy must be one of {self.DROP_POLICIES}, not {drop_policy!r}")
+        self.drop_policy = drop_policy
+        self.block_timeout = block_timeout
+        self.dropped = 0
+        self.errors = 0
+
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._stats_lock = threading.Lock()
+        # Serializes submits with each other and with shutdown, so a drop_oldest eviction always
+        # makes room for its own event and never discards a worker's stop sentinel
+        self._submit_lock = threading.Lock()
+        self._closed = False
+        # listener name -> [calls, total run seconds, max run seconds, total queue wait seconds]
+        self._latency = {}
+
+        self._threads = []
+        for i in range(workers):
+            thread = threading.Thread(target=self._work, name=f"EventWorker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def submit(self, listener, event: GameEvent) -> bool:
+        """Queues a listener call. Returns False if the event was dropped."""
+        item = (listener, event, time.perf_counter())
+        with self._submit_lock:
+            if not self._closed:
+                try:
+                    self._queue.put_nowait(item)
+                    return True
+                except queue.Full:
+                    pass
+
+                if self.drop_policy == 'block':
+                    try:
+                        self._queue.put(item, timeout=self.block_timeout)
+                        return True
+                    except queue.Full:
+                        pass
+                elif self.drop_policy == 'drop_oldest':
+                    try:
+                        self._queue.get_nowait()
+                    except queue.Empty:
+                        pass # The workers made room in the meantime
+                    else:
+                        self._queue.task_done()
+                        self._count_drop()
+                    # Workers only take items and other submits wait for the lock, so there is room
+                    self._queue.put_nowait(item)
+                    return True
+        self._count_drop()
+        return False
+
+    def _count_drop(self):
+        with self._stats_lock:
+            self.dropped += 1
+
+    def _work(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                self._queue.task_done()
+                return
+            listener, event, enqueued_at = item
+            started_at = time.perf_counter()
+            try:
+                listener(event)
+            except Exception as e:
+                with self._stats_lock:
+                    self.errors += 1
+                print(f"[EventWorker] Listener {_listener_name(listener)} failed: {e}")
+            finished_at = time.perf_counter()
+
+            run_time = finished_at - started_at
+            name = _listener_name(listener)
+            with self._stats_lock:
+                stats = self._latency.get(name)
+                if stats is None:
+                    stats = self._latency[name] = [0, 0.0, 0.0, 0.0]
+                stats[0] += 1
+                stats[1] += run_time
+                stats[2] = max(stats[2], run_time)
+                stats[3] += started_at - enqueued_at
+            self._queue.task_done()
+
+    def queue_depth(self) -> int:
+        """Returns the number of listener calls waiting for a worker."""
+        return self._queue.qsize()
+
+    def stats(self) -> dict:
+        """Returns queue depth, drop/error counts and per-listener latency in milliseconds."""
+        with self._stats_lock:
+            listeners = {
+                name: {
+                    'calls': calls,
+                    'avg_run_ms': total_run / calls * 1000,
+                    'max_run_ms': max_run * 1000,
+                    'avg_wait_ms': total_wait / calls * 1000,
+                }
+                for name, (calls, total_run, max_run, total_wait) in self._latency.items()
+            }
+            return {
+                'queue_depth': self._queue.qsize(),
+                'dropped': self.dropped,
+                'errors': self.errors,
+                'listeners': listeners,
+            }
+
+    def flush(self):
+        """Blocks until every queued listener call has finished."""
+        self._queue.join()
+
+    def shutdown(self, wait: bool = True):
+        """Stops the workers, letting them finish queued work first when wait is True."""
+        with self._submit_lock:
+            self._closed = True # No submit can evict the sentinels below
+        for _ in self._threads:
+            self._queue.put(None)
+        if wait:
+            for thread in self._threads:
+                thread.join()
+        self._threads = []
+
+def _listener_name(listener) -> str:
+    return getattr(listener, '__qualname__', repr(listener))
+
 # --- Event Manager ---
 
 class EventManager:
     """
     Manages the subscription and notification of events.
     This pattern allows components to communicate without direct references.
+
+    In immediate mode (the default) `post` calls listeners right away. In queued
+    mode events are buffered and delivered once per frame by `dispatch`, and
+    events whose type is in `coalesce_types` collapse so only the latest survives.
+    Listeners subscribed with background=True are run by a BackgroundWorkerPool instead
+    of inline; everything else stays synchronous on the main thread.
     """
-    def __init__(self):
-        # A dictionary mapping EventType to a list of subscriber functions/methods
+    def __init__(self, queued: bool = False, verbose: bool = False, pool: EventPool = None,
+                 workers: BackgroundWorkerPool = None):
+        # A dictionary mapping EventType to a list of subscriber functions/methods,
+        # kept sorted by priority (highest first)
         self._listeners = {}
+        # Parallel lists of priorities used to keep the listener lists sorted
+        self._priorities = {}
+
+        self.queued = queued
+        self.verbose = verbose # Logging is off by default; checked before any string is built
+
+        # Event types where only the most recent event per frame matters
+        self.coalesce_types = {EventType.PLAYER_MOVED}
+
+        # Pending events for queued mode, plus the queue slot of each coalesced type
+        self._queue = []
+        self._coalesced_slots = {}
+
+        # Optional pool that delivered events are returned to
+        self.pool = pool
+
+        # Background listeners per event type and the worker pool that runs them (created on first use)
+        self._background_listeners = {}
+        self.workers = workers
+
+    def create(self, event_cls, *args) -> GameEvent:
+        """Builds an event of event_cls, taking it from the pool when one is attached."""
+        if self.pool is not None:
+            return self.pool.acquire(event_cls, *args)
+        return event_cls(*args)
+
+    def subscribe(self, event_type: EventType, listener, priority: int = 0, background: bool = False):
+        """
+        Register a listener (a callable) for a specific event type.
+        Listeners with a higher priority are called first; equal priorities keep
+        their subscription order. Background listeners run on worker threads, so
+        they must not touch pygame or other main-thread state.
+        """
+        if background:
+            if self.workers is None:
+                self.workers = BackgroundWorkerPool()
+            self._background_listeners.setdefault(event_type, []).append(listener)
+            if self.verbose:
+                print(f"[EventManager] Registered background listener for {event_type.name}")
+            return
 
-    def subscribe(self, event_type: EventType, listener):
-        """Register a listener (a callable) for a specific event type."""
         if event_type not in self._listeners:
             self._listeners[event_type] = []
-        self._listeners[event_type].append(listener)
-        print(f"[EventManager] Registered listener for {event_type.name}")
+            self._priorities[event_type] = []
+        priorities = self._priorities[event_type]
+
+        # Insert after every listener with the same or higher priority
+        index = len(priorities)
+        while index > 0 and priorities[index - 1] < priority:
+            index -= 1
+        priorities.insert(index, priority)
+        self._listeners[event_type].insert(index, listener)
+        if self.verbose:
+            print(f"[EventManager] Registered listener for {event_type.name} (priority {priority})")
+
+    def unsubscribe(self, event_type: EventType, listener):
+        """Remove a previously registered listener."""
+        background = self._background_listeners.get(event_type)
+        if background and listener in background:
+            background.remove(listener)
+            return
+        listeners = self._listeners.get(event_type)
+        if listeners and listener in listeners:
+            index = listeners.index(listener)
+            del listeners[index]
+            del self._priorities[event_type][index]
 
     def post(self, event: GameEvent):
-        """Notify all subscribers for the given event's type."""
-        print(f"[EventManager] Posting event: {event}")
-        if event.type in self._listeners:
-            for listener in self._listeners[event.type]:
-                listener(event)
+        """
+        Notify all subscribers for the given event's type.
+        In queued mode the event is buffered until the next `dispatch` call.
+        """
+        if not self.queued:
+            handed_off = self._notify(event)
+            if self.pool is not None and not handed_off:
+                self.pool.release(event)
+            return
 
-# Example Event:
-class StateChangeEvent(GameEvent):
-    def __init__(self, new_state: GameState):
-        super().__init__(EventType.STATE_CHANGE, {'new_state': new_state})
+        if event.type in self.coalesce_types:
+            slot = self._coalesced_slots.get(event.type)
+            if slot is not None:
+                # Replace the pending event in place so only the latest survives
+                if self.pool is not None:
+                    self.pool.release(self._queue[slot])
+                self._queue[slot] = event
+                return
+            self._coalesced_slots[event.type] = len(self._queue)
+        self._queue.append(event)
+
+    def dispatch(self):
+        """
+        Delivers all queued events in the order they were posted.
+        Events posted by listeners during dispatch are delivered on the next call.
+        """
+        if not self._queue:
+            return
+        pending = self._queue
+        self._queue = []
+        self._coalesced_slots = {}
+        if self.pool is None:
+            for event in pending:
+                self._notify(event)
+        else:
+            release = self.pool.release
+            for event in pending:
+                if not self._notify(event):
+                    release(event)
+
+    def pending_count(self) -> int:
+        """Returns the number of events waiting to be dispatched."""
+        return len(self._queue)
+
+    def queue_depth(self) -> int:
+        """Returns the number of background listener calls waiting for a worker."""
+        return self.workers.queue_depth() if self.workers is not None else 0
+
+    def background_stats(self) -> dict:
+        """Returns queue depth, drops and per-listener latency of the background workers."""
+        if self.workers is None:
+            return {'queue_depth': 0, 'dropped': 0, 'errors': 0, 'listeners': {}}
+        return self.workers.stats()
+
+    def shutdown(self, wait: bool = True):
+        """Stops the background workers, finishing queued listener calls when wait is True."""
+        if self.workers is not None:
+            self.workers.shutdown(wait)
+            self.workers = None
+
+    def _notify(self, event: GameEvent) -> bool:
+        """
+        Calls every listener registered for the event's type.
+        Returns True if the event was handed to a background worker (so it must not be pooled).
+        """
+        if self.verbose:
+            print(f"[EventManager] Posting event: {event}")
+        listeners = self._listeners.get(event.type)
+        if listeners:
+            for listener in listeners:
+                listener(event)
+        background = self._background_listeners.get(event.type)
+        if background:
+            for listener in background:
+                self.workers.submit(listener, event)
+            return True
+        return False
 
 # This file is critical for decoupling components (e.g., Player posts a MOVE event, 
 # and the Game or Renderer listens for it, but they don't know each other).
\ No newline at end of file
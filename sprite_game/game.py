@@ -3,79 +3,83 @@
 import pygame
 import sys
 import os
+import time
+import random
+import argparse
 
 # Import modules
-from event import EventManager, GameState, GameEvent, EventType, StateChangeEvent
+from event import EventManager, GameState, GameEvent, EventType, StateChangeEvent, PlayerMovedEvent
 from input import InputHandler
 from renderer import Renderer
+from replay import InputRecorder, ReplayReader, feed_actions
+from latency import InputLatencyTracker
+from entities import EntityStore, EntitySprite
+from spatial_hash import SpatialHash
+from world import StreamingWorld
+from visibility import FieldOfView
+from minimap import Minimap
+from net import GameServer, NetClient, actions_to_mask
 
 # --- Entity/Sprite Class (Player) ---
 
-class Player(pygame.sprite.Sprite):
-    """A basic player sprite controlled by input."""
-    def __init__(self, renderer: Renderer, event_manager: EventManager, x: int, y: int):
-        super().__init__()
-        self.renderer = renderer
-        self.event_manager = event_manager
-        
-        # Graphics and Position
-        self.image = self.renderer.assets.get('player')
-        if not self.image:
+class Player(EntitySprite):
+    """
+    A basic player sprite controlled by input.
+    Its position lives in the engine's EntityStore; `update` only sets the movement
+    direction and the store moves every entity at once.
+    """
+    def __init__(self, renderer: Renderer, event_manager: EventManager, entities: EntityStore, x: int, y: int,
+                 latency_tracker: InputLatencyTracker = None):
+        # Graphics
+        image = renderer.assets.get('player')
+        if not image:
              # Fallback if asset loading failed
-            self.image = pygame.Surface((renderer.tile_size, renderer.tile_size))
-            self.image.fill((255, 0, 0)) # Red square
-        
-        self.rect = self.image.get_rect(topleft=(x, y))
+            image = pygame.Surface((renderer.tile_size, renderer.tile_size))
+            image.fill((255, 0, 0)) # Red square
+
+        # Position and movement are stored in the entity store
         self.speed = 5
+        index = entities.add(x, y, image.get_width(), image.get_height(), self.speed)
+        super().__init__(entities, index, image)
+
+        self.renderer = renderer
+        self.event_manager = event_manager
+        self.latency_tracker = latency_tracker
         self.current_state = GameState.PLAYING
 
     def update_state(self, event: StateChangeEvent):
         """Listener method to change the player's state based on global events."""
-        self.current_state = event.data['new_state']
+        self.current_state = event.new_state
         print(f"[Player] New state set: {self.current_state.name}")
 
     def update(self, actions: dict, delta_time: float):
         """
-        Updates the player's position based on input actions.
-        delta_time is used for frame-rate independent movement.
+        Sets the player's movement direction from input actions.
+        The EntityStore applies speed, diagonal normalization and world clamping.
         """
+        direction = self.store.direction[self.index]
         if self.current_state != GameState.PLAYING:
+            direction[:] = 0
             return
 
-        dx, dy = 0, 0
-        speed = self.speed * (delta_time / 1000) * 60 # Normalize speed to 60 FPS baseline
-
-        if actions['move_up']:
-            dy -= speed
-        if actions['move_down']:
-            dy += speed
-        if actions['move_left']:
-            dx -= speed
-        if actions['move_right']:
-            dx += speed
-        
-        # Normalize diagonal movement (prevents faster movement diagonally)
-        if dx != 0 and dy != 0:
-            norm = (dx**2 + dy**2)**0.5
-            dx = dx / norm * speed
-            dy = dy / norm * speed
-
-        # Simple collision check with world bounds (mocking)
-        new_x = self.rect.x + dx
-        new_y = self.rect.y + dy
-
-        # Clamp position to a mock boundary (e.g., 32x32 * 10 tiles)
-        map_width = 10 * self.renderer.tile_size
-        map_height = 10 * self.renderer.tile_size
-
-        self.rect.x = max(0, min(new_x, map_width - self.rect.width))
-        self.rect.y = max(0, min(new_y, map_height - self.rect.height))
-        
+        dx = int(actions['move_right']) - int(actions['move_left'])
+        dy = int(actions['move_down']) - int(actions['move_up'])
+        direction[0] = dx
+        direction[1] = dy
+
+        # Stamp the first frame that reacts to each movement key press
+        if self.latency_tracker and (dx != 0 or dy != 0):
+            for action in ('move_up', 'move_down', 'move_left', 'move_right'):
+                if actions[action]:
+                    self.latency_tracker.mark_reacted(action)
+
+    def on_moved(self):
+        """Called by the engine after an entity step that moved the player."""
         # Post a MOVED event for other systems to track
-        if dx != 0 or dy != 0:
-             self.event_manager.post(
-                GameEvent(EventType.PLAYER_MOVED, {'position': self.rect.center})
-             )
+        rect = self.rect
+        self.event_manager.post(
+            self.event_manager.create(PlayerMovedEvent, rect.centerx, rect.centery)
+        )
 
 
 # --- Main Game Engine Class ---
@@ -84,31 +88,67 @@ class GameEngine:
     """
     The main orchestrator of the game engine. Initializes subsystems and runs the loop.
     """
-    def __init__(self, width: int = 800, height: int = 600):
+    def __init__(self, width: int = 800, height: int = 600, headless: bool = False, stream_world: bool = False,
+                 fog_of_war: bool = False, minimap: bool = False, internal_resolution: tuple = None):
         # 1. Initialize Pygame
+        if headless:
+            # No window; used for replays and profiling runs
+            os.environ['SDL_VIDEODRIVER'] = 'dummy'
         pygame.init()
         
         # 2. Initialize Subsystems
-        self.event_manager = EventManager()
+        # Events are queued during the update and dispatched once per frame.
+        # No EventPool: bench_events.py shows pooled dispatch slower than plain
+        # dispatch with __slots__ events, so pooling is left to callers that need it
+        self.event_manager = EventManager(queued=True)
         self.input_handler = InputHandler()
-        self.renderer = Renderer(width, height, "Basic 2D Sprite Engine")
+        self.latency_tracker = InputLatencyTracker(self.input_handler)
+        self.renderer = Renderer(width, height, "Basic 2D Sprite Engine", internal_resolution=internal_resolution)
         
         # 3. Load Resources
         self.renderer.load_assets()
+        if stream_world:
+            # Large world streamed in chunks around the camera instead of the 10x10 mock map
+            self.renderer.world = StreamingWorld(self.renderer.tile_size, self.renderer.tile_colors)
 
         # 4. Game State and Loop control
         self.running = True
         self.current_state = GameState.PLAYING
+        self.recorder = None
+        # Set by connect(); the server then owns every entity position
+        self.net_client = None
         
         # 5. Entities and Groups
+        # Entity positions live in contiguous arrays bounded by the mock 10x10 tile map
+        # (or a 64x64 chunk area when streaming)
+        if self.renderer.world is not None:
+            map_size = 64 * self.renderer.world.chunk_pixels
+        else:
+            map_size = 10 * self.renderer.tile_size
+        self.entities = EntityStore(map_size, map_size)
+        # Broadphase for entity-vs-entity overlap queries, keyed by entity store row
+        self.collision_grid = SpatialHash(self.renderer.tile_size)
         self.all_sprites = pygame.sprite.Group()
+        # NPCs have no per-sprite update; they are only moved by the entity store
+        self.npc_sprites = pygame.sprite.Group()
         
         # Create the Player
-        self.player = Player(self.renderer, self.event_manager, 
+        self.player = Player(self.renderer, self.event_manager, self.entities,
                              x=self.renderer.tile_size * 2, 
-                             y=self.renderer.tile_size * 2)
+                             y=self.renderer.tile_size * 2,
+                             latency_tracker=self.latency_tracker)
         self.all_sprites.add(self.player)
 
+        # Field of view over the mock map (not available for streamed worlds)
+        if fog_of_war and self.renderer.world is None:
+            self.renderer.fog = FieldOfView(self.renderer.map_data, self.renderer.tile_size)
+            self.renderer.fog.update_from_rect(self.player.rect)
+
+        # Minimap of the mock map with every entity (not available for streamed worlds)
+        if minimap and self.renderer.world is None:
+            self.renderer.minimap = Minimap(self.renderer.map_data, self.renderer.tile_colors, self.renderer.tile_size)
+            self.renderer.minimap.track(self.entities, self.player.index)
+
         # 6. Set up Event Listeners
         # The Player listens for state changes
         self.event_manager.subscribe(EventType.STATE_CHANGE, self.player.update_state)
@@ -116,6 +156,65 @@ class GameEngine:
         self.event_manager.subscribe(EventType.PLAYER_MOVED, self._on_player_moved)
 
 
+    def spawn_wanderers(self, count: int, speed: float = 2):
+        """Adds NPCs that drift in random directions and bounce off the world edges."""
+        image = pygame.Surface((self.renderer.tile_size // 2, self.renderer.tile_size // 2))
+        image.fill((240, 200, 40))
+        width, height = image.get_size()
+        for _ in range(count):
+            x = random.uniform(0, self.entities.world_width - width)
+            y = random.uniform(0, self.entities.world_height - height)
+            direction = (random.uniform(-1, 1), random.uniform(-1, 1))
+            index = self.entities.add(x, y, width, height, speed, direction=direction, bounce=True)
+            self.npc_sprites.add(EntitySprite(self.entities, index, image))
+
+    def connect(self, host: str, port: int):
+        """Joins a GameServer; the local player is predicted and other entities mirror the server."""
+        for sprite in self.npc_sprites:
+            sprite.kill()
+        self.net_client = NetClient(self.entities, self.player.index, (host, port),
+                                     remote_size=(self.renderer.tile_size // 2, self.renderer.tile_size // 2))
+        self.net_client.connect()
+        print(f"[Net] Connected to {host}:{port} as client {self.net_client.client_id}")
+
+    def _step_networked(self, delta_time: float):
+        """Sends this frame's input, applies received snapshots and returns the rows that moved."""
+        before = self.entities.position[:self.entities.count].copy()
+        self.net_client.send_input(actions_to_mask(self.input_handler.get_actions()), delta_time)
+        self.net_client.poll()
+        added, removed = self.net_client.take_row_changes()
+        image = pygame.Surface((self.renderer.tile_size // 2, self.renderer.tile_size // 2))
+        image.fill((240, 200, 40))
+        for sprite in [sprite for sprite in self.npc_sprites if sprite.index in removed]:
+            self.npc_sprites.remove(sprite)
+        for row in added:
+            self.npc_sprites.add(EntitySprite(self.entities, row, image))
+        after = self.entities.position[:self.entities.count]
+        moved = self.entities.alive[:self.entities.count].copy()
+        moved[:len(before)] &= (after[:len(before)] != before).any(axis=1)
+        return moved
+
+    def update_entities(self, delta_time: float):
+        """Applies input to sprites, then moves every entity in one vectorized step."""
+        self.all_sprites.update(self.input_handler.get_actions(), delta_time)
+        if self.net_client is not None:
+            moved = self._step_networked(delta_time)
+        else:
+            moved = self.entities.step(delta_time)
+        self.collision_grid.sync_store(self.entities, moved)
+        if moved[self.player.index]:
+            self.player.on_moved()
+            # Only recomputed when the player enters a new tile
+            if self.renderer.fog is not None:
+                self.renderer.fog.update_from_rect(self.player.rect)
+
+    def entities_touching(self, rect: pygame.Rect) -> set:
+        """Returns the entity store rows whose bounds overlap rect."""
+        return self.collision_grid.query_rect(rect.x, rect.y, rect.width, rect.height)
+
+    def visible_sprites(self) -> list:
+        return self.all_sprites.sprites() + self.npc_sprites.sprites()
+
     def _on_player_moved(self, event: GameEvent):
         """Listener function to update the camera when the player moves."""
         self.renderer.set_camera_target(self.player.rect)
@@ -126,12 +225,17 @@ class GameEngine:
             new_state = GameState.PAUSED if self.current_state == GameState.PLAYING else GameState.PLAYING
             self.set_game_state(new_state)
 
+    def start_recording(self, filepath):
+        """Records per-frame input state and dispatched events to a replay log."""
+        self.recorder = InputRecorder(filepath, list(self.input_handler.get_actions().keys()))
+        self.recorder.attach(self.event_manager)
+
     def set_game_state(self, new_state: GameState):
         """Changes the game state and notifies all listeners."""
         if self.current_state != new_state:
             self.current_state = new_state
             # Post a state change event
-            state_event = StateChangeEvent(new_state)
+            state_event = self.event_manager.create(StateChangeEvent, new_state)
             self.event_manager.post(state_event)
             print(f"--- Game State Changed to: {new_state.name} ---")
 
@@ -151,24 +255,140 @@ class GameEngine:
                 self.running = False
                 continue
 
+            if self.recorder:
+                self.recorder.begin_frame(self.input_handler.get_actions(), self.renderer.clock.get_time())
+
             # 2. GAME LOGIC / UPDATE
             # Only update logic if the game is not paused
             if self.current_state == GameState.PLAYING:
                 # Update all sprites based on current input and delta time
-                self.all_sprites.update(self.input_handler.get_actions(), self.renderer.clock.get_time())
+                self.update_entities(self.renderer.clock.get_time())
+
+            # Deliver the events queued during input and update (moves are coalesced)
+            self.event_manager.dispatch()
 
             # Reset single-frame actions (like 'action')
             self.input_handler.reset_single_frame_actions()
 
             # 3. RENDERING
             # Render all components and calculate delta time (time since last frame)
-            delta_time = self.renderer.update_display(self.all_sprites.sprites())
+            delta_time = self.renderer.update_display(self.visible_sprites())
+            self.latency_tracker.frame_presented(self.renderer.last_flip_time)
             
         # 4. SHUTDOWN
+        print(self.latency_tracker.report())
+        if self.recorder:
+            self.recorder.close()
+        if self.net_client is not None:
+            self.net_client.close()
+        # Let background listeners (autosave, telemetry) finish their queued work
+        self.event_manager.shutdown()
+        if self.renderer.world is not None:
+            self.renderer.world.shutdown()
         pygame.quit()
         sys.exit()
 
+    def run_replay(self, filepath, render: bool = False, fixed_delta_time: int = None) -> dict:
+        """
+        Plays a recorded log back through the InputHandler and EventManager as fast as possible.
+        Each frame uses its recorded delta time (or fixed_delta_time if given), so the
+        simulation matches the recorded session. Returns timing and desync statistics.
+        """
+        reader = ReplayReader(filepath)
+
+        # Positions produced by this run, compared against the recorded ones to detect desyncs
+        replayed_moves = []
+        def capture_move(event: PlayerMovedEvent):
+            replayed_moves.append((event.x, event.y))
+        self.event_manager.subscribe(EventType.PLAYER_MOVED, capture_move)
+
+        frames = 0
+        simulated_ms = 0
+        desyncs = 0
+        wall_start = time.perf_counter()
+        for actions, delta_time, recorded_events in reader.frames():
+            if fixed_delta_time is not None:
+                delta_time = fixed_delta_time
+
+            # 1. INPUT (recorded action state and engine-level state changes)
+            feed_actions(self.input_handler, actions)
+            for event in recorded_events:
+                if event.type == EventType.STATE_CHANGE:
+                    self.set_game_state(event.new_state)
+
+            # 2. GAME LOGIC / UPDATE
+            if self.current_state == GameState.PLAYING:
+                self.update_entities(delta_time)
+            self.event_manager.dispatch()
+            self.input_handler.reset_single_frame_actions()
+
+            recorded_moves = [(event.x, event.y) for event in recorded_events if event.type == EventType.PLAYER_MOVED]
+            if recorded_moves != replayed_moves:
+                desyncs += 1
+            replayed_moves.clear()
+
+            # 3. RENDERING (optional; never waits on the frame cap)
+            if render:
+                self.renderer.update_display(self.visible_sprites(), limit_fps=False)
+
+            frames += 1
+            simulated_ms += delta_time
+
+        self.event_manager.unsubscribe(EventType.PLAYER_MOVED, capture_move)
+        wall_seconds = time.perf_counter() - wall_start
+        return {
+            'frames': frames,
+            'simulated_seconds': simulated_ms / 1000,
+            'wall_seconds': wall_seconds,
+            'speedup': (simulated_ms / 1000) / wall_seconds if wall_seconds > 0 else float('inf'),
+            'desynced_frames': desyncs,
+        }
+
 if __name__ == '__main__':
-    # Set the game window size
-    game = GameEngine(width=800, height=600)
-    game.run()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Basic 2D Sprite Engine")
+    parser.add_argument('--record', help="write a replay log of this session to the given file")
+    parser.add_argument('--replay', help="play back a replay log instead of reading the keyboard")
+    parser.add_argument('--render', action='store_true', help="draw frames while replaying")
+    parser.add_argument('--npcs', type=int, default=0, help="number of wandering NPCs to spawn")
+    parser.add_argument('--stream', action='store_true', help="stream a large chunked world instead of the mock map")
+    parser.add_argument('--fog', action='store_true', help="enable field of view and fog of war")
+    parser.add_argument('--minimap', action='store_true', help="show a minimap of the whole map")
+    parser.add_argument('--window', type=int, nargs=2, default=(800, 600), metavar=('WIDTH', 'HEIGHT'), help="window size")
+    parser.add_argument('--internal-res', type=int, nargs=2, metavar=('WIDTH', 'HEIGHT'),
+                        help="draw the world at this resolution and upscale it by an integer factor (e.g. 400 300)")
+    parser.add_argument('--serve', type=int, metavar='PORT', help="run a headless authoritative server on this UDP port")
+    parser.add_argument('--connect', metavar='HOST:PORT', help="join a server started with --serve")
+    args = parser.parse_args()
+    window_width, window_height = args.window
+    internal_resolution = tuple(args.internal_res) if args.internal_res else None
+
+    if args.serve is not None:
+        server = GameServer(port=args.serve)
+        server.spawn_npcs(args.npcs)
+        print(f"[Net] Serving on {server.address[0]}:{server.address[1]} at {server.tick_rate} ticks/s")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        server.close()
+    elif args.replay:
+        # Replays run headless unless asked to render
+        game = GameEngine(width=window_width, height=window_height, headless=not args.render, stream_world=args.stream,
+                          fog_of_war=args.fog, minimap=args.minimap, internal_resolution=internal_resolution)
+        game.spawn_wanderers(args.npcs)
+        stats = game.run_replay(args.replay, render=args.render)
+        print(f"[Replay] {stats['frames']} frames, {stats['simulated_seconds']:.1f}s simulated in "
+              f"{stats['wall_seconds']:.2f}s ({stats['speedup']:.0f}x real time), "
+              f"{stats['desynced_frames']} desynced frames")
+        pygame.quit()
+    else:
+        # Set the game window size
+        game = GameEngine(width=window_width, height=window_height, stream_world=args.stream, fog_of_war=args.fog,
+                          minimap=args.minimap, internal_resolution=internal_resolution)
+        game.spawn_wanderers(args.npcs)
+        if args.connect:
+            host, port = args.connect.rsplit(':', 1)
+            game.connect(host, int(port))
+        if args.record:
+            game.start_recording(args.record)
+        game.run()
\ No newline at end of file
@@ -1,6 +1,7 @@
 # input.py
 
 import pygame
+import time
 from typing import Dict, Any
 
 class InputHandler:
@@ -19,6 +20,11 @@ class InputHandler:
             'quit': False
         }
 
+        # Maps active actions to the time (time.perf_counter seconds) they became active.
+        # Pygame events carry no timestamp, so this is when the event was handled,
+        # which is the earliest point the game could react to it.
+        self.action_times: Dict[str, float] = {}
+
         # Maps Pygame key constants to game actions
         self.key_map: Dict[int, str] = {
             pygame.K_w: 'move_up',
@@ -45,6 +51,13 @@ class InputHandler:
             if action:
                 is_down = (event.type == pygame.KEYDOWN)
 
+                # Remember when the action became active (key repeat does not restart it)
+                if is_down:
+                    if not self.actions[action]:
+                        self.action_times[action] = time.perf_counter()
+                else:
+                    self.action_times.pop(action, None)
+
                 # Special handling for 'action' to only trigger once per press
                 if action == 'action' and event.type == pygame.KEYDOWN:
                     # 'action' is True only on the frame of KEYDOWN
@@ -63,4 +76,5 @@ class InputHandler:
     def reset_single_frame_actions(self):
         """Resets actions that should only last one frame (like 'action')."""
         if self.actions['action']:
-            self.actions['action'] = False
\ No newline at end of file
+            self.actions['action'] = False
+            self.action_times.pop('action', None)
\ No newline at end of file
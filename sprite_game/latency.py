@@ -0,0 +1,99 @@
+# latency.py
+
+import time
+from typing import List
+
+from input import InputHandler
+
+class LatencyHistogram:
+    """Fixed-width bucket histogram of latencies in milliseconds."""
+    def __init__(self, bucket_ms: float = 1.0, max_ms: float = 250.0):
+        self.bucket_ms = bucket_ms
+        self.max_ms = max_ms
+        # The last bucket collects everything at or above max_ms
+        self.buckets: List[int] = [0] * (int(max_ms / bucket_ms) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.worst_ms = 0.0
+
+    def add(self, latency_ms: float):
+        index = min(int(max(latency_ms, 0) / self.bucket_ms), len(self.buckets) - 1)
+        self.buckets[index] += 1
+        self.count += 1
+        self.total_ms += latency_ms
+        self.worst_ms = max(self.worst_ms, latency_ms)
+
+    def mean(self) -> float:
+        return self.total_ms / self.count if self.count else 0.0
+
+    def percentile(self, pct: float) -> float:
+        """Returns the upper edge of the bucket containing the given percentile."""
+        if not self.count:
+            return 0.0
+        target = self.count * pct / 100
+        seen = 0
+        for index, bucket_count in enumerate(self.buckets):
+            seen += bucket_count
+            if seen >= target:
+                return min((index + 1) * self.bucket_ms, self.worst_ms)
+        return self.worst_ms
+
+    def summary(self) -> str:
+        return (f"n={self.count} mean={self.mean():.1f}ms p50={self.percentile(50):.0f}ms "
+                f"p95={self.percentile(95):.0f}ms p99={self.percentile(99):.0f}ms max={self.worst_ms:.1f}ms")
+
+    def bar_chart(self, width: int = 40, group_ms: float = 8.0) -> str:
+        """Renders the histogram as text, grouping buckets into group_ms wide rows."""
+        per_row = max(1, int(group_ms / self.bucket_ms))
+        rows = [sum(self.buckets[i:i + per_row]) for i in range(0, len(self.buckets), per_row)]
+        # Trim empty rows at the end
+        while rows and rows[-1] == 0:
+            rows.pop()
+        peak = max(rows) if rows else 0
+        lines = []
+        for i, row_count in enumerate(rows):
+            bar = '#' * (round(row_count / peak * width) if peak else 0)
+            lines.append(f"{i * per_row * self.bucket_ms:6.0f}ms | {bar} {row_count}")
+        return '\n'.join(lines)
+
+class InputLatencyTracker:
+    """
+    Measures how long it takes for a key press to show up on screen.
+    The InputHandler stamps when an action becomes active, the Player calls `mark_reacted`
+    on the first frame it responds to that press, and the engine calls `frame_presented`
+    once display.flip returns. Each press is counted once.
+    """
+    def __init__(self, input_handler: InputHandler):
+        self.input_handler = input_handler
+        self.press_to_react = LatencyHistogram()
+        self.press_to_display = LatencyHistogram()
+        # action -> press time already reacted to, so held keys are not counted every frame
+        self._reacted_presses = {}
+        # (press time, reaction time) pairs waiting for the next presented frame
+        self._awaiting_display = []
+
+    def mark_reacted(self, action: str):
+        """Called by game objects the first frame they act on an input action."""
+        press_time = self.input_handler.action_times.get(action)
+        if press_time is None or self._reacted_presses.get(action) == press_time:
+            return
+        self._reacted_presses[action] = press_time
+        self._awaiting_display.append((press_time, time.perf_counter()))
+
+    def frame_presented(self, flip_time: float):
+        """Called after display.flip returns with the time it returned."""
+        if not self._awaiting_display:
+            return
+        for press_time, react_time in self._awaiting_display:
+            self.press_to_react.add((react_time - press_time) * 1000)
+            self.press_to_display.add((flip_time - press_time) * 1000)
+        self._awaiting_display.clear()
+
+    def report(self) -> str:
+        if not self.press_to_display.count:
+            return "[Latency] No input latency samples recorded"
+        return '\n'.join([
+            f"[Latency] input -> player reaction: {self.press_to_react.summary()}",
+            f"[Latency] input -> display flip:    {self.press_to_display.summary()}",
+            self.press_to_display.bar_chart(),
+        ])
@@ -0,0 +1,91 @@
+# minimap.py
+
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pygame
+
+from entities import EntityStore
+
+class Minimap:
+    """
+    Overlay showing the whole tile map, the player, other entities and the camera view.
+
+    The map image is built once by mapping every tile ID through a color lookup table in a single
+    NumPy indexing pass and handing the result to pygame.surfarray (one pixel per tile), then
+    scaled to the minimap size and cached. `set_tile` patches single pixels, so per-frame work
+    only depends on the minimap size and the number of entities, never on the map size.
+    """
+    def __init__(self, map_data: List[List[int]], tile_colors: Dict[int, Tuple[int, int, int]], tile_size: int,
+                 max_size: Tuple[int, int] = (160, 160), margin: int = 10):
+        self.tile_size = tile_size
+        self.margin = margin
+
+        tiles = np.array(map_data, dtype=np.intp)
+        self.rows, self.cols = tiles.shape
+        self._palette = np.zeros((max(256, int(tiles.max()) + 1), 3), dtype=np.uint8)
+        for tile_id, color in tile_colors.items():
+            self._palette[tile_id] = color
+
+        # One pixel per tile; surfarray indexes as (x, y)
+        self._tile_image = pygame.surfarray.make_surface(self._palette[tiles].swapaxes(0, 1))
+
+        self.scale = min(max_size[0] / self.cols, max_size[1] / self.rows)
+        self.size = (max(1, int(self.cols * self.scale)), max(1, int(self.rows * self.scale)))
+        self._scaled = None
+
+        self.store = None
+        self.player_index = None
+
+    def track(self, store: EntityStore, player_index: int):
+        """Sets the entity store whose entities are drawn, highlighting the player's row."""
+        self.store = store
+        self.player_index = player_index
+
+    def set_tile(self, tile_x: int, tile_y: int, tile_id: int):
+        """Updates one tile; the scaled image is rebuilt on the next draw."""
+        self._tile_image.set_at((tile_x, tile_y), [int(c) for c in self._palette[tile_id]])
+        self._scaled = None
+
+    def _map_image(self) -> pygame.Surface:
+        if self._scaled is None:
+            self._scaled = pygame.transform.scale(self._tile_image, self.size)
+        return self._scaled
+
+    def draw(self, screen: pygame.Surface, camera_offset: pygame.math.Vector2, view_size: Tuple[int, int] = None):
+        """
+        Draws the minimap in the top-right corner of the screen.
+        view_size is the size of the world area the camera shows (defaults to the screen size).
+        """
+        if view_size is None:
+            view_size = screen.get_size()
+        frame = self._map_image().copy()
+        pixels_per_world_pixel = self.scale / self.tile_size
+
+        if self.store is not None and self.store.count:
+            n = self.store.count
+            centers = self.store.position[:n] + self.store.size[:n] / 2
+            dots = (centers * pixels_per_world_pixel).astype(np.intp)
+            others = self.store.alive[:n].copy()
+            if self.player_index is not None:
+                others[self.player_index] = False
+            dots = dots[others]
+            inside = (dots[:, 0] >= 0) & (dots[:, 0] < self.size[0]) & (dots[:, 1] >= 0) & (dots[:, 1] < self.size[1])
+            dots = dots[inside]
+            if len(dots):
+                pixels = pygame.surfarray.pixels3d(frame)
+                pixels[dots[:, 0], dots[:, 1]] = (240, 200, 40)
+                del pixels # Release the surface lock
+
+            if self.player_index is not None:
+                px, py = (centers[self.player_index] * pixels_per_world_pixel).astype(int)
+                pygame.draw.rect(frame, (255, 0, 0), (px - 2, py - 2, 5, 5))
+
+        # Outline of the area the camera currently shows
+        view = pygame.Rect(camera_offset.x * pixels_per_world_pixel, camera_offset.y * pixels_per_world_pixel,
+                           view_size[0] * pixels_per_world_pixel, view_size[1] * pixels_per_world_pixel)
+        pygame.draw.rect(frame, (255, 255, 255), view, 1)
+
+        position = (screen.get_width() - self.size[0] - self.margin, self.margin)
+        screen.blit(frame, position)
+        pygame.draw.rect(screen, (255, 255, 255), (position[0] - 1, position[1] - 1, self.size[0] + 2, self.size[1] + 2), 1)
@@ -0,0 +1,401 @@
+# net.py
+#
+# Loopback multiplayer: an authoritative server that ticks the simulation and clients that
+# send input and predict their own movement. Everything goes over UDP.
+#
+# Positions are quantized to 1/4 pixel. Every snapshot is delta-compressed against the last
+# snapshot the client acknowledged: unchanged entities are skipped, small moves are sent as
+# one-byte deltas, and only new or far-moved entities are sent in full.
+
+import socket
+import struct
+import time
+from collections import OrderedDict, deque
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from entities import EntityStore
+
+# --- Protocol ---
+
+QUANTUM = 4 # Quantization steps per pixel
+
+MSG_HELLO = 1
+MSG_WELCOME = 2
+MSG_INPUT = 3
+MSG_SNAPSHOT = 4
+MSG_BYE = 5
+
+_HELLO = struct.Struct('<B')
+_WELCOME = struct.Struct('<BHHHHB')   # type, client id, entity id, world width, world height, tick rate
+_INPUT = struct.Struct('<BHIIBH')     # type, client id, input seq, acked snapshot tick, action mask, delta time ms
+_SNAPSHOT = struct.Struct('<BIIIH')   # type, tick, base tick (0 = full), last processed input seq, entry count
+_ENTRY = struct.Struct('<HB')         # entity id, kind
+_FULL = struct.Struct('<HH')          # quantized x, y
+_DELTA = struct.Struct('<bb')         # quantized dx, dy
+_BYE = struct.Struct('<BH')
+
+ENTRY_FULL = 0
+ENTRY_DELTA = 1
+ENTRY_REMOVED = 2
+
+# Action bits shared by the server and clients
+ACTION_BITS = ('move_up', 'move_down', 'move_left', 'move_right', 'action')
+
+MAX_DATAGRAM = 65507
+HISTORY_LENGTH = 64 # Snapshots the server keeps as possible delta bases
+
+def actions_to_mask(actions: Dict[str, bool]) -> int:
+    mask = 0
+    for bit, name in enumerate(ACTION_BITS):
+        if actions.get(name):
+            mask |= 1 << bit
+    return mask
+
+def mask_to_direction(mask: int) -> Tuple[int, int]:
+    """Same mapping as Player.update: right/down positive, opposite keys cancel."""
+    dx = ((mask >> 3) & 1) - ((mask >> 2) & 1)
+    dy = ((mask >> 1) & 1) - (mask & 1)
+    return dx, dy
+
+def quantize(value: float) -> int:
+    return int(round(value * QUANTUM))
+
+def apply_input(store: EntityStore, row: int, mask: int, delta_time: int):
+    """
+    Moves one entity by one input. Used by both the server and client prediction, so both
+    produce the same position; the result is snapped to the quantization grid.
+    """
+    store.direction[row] = mask_to_direction(mask)
+    store.step(delta_time, rows=np.array([row]))
+    store.direction[row] = 0
+    store.position[row] = np.round(store.position[row] * QUANTUM) / QUANTUM
+
+def encode_snapshot(tick: int, base_tick: int, last_input_seq: int,
+                    state: Dict[int, Tuple[int, int]], base: Optional[Dict[int, Tuple[int, int]]]) -> bytes:
+    """Encodes state relative to base (or in full when base is None)."""
+    parts = []
+    entries = 0
+    for entity_id, (qx, qy) in state.items():
+        previous = base.get(entity_id) if base is not None else None
+        if previous is None:
+            parts.append(_ENTRY.pack(entity_id, ENTRY_FULL) + _FULL.pack(qx, qy))
+        else:
+            dx = qx - previous[0]
+            dy = qy - previous[1]
+            if dx == 0 and dy == 0:
+                continue
+            if -128 <= dx <= 127 and -128 <= dy <= 127:
+                parts.append(_ENTRY.pack(entity_id, ENTRY_DELTA) + _DELTA.pack(dx, dy))
+            else:
+                parts.append(_ENTRY.pack(entity_id, ENTRY_FULL) + _FULL.pack(qx, qy))
+        entries += 1
+    if base is not None:
+        for entity_id in base:
+            if entity_id not in state:
+                parts.append(_ENTRY.pack(entity_id, ENTRY_REMOVED))
+                entries += 1
+    header = _SNAPSHOT.pack(MSG_SNAPSHOT, tick, base_tick if base is not None else 0, last_input_seq, entries)
+    return header + b''.join(parts)
+
+def decode_snapshot(data: bytes, base: Optional[Dict[int, Tuple[int, int]]]) -> Tuple[int, int, Dict[int, Tuple[int, int]]]:
+    """Returns (tick, last processed input seq, full state) rebuilt on top of base."""
+    _, tick, base_tick, last_input_seq, entries = _SNAPSHOT.unpack_from(data, 0)
+    state = dict(base) if base_tick else {}
+    offset = _SNAPSHOT.size
+    for _ in range(entries):
+        entity_id, kind = _ENTRY.unpack_from(data, offset)
+        offset += _ENTRY.size
+        if kind == ENTRY_FULL:
+            state[entity_id] = _FULL.unpack_from(data, offset)
+            offset += _FULL.size
+        elif kind == ENTRY_DELTA:
+            dx, dy = _DELTA.unpack_from(data, offset)
+            offset += _DELTA.size
+            qx, qy = state[entity_id]
+            state[entity_id] = (qx + dx, qy + dy)
+        else:
+            state.pop(entity_id, None)
+    return tick, last_input_seq, state
+
+# --- Server ---
+
+class _RemoteClient:
+    def __init__(self, client_id: int, address, row: int):
+        self.client_id = client_id
+        self.address = address
+        self.row = row
+        self.acked_tick = 0
+        self.last_input_seq = 0
+        self.pending_inputs = [] # (seq, mask, delta time) received since the last tick
+
+class GameServer:
+    """
+    Authoritative simulation. Each tick it applies the inputs received from every client in
+    order, steps the remaining entities (NPCs), records the quantized state and sends every
+    client a snapshot delta-compressed against the last tick that client acknowledged.
+    """
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, tick_rate: int = 30,
+                 world_tiles: int = 10, tile_size: int = 32, player_speed: float = 5):
+        self.tick_rate = tick_rate
+        self.tick_ms = 1000 // tick_rate
+        self.tile_size = tile_size
+        self.player_speed = player_speed
+        self.store = EntityStore(world_tiles * tile_size, world_tiles * tile_size)
+
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind((host, port))
+        self.sock.setblocking(False)
+        self.address = self.sock.getsockname()
+
+        self.tick = 0
+        self.clients: Dict[Tuple[str, int], _RemoteClient] = {}
+        self._next_client_id = 1
+        self._history = OrderedDict() # tick -> {entity id: (qx, qy)}
+
+        # Statistics
+        self.tick_times = deque(maxlen=1000)
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.running = False
+
+    def spawn_npcs(self, count: int, speed: float = 2, seed: int = 0):
+        rng = np.random.default_rng(seed)
+        size = self.tile_size // 2
+        for x, y in rng.uniform(0, self.store.world_width - size, size=(count, 2)):
+            self.store.add(x, y, size, size, speed, direction=tuple(rng.uniform(-1, 1, 2)), bounce=True)
+
+    def _receive(self):
+        while True:
+            try:
+                data, address = self.sock.recvfrom(MAX_DATAGRAM)
+            except (BlockingIOError, ConnectionResetError):
+                return
+            self.bytes_received += len(data)
+            if not data:
+                continue
+            kind = data[0]
+            if kind == MSG_INPUT:
+                _, client_id, seq, acked_tick, mask, delta_time = _INPUT.unpack_from(data)
+                client = self.clients.get(address)
+                if client is None or seq <= client.last_input_seq:
+                    continue # Unknown sender, duplicate or reordered input
+                client.acked_tick = max(client.acked_tick, acked_tick)
+                client.pending_inputs.append((seq, mask, delta_time))
+            elif kind == MSG_HELLO:
+                self._accept(address)
+            elif kind == MSG_BYE:
+                client = self.clients.pop(address, None)
+                if client is not None:
+                    self.store.remove(client.row)
+
+    def _accept(self, address):
+        client = self.clients.get(address)
+        if client is None:
+            spawn = 2 * self.tile_size
+            row = self.store.add(spawn, spawn, self.tile_size, self.tile_size, self.player_speed)
+            client = _RemoteClient(self._next_client_id, address, row)
+            self._next_client_id += 1
+            self.clients[address] = client
+        welcome = _WELCOME.pack(MSG_WELCOME, client.client_id, client.row,
+                                int(self.store.world_width), int(self.store.world_height), self.tick_rate)
+        self._send(welcome, address)
+
+    def _send(self, data: bytes, address):
+        self.sock.sendto(data, address)
+        self.bytes_sent += len(data)
+
+    def step(self):
+        """Runs one server tick."""
+        started = time.perf_counter()
+        self._receive()
+
+        # Inputs move their own client's entity; everything else moves with the tick
+        client_rows = set()
+        for client in self.clients.values():
+            client_rows.add(client.row)
+            for seq, mask, delta_time in client.pending_inputs:
+                apply_input(self.store, client.row, mask, min(delta_time, 250))
+                client.last_input_seq = seq
+            client.pending_inputs.clear()
+        self.store.step(self.tick_ms)
+
+        self.tick += 1
+        state = self.quantized_state()
+        self._history[self.tick] = state
+        while len(self._history) > HISTORY_LENGTH:
+            self._history.popitem(last=False)
+
+        # Clients that acknowledged the same tick share the delta body; only the header differs
+        encoded_by_base = {}
+        for client in self.clients.values():
+            base_tick = client.acked_tick if client.acked_tick in self._history else 0
+            body = encoded_by_base.get(base_tick)
+            if body is None:
+                body = encode_snapshot(self.tick, base_tick, 0, state, self._history.get(base_tick))
+                encoded_by_base[base_tick] = body
+            header = _SNAPSHOT.pack(MSG_SNAPSHOT, self.tick, base_tick, client.last_input_seq,
+                                    _SNAPSHOT.unpack_from(body)[4])
+            self._send(header + body[_SNAPSHOT.size:], client.address)
+
+        self.tick_times.append(time.perf_counter() - started)
+
+    def quantized_state(self) -> Dict[int, Tuple[int, int]]:
+        """Entity id -> quantized position of every live entity, as sent in snapshots."""
+        alive = np.flatnonzero(self.store.alive[:self.store.count])
+        quantized = np.round(self.store.position[alive] * QUANTUM).astype(np.int64).tolist()
+        return dict(zip(alive.tolist(), map(tuple, quantized)))
+
+    def serve_forever(self):
+        """Ticks at tick_rate until stop() is called."""
+        self.running = True
+        next_tick = time.perf_counter()
+        while self.running:
+            self.step()
+            next_tick += 1 / self.tick_rate
+            delay = next_tick - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                next_tick = time.perf_counter() # Running behind; do not try to catch up
+
+    def stop(self):
+        self.running = False
+
+    def close(self):
+        self.sock.close()
+
+# --- Client ---
+
+class NetClient:
+    """
+    Client side of the protocol, with input prediction.
+    The local player's row in `store` is moved immediately by each input using the same rules as
+    the server. When a snapshot arrives the row is reset to the server position and the inputs the
+    server has not processed yet are re-applied (reconciliation). Remote entities are mirrored
+    into other rows of the same store, sized remote_size (defaults to the local player's size).
+    """
+    def __init__(self, store: EntityStore, local_row: int, server_address, timeout: float = 2.0,
+                 remote_size: Tuple[float, float] = None):
+        self.store = store
+        self.remote_size = remote_size if remote_size is not None else tuple(store.size[local_row])
+        self.local_row = local_row
+        self.server_address = tuple(server_address)
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind(('127.0.0.1', 0))
+        self.sock.settimeout(timeout)
+
+        self.client_id = None
+        self.server_entity = None
+        self.input_seq = 0
+        self.pending_inputs = deque() # (seq, mask, delta time) not yet confirmed by the server
+        self.latest_tick = 0
+        self._snapshots = OrderedDict() # tick -> state, kept as delta bases
+        self.remote_rows: Dict[int, int] = {} # server entity id -> local store row
+        self.rows_added = []   # rows created since the last call to take_row_changes
+        self.rows_removed = []
+
+        # Statistics
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.prediction_errors = 0 # Snapshots where the replayed prediction had drifted
+
+    def connect(self, attempts: int = 10):
+        """Handshakes with the server and adopts its world size."""
+        for _ in range(attempts):
+            self._send(_HELLO.pack(MSG_HELLO))
+            try:
+                data = self.sock.recv(MAX_DATAGRAM)
+            except socket.timeout:
+                continue
+            self.bytes_received += len(data)
+            if data[0] == MSG_WELCOME:
+                _, self.client_id, self.server_entity, width, height, _ = _WELCOME.unpack_from(data)
+                self.store.world_width = width
+                self.store.world_height = height
+                self.sock.setblocking(False)
+                return
+        raise ConnectionError(f"No answer from server at {self.server_address[0]}:{self.server_address[1]}")
+
+    def _send(self, data: bytes):
+        self.sock.sendto(data, self.server_address)
+        self.bytes_sent += len(data)
+
+    def send_input(self, mask: int, delta_time: int):
+        """Sends one input and applies it to the local player right away (prediction)."""
+        self.input_seq += 1
+        delta_time = max(0, min(int(delta_time), 250))
+        self.pending_inputs.append((self.input_seq, mask, delta_time))
+        self._send(_INPUT.pack(MSG_INPUT, self.client_id, self.input_seq, self.latest_tick, mask, delta_time))
+        apply_input(self.store, self.local_row, mask, delta_time)
+
+    def poll(self) -> bool:
+        """Applies every snapshot that has arrived. Returns True if state changed."""
+        changed = False
+        while True:
+            try:
+                data = self.sock.recv(MAX_DATAGRAM)
+            except (BlockingIOError, ConnectionResetError):
+                return changed
+            self.bytes_received += len(data)
+            if data and data[0] == MSG_SNAPSHOT and self._apply_snapshot(data):
+                changed = True
+
+    def _apply_snapshot(self, data: bytes) -> bool:
+        _, tick, base_tick, _, _ = _SNAPSHOT.unpack_from(data)
+        if tick <= self.latest_tick:
+            return False # Out of date
+        base = None
+        if base_tick:
+            base = self._snapshots.get(base_tick)
+            if base is None:
+                return False # Base no longer known; wait for a snapshot against a newer ack
+        tick, last_input_seq, state = decode_snapshot(data, base)
+        self.latest_tick = tick
+        self._snapshots[tick] = state
+        while len(self._snapshots) > HISTORY_LENGTH:
+            self._snapshots.popitem(last=False)
+
+        # Reconcile the local player: server position plus the inputs it has not seen yet
+        while self.pending_inputs and self.pending_inputs[0][0] <= last_input_seq:
+            self.pending_inputs.popleft()
+        own = state.get(self.server_entity)
+        if own is not None:
+            predicted = self.store.position[self.local_row].copy()
+            self.store.position[self.local_row] = (own[0] / QUANTUM, own[1] / QUANTUM)
+            for _, mask, delta_time in self.pending_inputs:
+                apply_input(self.store, self.local_row, mask, delta_time)
+            if np.any(self.store.position[self.local_row] != predicted):
+                self.prediction_errors += 1
+
+        # Mirror the other entities
+        for entity_id, (qx, qy) in state.items():
+            if entity_id == self.server_entity:
+                continue
+            row = self.remote_rows.get(entity_id)
+            if row is None:
+                row = self.store.add(qx / QUANTUM, qy / QUANTUM, self.remote_size[0], self.remote_size[1], 0)
+                self.remote_rows[entity_id] = row
+                self.rows_added.append(row)
+            else:
+                self.store.position[row] = (qx / QUANTUM, qy / QUANTUM)
+        for entity_id in [entity_id for entity_id in self.remote_rows if entity_id not in state]:
+            row = self.remote_rows.pop(entity_id)
+            self.store.remove(row)
+            self.rows_removed.append(row)
+        return True
+
+    def take_row_changes(self):
+        """Returns and clears the store rows added and removed for remote entities."""
+        added, removed = self.rows_added, self.rows_removed
+        self.rows_added, self.rows_removed = [], []
+        return added, removed
+
+    def close(self):
+        if self.client_id is not None:
+            try:
+                self._send(_BYE.pack(MSG_BYE, self.client_id))
+            except OSError:
+                pass
+        self.sock.close()
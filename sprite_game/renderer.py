@@ -2,26 +2,61 @@
 
 import pygame
 import os
+import time
+from pathlib import Path
 from typing import List, Tuple
 
+from assets import AssetLoader
+
 class Renderer:
     """
     Handles all visual aspects: window setup, asset loading, and drawing layers.
     This is where Aseprite tilemap loading logic would be fully implemented.
     """
-    def __init__(self, screen_width: int, screen_height: int, title: str = "Pygame Engine"):
+    def __init__(self, screen_width: int, screen_height: int, title: str = "Pygame Engine",
+                 internal_resolution: Tuple[int, int] = None):
         pygame.display.set_caption(title)
         self.screen_width = screen_width
         self.screen_height = screen_height
         self.screen = pygame.display.set_mode((screen_width, screen_height))
+
+        # Surface the world (map, sprites, fog) is drawn onto, and the size of the view it shows.
+        # With an internal resolution the world is drawn small and upscaled once per frame by the
+        # largest integer factor that fits the window; the HUD is still drawn at native resolution.
+        if internal_resolution is None:
+            self.world_surface = self.screen
+            self.view_width, self.view_height = screen_width, screen_height
+            self.upscale_factor = 1
+        else:
+            self.view_width, self.view_height = internal_resolution
+            self.world_surface = pygame.Surface(internal_resolution).convert()
+            self.upscale_factor = max(1, min(screen_width // self.view_width, screen_height // self.view_height))
+        # Top-left of the upscaled image on screen (letterboxed when the factor does not fill the window)
+        self._upscaled_pos = ((screen_width - self.view_width * self.upscale_factor) // 2,
+                              (screen_height - self.view_height * self.upscale_factor) // 2)
+        # Border strips around the letterboxed image, cleared each frame instead of the whole screen
+        scaled_rect = pygame.Rect(self._upscaled_pos, (self.view_width * self.upscale_factor,
+                                                       self.view_height * self.upscale_factor))
+        self._letterbox_bars = [bar for bar in (
+            pygame.Rect(0, 0, screen_width, scaled_rect.top),
+            pygame.Rect(0, scaled_rect.bottom, screen_width, screen_height - scaled_rect.bottom),
+            pygame.Rect(0, scaled_rect.top, scaled_rect.left, scaled_rect.height),
+            pygame.Rect(scaled_rect.right, scaled_rect.top, screen_width - scaled_rect.right, scaled_rect.height),
+        ) if bar.width > 0 and bar.height > 0]
+        # The upscale writes straight into this area of the display surface (no intermediate blit)
+        self._upscaled = self.screen.subsurface(scaled_rect) if internal_resolution is not None else None
         self.clock = pygame.time.Clock()
         self.fps = 60
+        # time.perf_counter() value when the last display.flip returned (for latency tracking)
+        self.last_flip_time = 0.0
 
         # Game camera offset (used to follow the player)
         self.camera_offset = pygame.math.Vector2(0, 0)
         
-        # Mock asset storage (would store loaded Pygame Surfaces)
+        # Loaded Surfaces: first frame of each asset, every frame, and Tiled tilesets by tile ID
         self.assets = {}
+        self.frames = {}
+        self.tilesets = {}
 
         # Mock Map Data (Replace with Tiled/Aseprite map data loading)
         # 10x10 map with mock tile IDs
@@ -46,44 +81,81 @@ class Renderer:
             2: (0, 0, 150)     # Water (Unwalkable)
         }
 
+        # Optional StreamingWorld; when set it replaces map_data as the background layer
+        self.world = None
+        # Optional FieldOfView whose fog-of-war overlay is drawn over the world
+        self.fog = None
+        # Optional Minimap drawn with the HUD
+        self.minimap = None
+
     def load_assets(self, asset_dir: str = 'assets'):
         """
-        Mocks asset loading. In a real game, this would load spritesheets,
-        split them, and store Pygame Surfaces.
+        Loads spritesheets and Tiled tilesets from asset_dir (relative paths are relative to this
+        folder) and splits them into frames. See AssetLoader for the optional assets.json manifest.
+        Decoded pixels are cached in asset_dir/.cache, so later startups skip image decoding.
         """
-        print(f"[Renderer] Loading assets from: {asset_dir} (Mocking)")
-        # Example: self.assets['player'] = pygame.image.load(os.path.join(asset_dir, 'player.png'))
-        # Using a simple surface for the player placeholder
-        self.assets['player'] = pygame.Surface((self.tile_size, self.tile_size))
-        self.assets['player'].fill((255, 0, 0)) # Red player square
+        asset_path = Path(asset_dir)
+        if not asset_path.is_absolute():
+            asset_path = Path(__file__).parent / asset_path
+        if asset_path.is_dir():
+            print(f"[Renderer] Loading assets from: {asset_path}")
+            self.frames, self.tilesets = AssetLoader(asset_path).load_all()
+            self.assets.update({name: frames[0] for name, frames in self.frames.items() if frames})
+        else:
+            print(f"[Renderer] No asset folder at {asset_path}, using placeholders")
+
+        if 'player' not in self.assets:
+            # Placeholder when there is no player sprite
+            self.assets['player'] = pygame.Surface((self.tile_size, self.tile_size))
+            self.assets['player'].fill((255, 0, 0)) # Red player square
+
+    def set_tile(self, tile_x: int, tile_y: int, tile_id: int):
+        """Changes one tile of map_data and keeps cached map images in sync."""
+        self.map_data[tile_y][tile_x] = tile_id
+        if self.minimap is not None:
+            self.minimap.set_tile(tile_x, tile_y, tile_id)
 
     def set_camera_target(self, target_rect: pygame.Rect):
         """
         Updates the camera offset to center on a target (e.g., the player).
         """
         # Calculate the required offset to center the target
-        self.camera_offset.x = target_rect.centerx - self.screen_width // 2
-        self.camera_offset.y = target_rect.centery - self.screen_height // 2
+        self.camera_offset.x = target_rect.centerx - self.view_width // 2
+        self.camera_offset.y = target_rect.centery - self.view_height // 2
 
     def render_map_layer(self):
         """
         Renders the background tilemap layer.
         """
-        for y, row in enumerate(self.map_data):
-            for x, tile_id in enumerate(row):
+        if self.world is not None:
+            # Streamed chunks are pre-rendered surfaces; request upcoming ones and blit the visible ones
+            self.world.update(self.camera_offset, self.view_width, self.view_height)
+            self.world.draw(self.world_surface, self.camera_offset)
+            return
+
+        # Only visit the rows and columns that can overlap the view
+        first_row = max(0, int(self.camera_offset.y // self.tile_size))
+        last_row = min(len(self.map_data), int((self.camera_offset.y + self.view_height) // self.tile_size) + 1)
+        first_col = max(0, int(self.camera_offset.x // self.tile_size))
+        last_col = int((self.camera_offset.x + self.view_width) // self.tile_size) + 1
+
+        for y in range(first_row, last_row):
+            row = self.map_data[y]
+            for x in range(first_col, min(last_col, len(row))):
+                tile_id = row[x]
                 # Calculate the screen position with camera offset
                 pos_x = x * self.tile_size - self.camera_offset.x
                 pos_y = y * self.tile_size - self.camera_offset.y
 
                 # Only draw if the tile is on screen (simple culling)
-                if -self.tile_size < pos_x < self.screen_width and \
-                   -self.tile_size < pos_y < self.screen_height:
+                if -self.tile_size < pos_x < self.view_width and \
+                   -self.tile_size < pos_y < self.view_height:
                     
                     color = self.tile_colors.get(tile_id, (0, 0, 0))
                     
                     # Draw the tile rectangle
                     pygame.draw.rect(
-                        self.screen,
+                        self.world_surface,
                         color,
                         (pos_x, pos_y, self.tile_size, self.tile_size)
                     )
@@ -96,14 +168,15 @@ class Renderer:
         for sprite in sprites:
             # Apply camera offset to the sprite's position
             render_pos = sprite.rect.topleft - self.camera_offset
-            self.screen.blit(sprite.image, render_pos)
+            self.world_surface.blit(sprite.image, render_pos)
 
 
-    def update_display(self, sprites_to_render: List[pygame.sprite.Sprite]):
+    def update_display(self, sprites_to_render: List[pygame.sprite.Sprite], limit_fps: bool = True):
         """
         Main rendering call, manages the drawing order and screen refresh.
+        limit_fps=False skips the frame cap (used by replays running faster than real time).
         """
-        self.screen.fill((0, 0, 0)) # Black background for safety
+        self.world_surface.fill((0, 0, 0)) # Black background for safety
         
         # 1. Render Map Layers (e.g., floor, objects below player)
         self.render_map_layer()
@@ -111,8 +184,21 @@ class Renderer:
         # 2. Render Sprites (e.g., player, enemies, NPCs)
         self.render_sprites(sprites_to_render)
 
+        # 2b. Fog of war over the world (one pre-built overlay surface)
+        if self.fog is not None:
+            self.fog.draw(self.world_surface, self.camera_offset)
+
+        # 2c. Upscale the low-resolution world to the window with one integer scale
+        if self._upscaled is not None:
+            pygame.transform.scale(self.world_surface, self._upscaled.get_size(), self._upscaled)
+            for bar in self._letterbox_bars:
+                self.screen.fill((0, 0, 0), bar)
+
         # 3. Render UI/HUD (Health bars, inventory - without camera offset)
+        if self.minimap is not None:
+            self.minimap.draw(self.screen, self.camera_offset, (self.view_width, self.view_height))
 
         pygame.display.flip()
-        self.clock.tick(self.fps)
+        self.last_flip_time = time.perf_counter()
+        self.clock.tick(self.fps if limit_fps else 0)
         return self.clock.get_time() # Returns time since last frame in milliseconds
\ No newline at end of file
@@ -0,0 +1,165 @@
+# replay.py
+
+import pickle
+import struct
+import pygame
+from typing import Dict, Iterator, List, Tuple
+
+from event import EventManager, EventType, GameEvent, GameState, PlayerMovedEvent, StateChangeEvent
+from input import InputHandler
+
+# --- Log Format ---
+#
+# Header:  magic, version, number of action names, then the action names
+#          (each a length-prefixed utf-8 string) in the bit order used by frames.
+# Frame:   action bitmask, delta time in ms, number of events, then each event.
+# Event:   EventType value, payload kind, payload.
+#          kind 1 = PlayerMovedEvent (x, y floats)
+#          kind 2 = StateChangeEvent (GameState value)
+#          kind 0 = any other GameEvent (length-prefixed pickle of its data dict)
+
+MAGIC = b'SGRP'
+VERSION = 1
+
+_HEADER = struct.Struct('<4sBB')
+_NAME_LEN = struct.Struct('<B')
+_FRAME = struct.Struct('<IHH')
+_EVENT = struct.Struct('<BB')
+_MOVED = struct.Struct('<ff')
+_STATE = struct.Struct('<B')
+_BLOB_LEN = struct.Struct('<H')
+
+_KIND_GENERIC = 0
+_KIND_MOVED = 1
+_KIND_STATE = 2
+
+class InputRecorder:
+    """
+    Writes the per-frame input action state and every dispatched GameEvent to a compact binary log.
+    Call `begin_frame` once per frame after input handling; events are captured through
+    EventManager subscriptions and stored with the frame they were dispatched in.
+    """
+    def __init__(self, filepath, action_names: List[str]):
+        self.filepath = filepath
+        self.action_names = list(action_names)
+        if len(self.action_names) > 32:
+            raise ValueError("InputRecorder supports at most 32 actions")
+
+        self.__file = open(filepath, 'wb')
+        self.__file.write(_HEADER.pack(MAGIC, VERSION, len(self.action_names)))
+        for name in self.action_names:
+            encoded = name.encode('utf-8')
+            self.__file.write(_NAME_LEN.pack(len(encoded)))
+            self.__file.write(encoded)
+
+        self.frames_written = 0
+        self.__frame_header = None
+        self.__frame_events = []
+
+    def attach(self, event_manager: EventManager):
+        """Subscribes the recorder to every event type, ahead of the game's own listeners."""
+        for event_type in EventType:
+            event_manager.subscribe(event_type, self.record_event, priority=1000)
+
+    def begin_frame(self, actions: Dict[str, bool], delta_time: int):
+        """Starts a new frame, flushing the previous one to disk."""
+        self._write_frame()
+        mask = 0
+        for bit, name in enumerate(self.action_names):
+            if actions.get(name):
+                mask |= 1 << bit
+        self.__frame_header = (mask, max(0, min(int(delta_time), 0xFFFF)))
+
+    def record_event(self, event: GameEvent):
+        """Listener that encodes an event right away, so pooled events can be recycled safely."""
+        if isinstance(event, PlayerMovedEvent):
+            payload = _EVENT.pack(event.type.value, _KIND_MOVED) + _MOVED.pack(event.x, event.y)
+        elif isinstance(event, StateChangeEvent):
+            payload = _EVENT.pack(event.type.value, _KIND_STATE) + _STATE.pack(event.new_state.value)
+        else:
+            blob = pickle.dumps(event.data, protocol=pickle.HIGHEST_PROTOCOL)
+            payload = _EVENT.pack(event.type.value, _KIND_GENERIC) + _BLOB_LEN.pack(len(blob)) + blob
+        self.__frame_events.append(payload)
+
+    def _write_frame(self):
+        if self.__frame_header is None:
+            return
+        mask, delta_time = self.__frame_header
+        self.__file.write(_FRAME.pack(mask, delta_time, len(self.__frame_events)))
+        self.__file.write(b''.join(self.__frame_events))
+        self.__frame_header = None
+        self.__frame_events = []
+        self.frames_written += 1
+
+    def close(self):
+        """Writes the last frame and closes the log."""
+        if self.__file.closed:
+            return
+        self._write_frame()
+        self.__file.close()
+        print(f"[InputRecorder] Wrote {self.frames_written} frames to {self.filepath}")
+
+class ReplayReader:
+    """Reads a log written by InputRecorder, one frame at a time."""
+    def __init__(self, filepath):
+        self.filepath = filepath
+        with open(filepath, 'rb') as log_file:
+            self.__data = log_file.read()
+
+        magic, version, name_count = _HEADER.unpack_from(self.__data, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{filepath} is not a sprite_game replay log")
+        if version != VERSION:
+            raise ValueError(f"Unsupported replay log version {version} (expected {VERSION})")
+
+        offset = _HEADER.size
+        self.action_names = []
+        for _ in range(name_count):
+            (length,) = _NAME_LEN.unpack_from(self.__data, offset)
+            offset += _NAME_LEN.size
+            self.action_names.append(self.__data[offset:offset + length].decode('utf-8'))
+            offset += length
+        self.__frames_offset = offset
+
+    def frames(self) -> Iterator[Tuple[Dict[str, bool], int, List[GameEvent]]]:
+        """Yields (actions, delta_time_ms, events) for every recorded frame."""
+        data = self.__data
+        offset = self.__frames_offset
+        names = self.action_names
+        while offset < len(data):
+            mask, delta_time, event_count = _FRAME.unpack_from(data, offset)
+            offset += _FRAME.size
+            actions = {name: bool(mask & (1 << bit)) for bit, name in enumerate(names)}
+
+            events = []
+            for _ in range(event_count):
+                type_value, kind = _EVENT.unpack_from(data, offset)
+                offset += _EVENT.size
+                if kind == _KIND_MOVED:
+                    x, y = _MOVED.unpack_from(data, offset)
+                    offset += _MOVED.size
+                    events.append(PlayerMovedEvent(x, y))
+                elif kind == _KIND_STATE:
+                    (state_value,) = _STATE.unpack_from(data, offset)
+                    offset += _STATE.size
+                    events.append(StateChangeEvent(GameState(state_value)))
+                else:
+                    (length,) = _BLOB_LEN.unpack_from(data, offset)
+                    offset += _BLOB_LEN.size
+                    events.append(GameEvent(EventType(type_value), pickle.loads(data[offset:offset + length])))
+                    offset += length
+            yield actions, delta_time, events
+
+def feed_actions(input_handler: InputHandler, actions: Dict[str, bool]):
+    """
+    Drives an InputHandler to a recorded action state by synthesizing the
+    KEYDOWN/KEYUP events that would have produced it.
+    """
+    action_keys = {action: key for key, action in input_handler.key_map.items()}
+    current = input_handler.get_actions()
+    for action, is_down in actions.items():
+        key = action_keys.get(action)
+        if key is None or current.get(action) == is_down:
+            continue
+        event_type = pygame.KEYDOWN if is_down else pygame.KEYUP
+        input_handler.handle_input(pygame.event.Event(event_type, key=key))
@@ -0,0 +1,141 @@
+# soak_net.py
+#
+# Headless soak test of the loopback multiplayer code. Starts a GameServer on a background
+# thread and drives dozens of bot clients (random walks with prediction) from the main thread,
+# then reports bandwidth per client and server tick times and checks that every client ends up
+# with the server's final state (exit code 1 if not).
+# Run from the sprite_game folder:
+#     python soak_net.py [--clients 32] [--npcs 50] [--seconds 10]
+
+import argparse
+import random
+import sys
+import threading
+import time
+
+import numpy as np
+
+from entities import EntityStore
+from net import GameServer, NetClient, ACTION_BITS, QUANTUM
+
+CLIENT_FPS = 60
+
+class Bot:
+    """A client that holds a random direction for a while, like a player tapping keys."""
+    def __init__(self, server_address, seed: int):
+        self.rng = random.Random(seed)
+        self.store = EntityStore(0, 0)
+        row = self.store.add(64, 64, 32, 32, 5)
+        self.client = NetClient(self.store, row, server_address, remote_size=(16, 16))
+        self.client.connect()
+        self.mask = 0
+        self.hold_frames = 0
+
+    def frame(self, delta_time: int):
+        if self.hold_frames <= 0:
+            self.mask = self.rng.getrandbits(len(ACTION_BITS) - 1) # Movement keys only
+            self.hold_frames = self.rng.randint(10, 60)
+        self.hold_frames -= 1
+        self.client.send_input(self.mask, delta_time)
+        self.client.poll()
+
+def compare_with_server(client: NetClient, server_state) -> list:
+    """
+    Differences between a client's reconciled view and the server's final state: entities missing
+    or extra on the client, and positions more than one quantization step apart.
+    """
+    problems = []
+    expected = set(server_state) - {client.server_entity}
+    mirrored = set(client.remote_rows)
+    if expected != mirrored:
+        problems.append(f"entities missing {sorted(expected - mirrored)[:5]}, extra {sorted(mirrored - expected)[:5]}")
+    views = [(client.server_entity, client.local_row)] + list(client.remote_rows.items())
+    for entity_id, row in views:
+        if entity_id not in server_state:
+            continue
+        seen = np.round(client.store.position[row] * QUANTUM)
+        if np.any(np.abs(seen - server_state[entity_id]) > 1):
+            problems.append(f"entity {entity_id} at {tuple(seen.astype(int).tolist())}, server {server_state[entity_id]}")
+    return problems
+
+def main():
+    parser = argparse.ArgumentParser(description="Multiplayer soak test")
+    parser.add_argument('--clients', type=int, default=32)
+    parser.add_argument('--npcs', type=int, default=50)
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--world-tiles', type=int, default=64)
+    args = parser.parse_args()
+
+    server = GameServer(world_tiles=args.world_tiles)
+    server.spawn_npcs(args.npcs)
+    thread = threading.Thread(target=server.serve_forever, name="GameServer", daemon=True)
+    thread.start()
+
+    bots = [Bot(server.address, seed) for seed in range(args.clients)]
+    print(f"[Soak] {args.clients} clients, {args.npcs} NPCs, server {server.address[0]}:{server.address[1]} "
+          f"at {server.tick_rate} ticks/s, running {args.seconds:.0f}s")
+
+    # Bots share one thread, so each one steps with the real time since its last frame
+    frame_ms = 1000 / CLIENT_FPS
+    start = time.perf_counter()
+    last = start
+    frames = 0
+    while time.perf_counter() - start < args.seconds:
+        now = time.perf_counter()
+        delta_time = int((now - last) * 1000)
+        last = now
+        for bot in bots:
+            bot.frame(delta_time)
+        frames += 1
+        delay = frame_ms / 1000 - (time.perf_counter() - now)
+        if delay > 0:
+            time.sleep(delay)
+    elapsed = time.perf_counter() - start
+
+    # Inputs have stopped; let the server process the last ones, then compare every bot's view with it
+    time.sleep(0.2)
+    server.stop()
+    thread.join(timeout=1)
+    for _ in range(5):
+        for bot in bots:
+            bot.client.poll()
+        if all(bot.client.latest_tick == server.tick for bot in bots):
+            break
+        server.step() # A bot missed the final snapshot (UDP); send another one
+        time.sleep(0.05)
+    server_state = server.quantized_state()
+    mismatched = {}
+    for seed, bot in enumerate(bots):
+        if bot.client.latest_tick != server.tick:
+            mismatched[seed] = [f"at tick {bot.client.latest_tick}, server at {server.tick}"]
+        else:
+            problems = compare_with_server(bot.client, server_state)
+            if problems:
+                mismatched[seed] = problems
+
+    sent = np.array([bot.client.bytes_sent for bot in bots]) / elapsed
+    received = np.array([bot.client.bytes_received for bot in bots]) / elapsed
+    tick_ms = np.array(server.tick_times) * 1000
+    pending = sum(len(bot.client.pending_inputs) for bot in bots)
+    errors = sum(bot.client.prediction_errors for bot in bots)
+
+    print(f"[Soak] {frames} client frames ({frames / elapsed:.0f}/s), {server.tick} server ticks ({server.tick / elapsed:.1f}/s)")
+    print(f"[Soak] Per client up:   avg {sent.mean() / 1024:6.2f} KiB/s, max {sent.max() / 1024:6.2f} KiB/s")
+    print(f"[Soak] Per client down: avg {received.mean() / 1024:6.2f} KiB/s, max {received.max() / 1024:6.2f} KiB/s")
+    print(f"[Soak] Server total:    out {server.bytes_sent / elapsed / 1024:7.1f} KiB/s, in {server.bytes_received / elapsed / 1024:7.1f} KiB/s")
+    print(f"[Soak] Server tick:     avg {tick_ms.mean():.3f}ms, p95 {np.percentile(tick_ms, 95):.3f}ms, max {tick_ms.max():.3f}ms "
+          f"(budget {1000 / server.tick_rate:.1f}ms)")
+    print(f"[Soak] Reconciliation corrections: {errors}, inputs still unacknowledged: {pending}")
+    if mismatched:
+        for seed, problems in mismatched.items():
+            print(f"[Soak] Client {seed} does not match the server: {'; '.join(problems)}")
+    else:
+        print(f"[Soak] Final state: all {len(bots)} clients match the server ({len(server_state)} entities)")
+
+    for bot in bots:
+        bot.client.close()
+    server.close()
+    return 1 if mismatched or pending else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
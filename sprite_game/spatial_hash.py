@@ -0,0 +1,216 @@
+# spatial_hash.py
+
+import math
+import numpy as np
+from typing import Dict, Hashable, Iterable, List, Set, Tuple
+
+class SpatialHash:
+    """
+    Uniform-grid broadphase for overlap queries.
+    Each item is stored by key (any hashable: an entity row index, a sprite...) together with
+    its axis-aligned bounds, and is listed in every grid cell its bounds touch. Moving an item
+    only touches the grid when it crosses into a different set of cells.
+
+    The cell size is usually the tile size, with items no larger than a few cells.
+    """
+    def __init__(self, cell_size: float):
+        self.cell_size = cell_size
+        self._cells: Dict[Tuple[int, int], Set[Hashable]] = {}
+        # key -> (left, top, right, bottom)
+        self._bounds: Dict[Hashable, Tuple[float, float, float, float]] = {}
+        # key -> (first col, first row, last col, last row)
+        self._cell_ranges: Dict[Hashable, Tuple[int, int, int, int]] = {}
+        # Row ranges last synced from an EntityStore
+        self._store_ranges = None
+
+    def __len__(self) -> int:
+        return len(self._bounds)
+
+    def __contains__(self, key) -> bool:
+        return key in self._bounds
+
+    def _cell_range(self, left: float, top: float, right: float, bottom: float) -> Tuple[int, int, int, int]:
+        size = self.cell_size
+        # Right/bottom edges are exclusive, like pygame.Rect
+        return (int(left // size), int(top // size),
+                int(math.ceil(right / size)) - 1, int(math.ceil(bottom / size)) - 1)
+
+    def _add_to_cells(self, key, cell_range):
+        cells = self._cells
+        col0, row0, col1, row1 = cell_range
+        for col in range(col0, col1 + 1):
+            for row in range(row0, row1 + 1):
+                members = cells.get((col, row))
+                if members is None:
+                    cells[(col, row)] = {key}
+                else:
+                    members.add(key)
+
+    def _remove_from_cells(self, key, cell_range):
+        cells = self._cells
+        col0, row0, col1, row1 = cell_range
+        for col in range(col0, col1 + 1):
+            for row in range(row0, row1 + 1):
+                members = cells[(col, row)]
+                members.discard(key)
+                if not members:
+                    del cells[(col, row)]
+
+    # --- Maintenance ---
+
+    def insert(self, key, x: float, y: float, width: float, height: float):
+        """Adds an item, or moves it if the key is already present."""
+        if key in self._bounds:
+            self.update(key, x, y, width, height)
+            return
+        bounds = (x, y, x + width, y + height)
+        cell_range = self._cell_range(*bounds)
+        self._bounds[key] = bounds
+        self._cell_ranges[key] = cell_range
+        self._add_to_cells(key, cell_range)
+
+    def update(self, key, x: float, y: float, width: float, height: float):
+        """Moves an item. The grid is only touched if it crossed into different cells."""
+        bounds = (x, y, x + width, y + height)
+        cell_range = self._cell_range(*bounds)
+        self._bounds[key] = bounds
+        old_range = self._cell_ranges[key]
+        if cell_range != old_range:
+            self._remove_from_cells(key, old_range)
+            self._add_to_cells(key, cell_range)
+            self._cell_ranges[key] = cell_range
+
+    def remove(self, key):
+        """Removes an item if present."""
+        if key not in self._bounds:
+            return
+        self._remove_from_cells(key, self._cell_ranges.pop(key))
+        del self._bounds[key]
+
+    def clear(self):
+        self._cells.clear()
+        self._bounds.clear()
+        self._cell_ranges.clear()
+        self._store_ranges = None
+
+    def sync_store(self, store, moved: np.ndarray = None):
+        """
+        Brings the hash up to date with an EntityStore, keyed by row index.
+        Cell ranges are computed for every row in one vectorized pass; only rows whose
+        cells changed (or that were added/removed) are re-bucketed. Pass the mask returned
+        by EntityStore.step as `moved` to skip refreshing the bounds of rows that stood still.
+        """
+        n = store.count
+        position = store.position[:n]
+        size = store.size[:n]
+        alive = store.alive[:n]
+
+        ranges = np.empty((n, 4), dtype=np.int64)
+        ranges[:, 0:2] = np.floor_divide(position, self.cell_size)
+        ranges[:, 2:4] = np.ceil((position + size) / self.cell_size) - 1
+        # Dead rows get a sentinel range so revived rows always count as changed
+        ranges[~alive] = -1
+
+        previous = self._store_ranges
+        if previous is None or len(previous) < n:
+            grown = np.full((n, 4), -1, dtype=np.int64)
+            if previous is not None:
+                grown[:len(previous)] = previous
+            previous = grown
+        changed = np.flatnonzero(np.any(ranges != previous[:n], axis=1))
+
+        bounds = self._bounds
+        refresh = alive.copy() if moved is None else (alive & moved[:n])
+        refresh[changed] = alive[changed]
+        rows = np.flatnonzero(refresh)
+        for index, (left, top), (right, bottom) in zip(rows.tolist(), position[rows].tolist(),
+                                                       (position[rows] + size[rows]).tolist()):
+            bounds[index] = (left, top, right, bottom)
+        cell_ranges = self._cell_ranges
+        for index, new_range, is_alive in zip(changed.tolist(), ranges[changed].tolist(), alive[changed].tolist()):
+            old_range = cell_ranges.get(index)
+            if old_range is not None:
+                self._remove_from_cells(index, old_range)
+            if is_alive:
+                new_range = tuple(new_range)
+                cell_ranges[index] = new_range
+                self._add_to_cells(index, new_range)
+            else:
+                cell_ranges.pop(index, None)
+                bounds.pop(index, None)
+        self._store_ranges = ranges
+
+    def sync_group(self, group: Iterable):
+        """Brings the hash up to date with a collection of sprites, keyed by the sprite itself."""
+        seen = set()
+        for sprite in group:
+            rect = sprite.rect
+            seen.add(sprite)
+            if sprite in self._bounds:
+                self.update(sprite, rect.x, rect.y, rect.width, rect.height)
+            else:
+                self.insert(sprite, rect.x, rect.y, rect.width, rect.height)
+        for key in [key for key in self._bounds if key not in seen]:
+            self.remove(key)
+
+    # --- Queries ---
+
+    def query_rect(self, x: float, y: float, width: float, height: float) -> Set[Hashable]:
+        """Returns the keys of all items whose bounds overlap the rect."""
+        right = x + width
+        bottom = y + height
+        col0, row0, col1, row1 = self._cell_range(x, y, right, bottom)
+        cells = self._cells
+        bounds = self._bounds
+        found = set()
+        for col in range(col0, col1 + 1):
+            for row in range(row0, row1 + 1):
+                members = cells.get((col, row))
+                if members:
+                    for key in members:
+                        if key in found:
+                            continue
+                        left, top, item_right, item_bottom = bounds[key]
+                        if left < right and x < item_right and top < bottom and y < item_bottom:
+                            found.add(key)
+        return found
+
+    def query_radius(self, center_x: float, center_y: float, radius: float) -> Set[Hashable]:
+        """Returns the keys of all items whose bounds come within radius of the point."""
+        candidates = self.query_rect(center_x - radius, center_y - radius, radius * 2, radius * 2)
+        radius_sq = radius * radius
+        found = set()
+        for key in candidates:
+            left, top, right, bottom = self._bounds[key]
+            # Distance from the point to the nearest point of the box
+            dx = max(left - center_x, 0, center_x - right)
+            dy = max(top - center_y, 0, center_y - bottom)
+            if dx * dx + dy * dy <= radius_sq:
+                found.add(key)
+        return found
+
+    def pairs(self) -> List[Tuple[Hashable, Hashable]]:
+        """
+        Returns every pair of overlapping items once.
+        A pair spanning several shared cells is only reported by the cell holding the
+        top-left corner of the overlap, so no de-duplication set is needed.
+        """
+        size = self.cell_size
+        bounds = self._bounds
+        found = []
+        for (col, row), members in self._cells.items():
+            if len(members) < 2:
+                continue
+            items = list(members)
+            count = len(items)
+            for i in range(count - 1):
+                key_a = items[i]
+                left_a, top_a, right_a, bottom_a = bounds[key_a]
+                for j in range(i + 1, count):
+                    key_b = items[j]
+                    left_b, top_b, right_b, bottom_b = bounds[key_b]
+                    if left_a < right_b and left_b < right_a and top_a < bottom_b and top_b < bottom_a:
+                        # Only the cell containing the overlap's top-left corner reports it
+                        if (max(left_a, left_b) // size == col) and (max(top_a, top_b) // size == row):
+                            found.append((key_a, key_b))
+        return found
@@ -0,0 +1,10 @@
+import os
+import sys
+from pathlib import Path
+
+# No window or audio device in tests
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+# The engine's modules import each other by bare name (run from the sprite_game folder)
+sys.path.insert(0, str(Path(__file__).parent.parent))
@@ -0,0 +1,63 @@
+import pygame
+from assets import SurfaceCache, AssetLoader, split_sheet
+
+def make_image(path, size=(40, 24)):
+    """Saves an image where neighbouring pixels differ and some alpha."""
+    surface = pygame.Surface(size, pygame.SRCALPHA)
+    for x in range(size[0]):
+        for y in range(size[1]):
+            surface.set_at((x, y), (x * 4 % 256, y * 6 % 256, (x + y) % 256, 128 + (x * y) % 128))
+    pygame.image.save(surface, str(path))
+    return surface
+
+def pixels(surface):
+    return pygame.image.tobytes(surface, 'RGBA')
+
+def test_cache_miss_then_hit(tmp_path):
+    original = make_image(tmp_path / 'sheet.png')
+    cache = SurfaceCache(tmp_path / 'cache')
+
+    decoded, hit = cache.load(tmp_path / 'sheet.png')
+    assert not hit
+    cached, hit = SurfaceCache(tmp_path / 'cache').load(tmp_path / 'sheet.png')
+    assert hit
+    assert cached.get_size() == decoded.get_size() == original.get_size()
+    assert pixels(cached) == pixels(decoded) == pixels(original)
+    assert len(list((tmp_path / 'cache').glob('*.raw'))) == 1
+
+def test_edited_source_is_decoded_again(tmp_path):
+    make_image(tmp_path / 'sheet.png')
+    cache = SurfaceCache(tmp_path / 'cache')
+    cache.load(tmp_path / 'sheet.png')
+    edited = make_image(tmp_path / 'sheet.png', size=(24, 40))
+    surface, hit = cache.load(tmp_path / 'sheet.png')
+    assert not hit
+    assert pixels(surface) == pixels(edited)
+    assert (cache.hits, cache.misses) == (0, 2)
+
+def test_damaged_entry_is_replaced(tmp_path):
+    original = make_image(tmp_path / 'sheet.png')
+    cache = SurfaceCache(tmp_path / 'cache')
+    cache.load(tmp_path / 'sheet.png')
+    entry, = (tmp_path / 'cache').glob('*.raw')
+    entry.write_bytes(entry.read_bytes()[:-10]) # Truncated write
+    surface, hit = cache.load(tmp_path / 'sheet.png')
+    assert not hit
+    assert pixels(surface) == pixels(original)
+    assert cache.load(tmp_path / 'sheet.png')[1]
+
+def test_split_sheet_with_margin_and_spacing():
+    sheet = pygame.Surface((2 + 3 * 8 + 2 * 1 + 2, 2 + 2 * 8 + 1 + 2))
+    frames = split_sheet(sheet, 8, 8, margin=2, spacing=1)
+    assert len(frames) == 6
+    assert [frame.get_offset() for frame in frames[:4]] == [(2, 2), (11, 2), (20, 2), (2, 11)]
+
+def test_loader_uses_cache_on_second_start(tmp_path):
+    make_image(tmp_path / 'player.png', size=(64, 32))
+    (tmp_path / 'assets.json').write_text('{"player": {"sheet": "player.png", "frame_size": [32, 32]}}')
+    frames, _ = AssetLoader(tmp_path).load_all()
+    assert len(frames['player']) == 2
+    loader = AssetLoader(tmp_path)
+    frames_again, _ = loader.load_all()
+    assert (loader.cache.hits, loader.cache.misses) == (1, 0)
+    assert [pixels(frame) for frame in frames_again['player']] == [pixels(frame) for frame in frames['player']]
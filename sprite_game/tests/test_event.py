@@ -0,0 +1,238 @@
+import threading
+import time
+from event import BackgroundWorkerPool, EventManager, EventPool, EventType, GameEvent, GameState, PlayerMovedEvent, StateChangeEvent
+
+def recorder(log, name=None):
+    def listener(event):
+        log.append(event if name is None else name)
+    return listener
+
+def test_immediate_mode_notifies_on_post():
+    manager = EventManager()
+    seen = []
+    manager.subscribe(EventType.ITEM_PICKUP, recorder(seen))
+    event = GameEvent(EventType.ITEM_PICKUP, {'id': 1})
+    manager.post(event)
+    assert seen == [event]
+    assert manager.pending_count() == 0
+
+def test_queued_mode_waits_for_dispatch_and_keeps_order():
+    manager = EventManager(queued=True)
+    seen = []
+    manager.subscribe(EventType.ITEM_PICKUP, recorder(seen))
+    manager.subscribe(EventType.STATE_CHANGE, recorder(seen))
+    events = [GameEvent(EventType.ITEM_PICKUP, {'id': 1}), StateChangeEvent(GameState.PAUSED),
+              GameEvent(EventType.ITEM_PICKUP, {'id': 2})]
+    for event in events:
+        manager.post(event)
+    assert seen == []
+    assert manager.pending_count() == 3
+    manager.dispatch()
+    assert seen == events
+    assert manager.pending_count() == 0
+
+def test_coalesced_events_keep_the_first_slot_and_the_latest_value():
+    manager = EventManager(queued=True)
+    seen = []
+    manager.subscribe(EventType.PLAYER_MOVED, recorder(seen))
+    manager.subscribe(EventType.ITEM_PICKUP, recorder(seen))
+    pickup = GameEvent(EventType.ITEM_PICKUP)
+    manager.post(PlayerMovedEvent(1, 1))
+    manager.post(pickup)
+    manager.post(PlayerMovedEvent(2, 2))
+    manager.post(PlayerMovedEvent(3, 3))
+    assert manager.pending_count() == 2
+    manager.dispatch()
+    assert [getattr(event, 'position', event) for event in seen] == [(3, 3), pickup]
+
+    # A new frame starts a new coalescing window
+    manager.post(PlayerMovedEvent(4, 4))
+    manager.dispatch()
+    assert seen[-1].position == (4, 4)
+
+def test_events_posted_during_dispatch_wait_for_the_next_frame():
+    manager = EventManager(queued=True)
+    seen = []
+    manager.subscribe(EventType.ITEM_PICKUP, lambda event: manager.post(StateChangeEvent(GameState.GAME_OVER)))
+    manager.subscribe(EventType.STATE_CHANGE, recorder(seen))
+    manager.post(GameEvent(EventType.ITEM_PICKUP))
+    manager.dispatch()
+    assert seen == []
+    manager.dispatch()
+    assert [event.new_state for event in seen] == [GameState.GAME_OVER]
+
+def test_listeners_run_by_priority_then_subscription_order():
+    manager = EventManager()
+    calls = []
+    manager.subscribe(EventType.STATE_CHANGE, recorder(calls, 'default-1'))
+    manager.subscribe(EventType.STATE_CHANGE, recorder(calls, 'low'), priority=-5)
+    manager.subscribe(EventType.STATE_CHANGE, recorder(calls, 'high'), priority=10)
+    manager.subscribe(EventType.STATE_CHANGE, recorder(calls, 'default-2'))
+    removed = recorder(calls, 'removed')
+    manager.subscribe(EventType.STATE_CHANGE, removed, priority=10)
+    manager.unsubscribe(EventType.STATE_CHANGE, removed)
+    manager.post(StateChangeEvent(GameState.PAUSED))
+    assert calls == ['high', 'default-1', 'default-2', 'low']
+
+def test_pool_reuses_released_events():
+    pool = EventPool(max_size=2)
+    first = pool.acquire(PlayerMovedEvent, 1, 2)
+    pool.release(first)
+    assert pool.idle_count(PlayerMovedEvent) == 1
+    again = pool.acquire(PlayerMovedEvent, 5, 6)
+    assert again is first
+    assert again.position == (5, 6)
+    assert pool.idle_count(PlayerMovedEvent) == 0
+
+    state = pool.acquire(StateChangeEvent, GameState.PAUSED)
+    assert state is not first
+    for event in [state] + [StateChangeEvent() for _ in range(3)]:
+        pool.release(event)
+    assert pool.idle_count(StateChangeEvent) == 2 # Capped at max_size
+
+def test_manager_returns_delivered_events_to_the_pool():
+    for queued in (False, True):
+        manager = EventManager(queued=queued, pool=EventPool())
+        seen = []
+        manager.subscribe(EventType.STATE_CHANGE, lambda event: seen.append(event.new_state))
+        event = manager.create(StateChangeEvent, GameState.PAUSED)
+        manager.post(event)
+        manager.dispatch()
+        assert seen == [GameState.PAUSED]
+        assert manager.create(StateChangeEvent, GameState.PLAYING) is event
+
+def test_coalesced_events_are_returned_to_the_pool():
+    manager = EventManager(queued=True, pool=EventPool())
+    replaced = manager.create(PlayerMovedEvent, 1, 1)
+    manager.post(replaced)
+    manager.post(manager.create(PlayerMovedEvent, 2, 2))
+    assert manager.pool.idle_count(PlayerMovedEvent) == 1
+    manager.dispatch()
+    assert manager.pool.idle_count(PlayerMovedEvent) == 2
+
+def test_no_pool_by_default():
+    manager = EventManager(queued=True)
+    assert manager.pool is None
+    assert manager.create(PlayerMovedEvent, 1, 2).position == (1, 2)
+
+class BlockedListener:
+    """Background listener that holds its worker until released, so the queue fills up predictably."""
+    def __init__(self):
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.seen = []
+
+    def __call__(self, event):
+        self.started.set()
+        self.release.wait(5)
+        self.seen.append(event.data['id'])
+
+def busy_pool(drop_policy, max_queue=2, block_timeout=0.002):
+    """A one-worker pool whose worker is busy with event 0."""
+    pool = BackgroundWorkerPool(workers=1, max_queue=max_queue, drop_policy=drop_policy, block_timeout=block_timeout)
+    listener = BlockedListener()
+    pool.submit(listener, GameEvent(EventType.ITEM_PICKUP, {'id': 0}))
+    assert listener.started.wait(5)
+    return pool, listener
+
+def submit_ids(pool, listener, ids):
+    return [pool.submit(listener, GameEvent(EventType.ITEM_PICKUP, {'id': i})) for i in ids]
+
+def test_drop_newest_discards_the_submitted_event():
+    pool, listener = busy_pool('drop_newest')
+    assert submit_ids(pool, listener, range(1, 5)) == [True, True, False, False]
+    assert pool.dropped == 2
+    listener.release.set()
+    pool.flush()
+    assert listener.seen == [0, 1, 2]
+    pool.shutdown()
+
+def test_drop_oldest_counts_one_drop_per_submit():
+    pool, listener = busy_pool('drop_oldest')
+    assert submit_ids(pool, listener, range(1, 6)) == [True] * 5
+    assert pool.dropped == 3
+    assert pool.queue_depth() == 2
+    listener.release.set()
+    pool.flush()
+    assert listener.seen == [0, 4, 5]
+    pool.shutdown()
+
+def test_block_waits_for_room_then_drops():
+    pool, listener = busy_pool('block', max_queue=1, block_timeout=0.02)
+    assert submit_ids(pool, listener, [1]) == [True]
+    started = time.perf_counter()
+    assert submit_ids(pool, listener, [2]) == [False]
+    assert time.perf_counter() - started >= 0.015
+    assert pool.dropped == 1
+
+    pool.block_timeout = 5
+    threading.Timer(0.05, listener.release.set).start()
+    assert submit_ids(pool, listener, [3]) == [True] # Room is made while it waits
+    pool.flush()
+    assert listener.seen == [0, 1, 3]
+    pool.shutdown()
+
+def test_stats_count_calls_errors_and_wait():
+    pool = BackgroundWorkerPool(workers=2)
+    def failing(event):
+        raise RuntimeError("upload failed")
+    def working(event):
+        pass
+    for _ in range(10):
+        pool.submit(working, GameEvent(EventType.ITEM_PICKUP))
+    pool.submit(failing, GameEvent(EventType.ITEM_PICKUP))
+    pool.flush()
+    stats = pool.stats()
+    assert stats['errors'] == 1
+    assert stats['dropped'] == 0
+    assert stats['queue_depth'] == 0
+    by_name = {name.rsplit('.', 1)[-1]: listener_stats for name, listener_stats in stats['listeners'].items()}
+    assert by_name['working']['calls'] == 10
+    assert by_name['failing']['calls'] == 1
+    assert by_name['working']['max_run_ms'] >= by_name['working']['avg_run_ms'] >= 0
+    pool.shutdown()
+
+def test_shutdown_stops_workers_and_later_submits():
+    pool, listener = busy_pool('drop_oldest')
+    submit_ids(pool, listener, [1, 2])
+    listener.release.set()
+    threads = list(pool._threads)
+    pool.shutdown()
+    assert listener.seen == [0, 1, 2] # Queued work finishes first
+    assert not any(thread.is_alive() for thread in threads)
+    assert submit_ids(pool, listener, [3]) == [False]
+    assert pool.dropped == 1
+
+def test_shutdown_racing_drop_oldest_submits_stops_every_worker():
+    pool = BackgroundWorkerPool(workers=4, max_queue=4, drop_policy='drop_oldest')
+    threads = list(pool._threads)
+    stop = threading.Event()
+    def submitter():
+        while not stop.is_set():
+            pool.submit(lambda event: time.sleep(0.0005), GameEvent(EventType.ITEM_PICKUP))
+    submitters = [threading.Thread(target=submitter, daemon=True) for _ in range(2)]
+    for thread in submitters:
+        thread.start()
+    time.sleep(0.05)
+    shutting_down = threading.Thread(target=pool.shutdown, daemon=True)
+    shutting_down.start()
+    shutting_down.join(5)
+    stop.set()
+    assert not shutting_down.is_alive()
+    assert not any(thread.is_alive() for thread in threads)
+
+def test_events_for_background_listeners_are_never_pooled():
+    for queued in (False, True):
+        manager = EventManager(queued=queued, pool=EventPool(), workers=BackgroundWorkerPool(workers=1))
+        inline, background = [], []
+        manager.subscribe(EventType.PLAYER_MOVED, inline.append)
+        manager.subscribe(EventType.PLAYER_MOVED, lambda event: background.append((event, event.position)), background=True)
+        event = manager.create(PlayerMovedEvent, 7, 8)
+        manager.post(event)
+        manager.dispatch()
+        manager.workers.flush()
+        assert inline == [event]
+        assert background == [(event, (7, 8))]
+        assert manager.pool.idle_count(PlayerMovedEvent) == 0
+        assert manager.create(PlayerMovedEvent, 1, 1) is not event
+        manager.shutdown()
@@ -0,0 +1,104 @@
+import threading
+import time
+import numpy as np
+import pytest
+from entities import EntityStore
+from net import (GameServer, NetClient, QUANTUM, ENTRY_FULL, ENTRY_DELTA, ENTRY_REMOVED, _ENTRY, _SNAPSHOT,
+                 encode_snapshot, decode_snapshot, apply_input, actions_to_mask, mask_to_direction)
+
+def entry_kinds(data: bytes) -> dict:
+    """Entity id -> entry kind of every entry in an encoded snapshot."""
+    sizes = {ENTRY_FULL: 4, ENTRY_DELTA: 2, ENTRY_REMOVED: 0}
+    kinds = {}
+    offset = _SNAPSHOT.size
+    for _ in range(_SNAPSHOT.unpack_from(data)[4]):
+        entity_id, kind = _ENTRY.unpack_from(data, offset)
+        kinds[entity_id] = kind
+        offset += _ENTRY.size + sizes[kind]
+    assert offset == len(data)
+    return kinds
+
+def test_full_snapshot_round_trip():
+    state = {0: (0, 0), 3: (65535, 12), 7: (400, 4000)}
+    data = encode_snapshot(5, 9, 42, state, None)
+    assert set(entry_kinds(data).values()) == {ENTRY_FULL}
+    assert decode_snapshot(data, None) == (5, 42, state)
+
+def test_delta_snapshot_round_trip():
+    base = {1: (100, 100), 2: (200, 200), 3: (300, 300), 4: (400, 400)}
+    state = {1: (100, 100), 2: (227, 73), 3: (300 + 500, 300), 5: (10, 10)}
+    data = encode_snapshot(11, 10, 3, state, base)
+    # Unchanged entities are left out; a move too far for int8 falls back to a full entry
+    assert entry_kinds(data) == {2: ENTRY_DELTA, 3: ENTRY_FULL, 4: ENTRY_REMOVED, 5: ENTRY_FULL}
+    assert decode_snapshot(data, base) == (11, 3, state)
+
+def test_delta_limits():
+    base = {1: (1000, 1000), 2: (1000, 1000)}
+    state = {1: (1000 + 127, 1000 - 128), 2: (1000 + 128, 1000)}
+    data = encode_snapshot(2, 1, 0, state, base)
+    assert entry_kinds(data) == {1: ENTRY_DELTA, 2: ENTRY_FULL}
+    assert decode_snapshot(data, base)[2] == state
+
+def test_masks_and_directions():
+    assert actions_to_mask({'move_right': True, 'move_up': True}) == 0b1001
+    assert mask_to_direction(actions_to_mask({'move_right': True, 'move_up': True})) == (1, -1)
+    assert mask_to_direction(actions_to_mask({'move_left': True, 'move_right': True, 'move_down': True})) == (0, 1)
+
+def test_apply_input_is_deterministic_and_quantized():
+    rng = np.random.default_rng(2)
+    inputs = [(int(mask), int(delta_time)) for mask, delta_time in zip(rng.integers(0, 16, 200), rng.integers(1, 60, 200))]
+    positions = []
+    for _ in range(2):
+        store = EntityStore(320, 320)
+        row = store.add(64, 64, 32, 32, 5)
+        for mask, delta_time in inputs:
+            apply_input(store, row, mask, delta_time)
+            quantized = store.position[row] * QUANTUM
+            assert np.array_equal(quantized, np.round(quantized))
+            assert not store.direction[row].any()
+        positions.append(store.position[row].copy())
+    assert np.array_equal(*positions)
+
+def poll_until(client: NetClient, tick: int):
+    for _ in range(200):
+        client.poll()
+        if client.latest_tick >= tick:
+            return
+        time.sleep(0.005)
+    pytest.fail(f"client stuck at tick {client.latest_tick}, server at {tick}")
+
+def test_client_reconciles_with_server():
+    server = GameServer()
+    server.spawn_npcs(10)
+    store = EntityStore(0, 0)
+    row = store.add(64, 64, 32, 32, 5)
+    client = NetClient(store, row, server.address, timeout=0.2, remote_size=(16, 16))
+    try:
+        # The server is stepped by hand here, so the handshake runs beside it
+        connecting = threading.Thread(target=client.connect)
+        connecting.start()
+        while connecting.is_alive():
+            server.step()
+            time.sleep(0.01)
+        assert client.client_id is not None
+        poll_until(client, server.tick)
+
+        rng = np.random.default_rng(4)
+        for frame in range(60):
+            client.send_input(int(rng.integers(0, 16)), 33)
+            if frame % 2:
+                time.sleep(0.002) # Let the inputs arrive before the tick
+                server.step()
+                poll_until(client, server.tick)
+        time.sleep(0.002)
+        server.step()
+        poll_until(client, server.tick)
+
+        state = server.quantized_state()
+        assert not client.pending_inputs
+        assert set(client.remote_rows) == set(state) - {client.server_entity}
+        for entity_id, local_row in [(client.server_entity, row)] + list(client.remote_rows.items()):
+            assert tuple(np.round(store.position[local_row] * QUANTUM).astype(int)) == state[entity_id]
+    finally:
+        client.close()
+        server.close()
@@ -0,0 +1,74 @@
+import random
+import importlib.util
+from pathlib import Path
+import pytest
+from event import EventType, GameState, PlayerMovedEvent, StateChangeEvent, GameEvent
+from replay import InputRecorder, ReplayReader, feed_actions
+
+SPRITE_GAME_DIR = Path(__file__).parent.parent
+
+def load_engine_module():
+    """The engine's game.py, loaded by path (multiplication_game has a game.py of its own)."""
+    spec = importlib.util.spec_from_file_location('sprite_game_engine', SPRITE_GAME_DIR / 'game.py')
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+@pytest.fixture(scope='module')
+def engine_module():
+    return load_engine_module()
+
+def record_session(engine_module, log_filepath, frames=300, seed=1):
+    """Plays random input through a headless engine while recording it, like a real session."""
+    engine = engine_module.GameEngine(headless=True)
+    engine.start_recording(log_filepath)
+    rng = random.Random(seed)
+    for frame in range(frames):
+        actions = {name: rng.random() < 0.3 for name in engine.input_handler.get_actions()}
+        feed_actions(engine.input_handler, actions)
+        if frame == frames // 3:
+            engine.set_game_state(GameState.PAUSED)
+        if frame == frames // 2:
+            engine.set_game_state(GameState.PLAYING)
+        delta_time = rng.randint(14, 20)
+        engine.recorder.begin_frame(engine.input_handler.get_actions(), delta_time)
+        if engine.current_state == GameState.PLAYING:
+            engine.update_entities(delta_time)
+        engine.event_manager.dispatch()
+        engine.input_handler.reset_single_frame_actions()
+    engine.recorder.close()
+
+def test_log_round_trip(tmp_path):
+    log_filepath = tmp_path / "session.sgrp"
+    recorder = InputRecorder(log_filepath, ['move_up', 'action'])
+    recorder.begin_frame({'move_up': True, 'action': False}, 16)
+    recorder.record_event(PlayerMovedEvent(1.5, -2.25))
+    recorder.record_event(StateChangeEvent(GameState.PAUSED))
+    recorder.begin_frame({'move_up': False, 'action': True}, 17)
+    recorder.record_event(GameEvent(EventType.PLAYER_MOVED, {'x': 3}))
+    recorder.close()
+
+    reader = ReplayReader(log_filepath)
+    assert reader.action_names == ['move_up', 'action']
+    (actions_1, dt_1, events_1), (actions_2, dt_2, events_2) = list(reader.frames())
+    assert (actions_1, dt_1) == ({'move_up': True, 'action': False}, 16)
+    assert (events_1[0].x, events_1[0].y) == (1.5, -2.25)
+    assert events_1[1].new_state == GameState.PAUSED
+    assert (actions_2, dt_2) == ({'move_up': False, 'action': True}, 17)
+    assert events_2[0].data == {'x': 3}
+
+def test_replay_is_deterministic(engine_module, tmp_path):
+    log_filepath = tmp_path / "session.sgrp"
+    record_session(engine_module, log_filepath)
+
+    stats = engine_module.GameEngine(headless=True).run_replay(log_filepath)
+    assert stats['frames'] == 300
+    assert stats['desynced_frames'] == 0
+
+def test_replay_detects_desyncs(engine_module, tmp_path):
+    log_filepath = tmp_path / "session.sgrp"
+    record_session(engine_module, log_filepath)
+
+    # Different frame times move the player by different amounts than recorded
+    stats = engine_module.GameEngine(headless=True).run_replay(log_filepath, fixed_delta_time=40)
+    assert stats['desynced_frames'] > 0
@@ -0,0 +1,102 @@
+import random
+import numpy as np
+from entities import EntityStore
+from spatial_hash import SpatialHash
+
+def overlaps(a, b):
+    left_a, top_a, right_a, bottom_a = a
+    left_b, top_b, right_b, bottom_b = b
+    return left_a < right_b and left_b < right_a and top_a < bottom_b and top_b < bottom_a
+
+def brute_force_pairs(bounds):
+    keys = sorted(bounds)
+    return {(a, b) for i, a in enumerate(keys) for b in keys[i + 1:] if overlaps(bounds[a], bounds[b])}
+
+def normalized(pairs):
+    return [tuple(sorted(pair)) for pair in pairs]
+
+def random_items(rng, count, world=400, max_size=90):
+    # Sizes up to a few cells and some negative coordinates, so pairs share several cells
+    items = {}
+    for key in range(count):
+        x, y = rng.uniform(-50, world), rng.uniform(-50, world)
+        items[key] = (x, y, rng.uniform(1, max_size), rng.uniform(1, max_size))
+    return items
+
+def test_pairs_match_brute_force_without_duplicates():
+    rng = random.Random(7)
+    grid = SpatialHash(32)
+    items = random_items(rng, 300)
+    for key, rect in items.items():
+        grid.insert(key, *rect)
+
+    pairs = normalized(grid.pairs())
+    assert len(pairs) == len(set(pairs)) # Each pair once, even when it shares several cells
+    bounds = {key: (x, y, x + w, y + h) for key, (x, y, w, h) in items.items()}
+    assert set(pairs) == brute_force_pairs(bounds)
+
+def test_touching_edges_do_not_overlap():
+    grid = SpatialHash(32)
+    grid.insert('a', 0, 0, 32, 32)
+    grid.insert('b', 32, 0, 32, 32) # Right edge is exclusive, like pygame.Rect
+    grid.insert('c', 31, 31, 2, 2)
+    assert set(normalized(grid.pairs())) == {('a', 'c'), ('b', 'c')}
+    assert grid.query_rect(32, 0, 1, 1) == {'b'}
+    assert grid.query_rect(32, 31, 1, 1) == {'b', 'c'}
+
+def test_moves_and_removals_keep_queries_exact():
+    rng = random.Random(11)
+    grid = SpatialHash(32)
+    items = random_items(rng, 200)
+    for key, rect in items.items():
+        grid.insert(key, *rect)
+    for key in list(items)[::3]:
+        items[key] = (rng.uniform(-50, 400), rng.uniform(-50, 400), *items[key][2:])
+        grid.update(key, *items[key])
+    for key in list(items)[1::7]:
+        grid.remove(key)
+        del items[key]
+
+    bounds = {key: (x, y, x + w, y + h) for key, (x, y, w, h) in items.items()}
+    assert len(grid) == len(items)
+    assert set(normalized(grid.pairs())) == brute_force_pairs(bounds)
+    for _ in range(50):
+        query = (rng.uniform(-60, 400), rng.uniform(-60, 400), rng.uniform(1, 120), rng.uniform(1, 120))
+        query_bounds = (query[0], query[1], query[0] + query[2], query[1] + query[3])
+        assert grid.query_rect(*query) == {key for key, b in bounds.items() if overlaps(b, query_bounds)}
+
+def test_query_radius_matches_brute_force():
+    rng = random.Random(3)
+    grid = SpatialHash(32)
+    items = random_items(rng, 150)
+    for key, rect in items.items():
+        grid.insert(key, *rect)
+    for _ in range(50):
+        cx, cy, radius = rng.uniform(0, 400), rng.uniform(0, 400), rng.uniform(5, 80)
+        expected = set()
+        for key, (x, y, w, h) in items.items():
+            dx = max(x - cx, 0, cx - (x + w))
+            dy = max(y - cy, 0, cy - (y + h))
+            if dx * dx + dy * dy <= radius * radius:
+                expected.add(key)
+        assert grid.query_radius(cx, cy, radius) == expected
+
+def test_sync_store_follows_moves_and_removals():
+    store = EntityStore(640, 640)
+    rng = np.random.default_rng(5)
+    for x, y in rng.uniform(0, 600, size=(120, 2)):
+        store.add(x, y, 24, 24, 3, direction=tuple(rng.uniform(-1, 1, 2)), bounce=True)
+    grid = SpatialHash(32)
+    for step in range(30):
+        moved = store.step(50)
+        if step == 10:
+            for row in range(0, 120, 5):
+                store.remove(row)
+        if step == 20:
+            store.add(100, 100, 24, 24, 3)
+        grid.sync_store(store, moved)
+
+        rows = np.flatnonzero(store.alive[:store.count])
+        bounds = {int(row): (*store.position[row], *(store.position[row] + store.size[row])) for row in rows}
+        assert set(grid._bounds) == set(bounds)
+        assert set(normalized(grid.pairs())) == brute_force_pairs(bounds)
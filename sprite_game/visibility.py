@@ -0,0 +1,127 @@
+# visibility.py
+
+from fractions import Fraction
+from typing import Iterable, List, Tuple
+
+import numpy as np
+import pygame
+
+# --- Symmetric Shadowcasting ---
+#
+# Scans the four quadrants around the origin row by row, narrowing the visible slope range
+# whenever a wall is met. Based on Albert Ford's "Symmetric Shadowcasting": a floor tile is
+# visible from the origin exactly when the origin is visible from it.
+
+def _round_ties_up(n: Fraction) -> int:
+    return int((n + Fraction(1, 2)) // 1)
+
+def _round_ties_down(n: Fraction) -> int:
+    return -int((-n + Fraction(1, 2)) // 1)
+
+# Map (depth, column) within each quadrant to tile coordinates: north, east, south, west
+_QUADRANTS = (
+    lambda ox, oy, depth, col: (ox + col, oy - depth),
+    lambda ox, oy, depth, col: (ox + depth, oy + col),
+    lambda ox, oy, depth, col: (ox + col, oy + depth),
+    lambda ox, oy, depth, col: (ox - depth, oy + col),
+)
+
+def shadowcast(solid: np.ndarray, origin: Tuple[int, int], radius: int) -> np.ndarray:
+    """
+    Returns a bool array (rows, cols) of tiles visible from origin (tile x, tile y).
+    solid is a bool array of tiles that block sight; tiles outside the map block sight too.
+    """
+    rows, cols = solid.shape
+    visible = np.zeros_like(solid, dtype=bool)
+    ox, oy = origin
+    if not (0 <= ox < cols and 0 <= oy < rows):
+        return visible
+    visible[oy, ox] = True
+    radius_sq = radius * radius
+
+    for transform in _QUADRANTS:
+        def blocks(depth, col):
+            x, y = transform(ox, oy, depth, col)
+            return not (0 <= x < cols and 0 <= y < rows) or bool(solid[y, x])
+
+        def reveal(depth, col):
+            x, y = transform(ox, oy, depth, col)
+            if 0 <= x < cols and 0 <= y < rows and depth * depth + col * col <= radius_sq:
+                visible[y, x] = True
+
+        # Each entry is (depth, start slope, end slope)
+        pending = [(1, Fraction(-1), Fraction(1))]
+        while pending:
+            depth, start_slope, end_slope = pending.pop()
+            if depth > radius:
+                continue
+            min_col = _round_ties_up(depth * start_slope)
+            max_col = _round_ties_down(depth * end_slope)
+            prev_is_wall = None # None until the first tile of the row
+            for col in range(min_col, max_col + 1):
+                is_wall = blocks(depth, col)
+                if is_wall or (depth * start_slope <= col <= depth * end_slope):
+                    reveal(depth, col)
+                if prev_is_wall is True and not is_wall:
+                    start_slope = Fraction(2 * col - 1, 2 * depth)
+                if prev_is_wall is False and is_wall:
+                    pending.append((depth + 1, start_slope, Fraction(2 * col - 1, 2 * depth)))
+                prev_is_wall = is_wall
+            if prev_is_wall is False:
+                pending.append((depth + 1, start_slope, end_slope))
+    return visible
+
+# --- Field of View and Fog of War ---
+
+class FieldOfView:
+    """
+    Tracks which tiles of a tile map the player can see and has already explored, and keeps a
+    fog-of-war overlay surface in sync with them.
+
+    Visibility is only recomputed when the player enters a different tile. The overlay is one
+    SRCALPHA surface covering the whole map whose alpha channel is written through
+    pygame.surfarray in a single array assignment, so drawing fog is a single blit.
+    """
+    VISIBLE_ALPHA = 0
+    EXPLORED_ALPHA = 150
+    UNEXPLORED_ALPHA = 255
+
+    def __init__(self, map_data: List[List[int]], tile_size: int, solid_tiles: Iterable[int] = (1,), radius: int = 8):
+        self.tile_size = tile_size
+        self.radius = radius
+        tiles = np.array(map_data, dtype=np.int32)
+        self.solid = np.isin(tiles, list(solid_tiles))
+        self.visible = np.zeros(tiles.shape, dtype=bool)
+        self.explored = np.zeros(tiles.shape, dtype=bool)
+        self.origin = None
+
+        rows, cols = tiles.shape
+        self.surface = pygame.Surface((cols * tile_size, rows * tile_size), pygame.SRCALPHA)
+        self.surface.fill((0, 0, 0, self.UNEXPLORED_ALPHA))
+
+    def update(self, tile_x: int, tile_y: int) -> bool:
+        """Recomputes visibility if the player moved to a new tile. Returns True if it did."""
+        if self.origin == (tile_x, tile_y):
+            return False
+        self.origin = (tile_x, tile_y)
+        self.visible = shadowcast(self.solid, self.origin, self.radius)
+        self.explored |= self.visible
+        self._rebuild_fog()
+        return True
+
+    def update_from_rect(self, rect: pygame.Rect) -> bool:
+        """Convenience wrapper taking the player's rect (uses its center tile)."""
+        return self.update(rect.centerx // self.tile_size, rect.centery // self.tile_size)
+
+    def _rebuild_fog(self):
+        alpha_tiles = np.full(self.visible.shape, self.UNEXPLORED_ALPHA, dtype=np.uint8)
+        alpha_tiles[self.explored] = self.EXPLORED_ALPHA
+        alpha_tiles[self.visible] = self.VISIBLE_ALPHA
+        # Expand each tile to tile_size x tile_size pixels; surfarray indexes as (x, y)
+        alpha_pixels = np.kron(alpha_tiles.T, np.ones((self.tile_size, self.tile_size), dtype=np.uint8))
+        alpha = pygame.surfarray.pixels_alpha(self.surface)
+        alpha[:] = alpha_pixels
+        del alpha # Release the surface lock
+
+    def draw(self, screen: pygame.Surface, camera_offset: pygame.math.Vector2):
+        screen.blit(self.surface, (-camera_offset.x, -camera_offset.y))
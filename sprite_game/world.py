@@ -0,0 +1,191 @@
+# world.py
+
+import threading
+import queue
+import time
+from collections import deque
+from pathlib import Path
+from typing import Dict, Tuple
+
+import numpy as np
+import pygame
+
+# --- Chunk Loading (runs on the loader thread) ---
+
+class ChunkLoader:
+    """
+    Produces the tile IDs of one chunk. Chunks are read from `chunk_{cx}_{cy}.npy` files in
+    chunk_dir when present; otherwise a deterministic procedural chunk is generated so the
+    world has no edge. Must be safe to call from a background thread (no pygame calls).
+    """
+    def __init__(self, chunk_size: int, chunk_dir: Path = None, seed: int = 0):
+        self.chunk_size = chunk_size
+        self.chunk_dir = chunk_dir
+        self.seed = seed
+
+    def load(self, cx: int, cy: int) -> np.ndarray:
+        if self.chunk_dir is not None:
+            chunk_file = self.chunk_dir / f"chunk_{cx}_{cy}.npy"
+            if chunk_file.exists():
+                return np.load(chunk_file).astype(np.uint8)
+        return self.generate(cx, cy)
+
+    def generate(self, cx: int, cy: int) -> np.ndarray:
+        """Grass with scattered 2x2 ponds and wall segments, the same every time for a given chunk."""
+        size = self.chunk_size
+        rng = np.random.default_rng((self.seed, cx & 0xFFFFFFFF, cy & 0xFFFFFFFF))
+        tiles = np.zeros((size, size), dtype=np.uint8)
+        for _ in range(rng.integers(1, 4)):
+            x, y = rng.integers(0, size - 2, size=2)
+            tiles[y:y + 2, x:x + 2] = 2 # Water
+        for _ in range(rng.integers(0, 3)):
+            x, y = rng.integers(0, size, size=2)
+            length = rng.integers(3, size // 2)
+            if rng.random() < 0.5:
+                tiles[y, x:x + length] = 1 # Wall
+            else:
+                tiles[y:y + length, x] = 1
+        return tiles
+
+# --- Streaming World ---
+
+class StreamingWorld:
+    """
+    An unbounded tile world split into square chunks that are streamed in around the camera.
+
+    Each frame `update` estimates the camera velocity from `camera_offset`, predicts where the
+    view will be `lookahead` seconds from now, and requests every chunk covering the current and
+    predicted views. A background thread loads the chunk and decodes it into an RGB pixel array.
+    Finished chunks come back through a deque (append/popleft are atomic, so the handoff needs no
+    lock) and the render thread turns at most `max_uploads_per_frame` of them into Surfaces per
+    frame, so crossing a chunk boundary never blocks on I/O or decoding.
+    """
+    def __init__(self, tile_size: int, tile_colors: Dict[int, Tuple[int, int, int]], chunk_size: int = 16,
+                 loader: ChunkLoader = None, lookahead: float = 0.75, margin_chunks: int = 1,
+                 max_cached_chunks: int = 128, max_uploads_per_frame: int = 2):
+        self.tile_size = tile_size
+        self.chunk_size = chunk_size
+        self.chunk_pixels = chunk_size * tile_size
+        self.loader = loader if loader is not None else ChunkLoader(chunk_size)
+        self.lookahead = lookahead
+        self.margin_chunks = margin_chunks
+        self.max_cached_chunks = max_cached_chunks
+        self.max_uploads_per_frame = max_uploads_per_frame
+
+        # Lookup table from tile ID to color, used by the loader thread to decode chunks
+        self._palette = np.zeros((256, 3), dtype=np.uint8)
+        for tile_id, color in tile_colors.items():
+            self._palette[tile_id] = color
+
+        # Render-thread state
+        self.tiles: Dict[Tuple[int, int], np.ndarray] = {}
+        self.surfaces: Dict[Tuple[int, int], pygame.Surface] = {}
+        self._requested = set()
+        self._last_offset = None
+        self._last_time = None
+        self.velocity = pygame.math.Vector2(0, 0) # Smoothed camera velocity in pixels/second
+        self.missing_chunk_frames = 0 # Frames where a visible chunk was not ready yet
+
+        # Thread handoff
+        self._requests = queue.Queue()
+        self._ready = deque()
+        self._running = True
+        self._thread = threading.Thread(target=self._load_chunks, name="ChunkLoader", daemon=True)
+        self._thread.start()
+
+    # --- Loader thread ---
+
+    def _load_chunks(self):
+        while self._running:
+            key = self._requests.get()
+            if key is None:
+                return
+            tiles = self.loader.load(*key)
+            # Decode to pixels: (height, width, 3) color per tile, then scale up to tile_size
+            pixels = self._palette[tiles]
+            pixels = np.repeat(np.repeat(pixels, self.tile_size, axis=0), self.tile_size, axis=1)
+            # surfarray expects (width, height, 3)
+            self._ready.append((key, tiles, np.ascontiguousarray(pixels.swapaxes(0, 1))))
+
+    # --- Render thread ---
+
+    def chunk_of(self, x: float, y: float) -> Tuple[int, int]:
+        """Returns the chunk containing a world pixel position."""
+        return int(x // self.chunk_pixels), int(y // self.chunk_pixels)
+
+    def _chunks_in_view(self, left: float, top: float, width: float, height: float) -> set:
+        margin = self.margin_chunks
+        cx0, cy0 = self.chunk_of(left, top)
+        cx1, cy1 = self.chunk_of(left + width, top + height)
+        return {(cx, cy) for cx in range(cx0 - margin, cx1 + margin + 1) for cy in range(cy0 - margin, cy1 + margin + 1)}
+
+    def update(self, camera_offset: pygame.math.Vector2, view_width: int, view_height: int):
+        """Predicts the chunks needed soon, requests the missing ones and integrates finished ones."""
+        now = time.perf_counter()
+        if self._last_offset is not None and now > self._last_time:
+            instant = (camera_offset - self._last_offset) / (now - self._last_time)
+            self.velocity = self.velocity.lerp(instant, 0.2)
+        self._last_offset = pygame.math.Vector2(camera_offset)
+        self._last_time = now
+
+        predicted = camera_offset + self.velocity * self.lookahead
+        needed = self._chunks_in_view(camera_offset.x, camera_offset.y, view_width, view_height)
+        needed |= self._chunks_in_view(predicted.x, predicted.y, view_width, view_height)
+        # Request the chunks closest to the camera first
+        center = self.chunk_of(camera_offset.x + view_width / 2, camera_offset.y + view_height / 2)
+        for key in sorted(needed, key=lambda k: abs(k[0] - center[0]) + abs(k[1] - center[1])):
+            if key not in self.surfaces and key not in self._requested:
+                self._requested.add(key)
+                self._requests.put(key)
+
+        self._integrate_ready()
+        self._evict(needed)
+
+    def _integrate_ready(self):
+        for _ in range(min(self.max_uploads_per_frame, len(self._ready))):
+            key, tiles, pixels = self._ready.popleft()
+            self._requested.discard(key)
+            self.tiles[key] = tiles
+            self.surfaces[key] = pygame.surfarray.make_surface(pixels)
+
+    def _evict(self, needed: set):
+        """Drops the chunks furthest from the camera once the cache is over budget."""
+        if len(self.surfaces) <= self.max_cached_chunks:
+            return
+        center = self.chunk_of(self._last_offset.x, self._last_offset.y)
+        spare = sorted((key for key in self.surfaces if key not in needed),
+                       key=lambda k: abs(k[0] - center[0]) + abs(k[1] - center[1]), reverse=True)
+        for key in spare[:len(self.surfaces) - self.max_cached_chunks]:
+            del self.surfaces[key]
+            del self.tiles[key]
+
+    def tile_at(self, tile_x: int, tile_y: int):
+        """Returns the tile ID at a tile coordinate, or None if its chunk is not loaded."""
+        tiles = self.tiles.get((tile_x // self.chunk_size, tile_y // self.chunk_size))
+        if tiles is None:
+            return None
+        return int(tiles[tile_y % self.chunk_size, tile_x % self.chunk_size])
+
+    def draw(self, screen: pygame.Surface, camera_offset: pygame.math.Vector2):
+        """Blits every loaded chunk that overlaps the screen."""
+        width, height = screen.get_size()
+        cx0, cy0 = self.chunk_of(camera_offset.x, camera_offset.y)
+        cx1, cy1 = self.chunk_of(camera_offset.x + width, camera_offset.y + height)
+        missing = False
+        blits = []
+        for cx in range(cx0, cx1 + 1):
+            for cy in range(cy0, cy1 + 1):
+                surface = self.surfaces.get((cx, cy))
+                if surface is None:
+                    missing = True
+                    continue
+                blits.append((surface, (cx * self.chunk_pixels - camera_offset.x, cy * self.chunk_pixels - camera_offset.y)))
+        screen.blits(blits, doreturn=False)
+        if missing:
+            self.missing_chunk_frames += 1
+
+    def shutdown(self):
+        """Stops the loader thread."""
+        self._running = False
+        self._requests.put(None)
+        self._thread.join(timeout=1)